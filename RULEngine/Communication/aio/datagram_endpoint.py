@@ -0,0 +1,88 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Bases communes du backend asyncio: un point de terminaison UDP ouvert
+    dans la boucle d'événements au démarrage et fermé à l'arrêt.
+"""
+import asyncio
+from abc import ABCMeta, abstractmethod
+
+from RULEngine.Communication.util.udp_socket import udp_server_socket
+
+
+class AsyncDatagramEndpoint(object, metaclass=ABCMeta):
+    """ Point de terminaison UDP ouvert par la boucle d'événements. """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.transport = None
+
+    @abstractmethod
+    async def open(self) -> None:
+        """ Ouvre le transport dans la boucle d'événements courante. """
+        pass
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+class ChannelDatagramProtocol(asyncio.DatagramProtocol):
+    """ Remet chaque datagramme reçu au tampon de son canal. """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def datagram_received(self, data, addr):
+        self.callback([data])
+
+
+class AsyncDatagramReceiver(AsyncDatagramEndpoint):
+    """ Socket d'écoute dont les datagrammes sont livrés à _receive par la boucle. """
+
+    def __init__(self, host, port):
+        super().__init__(host, port)
+        self.new_frame_event = None
+
+    async def open(self) -> None:
+        loop = asyncio.get_event_loop()
+        self.new_frame_event = asyncio.Event()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: ChannelDatagramProtocol(self._on_datagrams),
+                                                                sock=udp_server_socket(self.host, self.port))
+
+    def _on_datagrams(self, datagrams) -> None:
+        self._receive(datagrams)
+        self.new_frame_event.set()
+
+    @abstractmethod
+    def _receive(self, datagrams) -> None:
+        """ Range les datagrammes reçus, appelé par la boucle d'événements. """
+        pass
+
+    async def wait_for_frames(self, timeout=None) -> bool:
+        """ Attend l'arrivée d'un paquet depuis le dernier appel, au plus timeout secondes. """
+        try:
+            await asyncio.wait_for(self.new_frame_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.new_frame_event.clear()
+        return True
+
+
+class AsyncDatagramSender(AsyncDatagramEndpoint):
+    """
+        Remplace le socket connecté des senders par un transport asyncio. À
+        utiliser en premier parent devant le sender synchrone dont on garde la
+        construction des paquets.
+    """
+
+    async def open(self) -> None:
+        loop = asyncio.get_event_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                                remote_addr=(self.host, self.port))
+
+    def _send_bytes(self, data: bytes) -> None:
+        # les erreurs (ex.: port refusé) sont remises au protocole, qui les ignore
+        if self.transport is not None:
+            self.transport.sendto(data)
@@ -0,0 +1,82 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Versions asyncio des récepteurs de la vision, de l'arbitre et de
+    l'UI-debug. Elles offrent la même interface de lecture que les récepteurs
+    synchrones, la réception étant faite par la boucle d'événements.
+"""
+import pickle
+import time
+from collections import deque
+
+from RULEngine.Communication.aio.datagram_endpoint import AsyncDatagramReceiver
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.protobuf import referee_pb2 as ssl_referee
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, latest_only_coalescing_key, \
+    vision_coalescing_key
+from RULEngine.Util.constant import DEBUG_RECEIVE_BUFFER_SIZE
+from config.config_service import ConfigService
+
+
+class AsyncProtobufPacketReceiver(AsyncDatagramReceiver):
+
+    def __init__(self, host, port, packet_type, coalescing_key=latest_only_coalescing_key):
+        super().__init__(host, port)
+        self.packet_buffer = RawPacketBuffer(packet_type, coalescing_key)
+        self.packet_log = None
+        self.log_channel = None
+
+    def _receive(self, datagrams) -> None:
+        t_recv = time.monotonic()
+        if self.packet_log is not None:
+            self.packet_log.write(self.log_channel, datagrams, t_recv)
+        self.packet_buffer.extend(datagrams, t_recv)
+
+    def record_to(self, packet_log, channel) -> None:
+        self.log_channel = channel
+        self.packet_log = packet_log
+
+    def pop_frames(self):
+        return self.packet_buffer.pop_frames()
+
+    def pop_detection_frames(self):
+        return self.packet_buffer.pop_detection_frames()
+
+    def get_latest_frame(self):
+        return self.packet_buffer.get_latest_frame()
+
+
+class AsyncVisionReceiver(AsyncProtobufPacketReceiver):
+
+    def __init__(self):
+        cfg = ConfigService()
+        host = cfg.config_dict["COMMUNICATION"]["udp_address"]
+        port = int(cfg.config_dict["COMMUNICATION"]["vision_port"])
+        super().__init__(host, port, ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+
+
+class AsyncRefereeReceiver(AsyncProtobufPacketReceiver):
+
+    def __init__(self):
+        cfg = ConfigService()
+        host = cfg.config_dict["COMMUNICATION"]["udp_address"]
+        port = int(cfg.config_dict["COMMUNICATION"]["referee_port"])
+        super().__init__(host, port, ssl_referee.SSL_Referee)
+
+
+class AsyncUIDebugCommandReceiver(AsyncDatagramReceiver):
+
+    def __init__(self):
+        cfg = ConfigService()
+        host = cfg.config_dict["COMMUNICATION"]["ui_debug_address"]
+        port = int(cfg.config_dict["COMMUNICATION"]["ui_cmd_receiver_port"])
+        super().__init__(host, port)
+        self.packet_list = deque(maxlen=DEBUG_RECEIVE_BUFFER_SIZE)
+
+    def _receive(self, datagrams) -> None:
+        for data in datagrams:
+            self.packet_list.append(pickle.loads(data))
+
+    def receive_command(self):
+        """ Vide la file et retourne une liste des paquets brutes. """
+        for _ in range(len(self.packet_list)):
+            yield self.packet_list.pop()
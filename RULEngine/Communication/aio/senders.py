@@ -0,0 +1,54 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Versions asyncio des senders grSim, UI-debug et redirection de la vision.
+    La construction et la sérialisation des paquets sont héritées des
+    senders synchrones, seul l'envoi passe par un transport asyncio.
+"""
+import pickle
+from contextlib import closing
+
+from RULEngine.Communication.aio.datagram_endpoint import AsyncDatagramSender
+from RULEngine.Communication.sender.grsim_command_sender import GrSimCommandSender
+from RULEngine.Communication.sender.uidebug_command_sender import UIDebugCommandSender
+from RULEngine.Communication.sender.uidebug_vision_sender import UIDebugVisionSender
+from RULEngine.Communication.util.udp_socket import udp_socket
+from config.config_service import ConfigService
+
+
+class AsyncGrSimCommandSender(AsyncDatagramSender, GrSimCommandSender):
+
+    def _send_packet(self, packet):
+        data = packet.SerializeToString()
+        if self.transport is not None:
+            self._send_bytes(data)
+        else:
+            # boucle fermée (arrêt des joueurs au nettoyage): envoi bloquant
+            with closing(udp_socket(self.host, self.port)) as server:
+                server.send(data)
+
+    def stop(self):
+        self.close()
+
+
+class AsyncUIDebugCommandSender(AsyncDatagramSender, UIDebugCommandSender):
+
+    def __init__(self):
+        cfg = ConfigService()
+        host = cfg.config_dict["COMMUNICATION"]["ui_debug_address"]
+        port = int(cfg.config_dict["COMMUNICATION"]["ui_cmd_sender_port"])
+        super().__init__(host, port)
+
+    def _send_packet(self, p_packet):
+        self._send_bytes(pickle.dumps(p_packet))
+
+
+class AsyncUIDebugVisionSender(AsyncDatagramSender, UIDebugVisionSender):
+
+    def __init__(self):
+        cfg = ConfigService()
+        host = cfg.config_dict["COMMUNICATION"]["ui_debug_address"]
+        port = int(cfg.config_dict["COMMUNICATION"]["ui_vision_sender_port"])
+        super().__init__(host, port)
+
+    def send_packet(self, p_packet):
+        self._send_bytes(p_packet)
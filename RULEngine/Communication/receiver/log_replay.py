@@ -0,0 +1,160 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Rejoue un journal de paquets (voir packet_log) à la place des récepteurs
+    UDP de la vision et de l'arbitre. Les récepteurs rejoués offrent la même
+    interface de lecture (pop_frames, get_latest_frame, wait_for_frames).
+"""
+import threading
+import time
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.protobuf import referee_pb2 as ssl_referee
+from RULEngine.Communication.util.packet_log import CHANNEL_REFEREE, CHANNEL_VISION, PacketLogReader
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, latest_only_coalescing_key, \
+    vision_coalescing_key
+
+
+class PacketLogReplay(object):
+    """
+        Avance dans le journal au fil des lectures des récepteurs.
+
+        speed > 0: le temps du journal avance speed fois plus vite que
+        l'horloge. speed == 0: aussi vite que possible, le temps du journal
+        avance de step secondes à chaque lecture de la vision.
+    """
+
+    def __init__(self, path, speed=1.0, step=0.05, start_time=None, clock=time.monotonic):
+        assert speed >= 0, "La vitesse de rejeu doit être positive ou nulle."
+        self.reader = PacketLogReader(path)
+        self.speed = speed
+        self.step = step
+        self.clock = clock
+        self.receivers = {}
+
+        first_time = self.reader.start_time
+        if start_time is not None and first_time is not None:
+            start_time = max(start_time, first_time)
+        else:
+            start_time = first_time
+        if start_time is not None:
+            self._records = self.reader.records(self.reader.seek(start_time))
+        else:
+            self._records = self.reader.records()
+        self._next_record = next(self._records, None)
+
+        self.log_start = start_time
+        self.log_time = None
+        self.last_advance = step
+        self.clock_start = None
+        self._lock = threading.Lock()
+
+    def receiver(self, channel, packet_type, coalescing_key=latest_only_coalescing_key):
+        receiver = ReplayReceiver(self, channel, packet_type, coalescing_key)
+        self.receivers[channel] = receiver
+        return receiver
+
+    def vision_receiver(self):
+        return self.receiver(CHANNEL_VISION, ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+
+    def referee_receiver(self):
+        return self.receiver(CHANNEL_REFEREE, ssl_referee.SSL_Referee)
+
+    @property
+    def finished(self) -> bool:
+        return self._next_record is None
+
+    def time_until_next_record(self) -> float:
+        """ Temps d'horloge (s) avant la livraison du prochain enregistrement, None à la fin du journal. """
+        if self._next_record is None:
+            return None
+        if self.speed == 0 or self.log_time is None:
+            return 0.0
+        elapsed = self.clock() - self.clock_start
+        return max(0.0, (self._next_record[1] - self.log_start) / self.speed - elapsed)
+
+    def advance(self, driver=False) -> None:
+        """
+            Livre aux récepteurs les enregistrements dont le temps est atteint.
+            En mode aussi vite que possible, seul le récepteur pilote (la
+            vision) fait avancer le temps.
+        """
+        with self._lock:
+            if self.log_start is None:
+                return
+            if self.log_time is None:
+                self.log_time = self.log_start
+                self.clock_start = self.clock()
+                target = self.log_start
+            elif self.speed == 0:
+                if not driver:
+                    return
+                target = self.log_time + self.step
+            else:
+                target = self.log_start + (self.clock() - self.clock_start) * self.speed
+
+            if driver:
+                self.last_advance = target - self.log_time
+            self.log_time = max(self.log_time, target)
+            self._deliver_until(self.log_time)
+
+    def _deliver_until(self, log_time) -> None:
+        while self._next_record is not None and self._next_record[1] <= log_time:
+            channel, t_recv, data, _ = self._next_record
+            receiver = self.receivers.get(channel)
+            if receiver is not None:
+                receiver.packet_buffer.append(data, self.replay_receive_time(t_recv))
+            self._next_record = next(self._records, None)
+
+    def replay_receive_time(self, t_recv) -> float:
+        """
+            Temps de réception enregistré ramené à l'horloge du rejeu: les
+            écarts entre paquets sont ceux de la capture, divisés par speed
+            (tels quels aussi vite que possible).
+        """
+        return self.clock_start + (t_recv - self.log_start) / (self.speed or 1.0)
+
+    def close(self) -> None:
+        self._records.close()
+        self.reader.close()
+
+
+class ReplayReceiver(object):
+    """ Récepteur dont les paquets viennent d'un PacketLogReplay. """
+
+    def __init__(self, replay: PacketLogReplay, channel, packet_type, coalescing_key):
+        self.replay = replay
+        self.channel = channel
+        self.packet_buffer = RawPacketBuffer(packet_type, coalescing_key)
+
+    @property
+    def is_driver(self) -> bool:
+        return self.channel == CHANNEL_VISION
+
+    def wait_for_frames(self, timeout=None) -> bool:
+        """ Dort jusqu'au prochain enregistrement, au plus timeout secondes. """
+        delay = self.replay.time_until_next_record()
+        if delay is None:
+            delay = timeout
+        elif timeout is not None:
+            delay = min(delay, timeout)
+        if delay:
+            time.sleep(delay)
+        self.replay.advance(self.is_driver)
+        return len(self.packet_buffer.raw_packets) > 0
+
+    def pop_frames(self):
+        self._advance_before_pop()
+        return self.packet_buffer.pop_frames()
+
+    def pop_detection_frames(self):
+        self._advance_before_pop()
+        return self.packet_buffer.pop_detection_frames()
+
+    def _advance_before_pop(self):
+        # aussi vite que possible: wait_for_frames a peut-être déjà avancé d'un pas
+        if self.replay.speed != 0 or not self.packet_buffer.raw_packets:
+            self.replay.advance(self.is_driver)
+
+    def get_latest_frame(self):
+        self.replay.advance()
+        return self.packet_buffer.get_latest_frame()
@@ -2,9 +2,8 @@
 
 import pickle
 from collections import deque
-from socketserver import BaseRequestHandler
 
-from RULEngine.Communication.util.threaded_udp_server import ThreadedUDPServer
+from RULEngine.Communication.util.udp_receive_engine import UDPReceiveEngine
 from RULEngine.Util.constant import DEBUG_RECEIVE_BUFFER_SIZE
 from config.config_service import ConfigService
 
@@ -19,22 +18,12 @@ class UIDebugCommandReceiver(object):
         host = cfg.config_dict["COMMUNICATION"]["ui_debug_address"]
         port = int(cfg.config_dict["COMMUNICATION"]["ui_cmd_receiver_port"])
         self.packet_list = deque(maxlen=DEBUG_RECEIVE_BUFFER_SIZE)
-        handler = self.get_udp_handler(self.packet_list)
-        self.server = ThreadedUDPServer(host, port, handler)
+        self.socket = UDPReceiveEngine().register(host, port, self._receive)
 
-    def get_udp_handler(self, p_packet_list):
-        """ Retourne la classe pour reçevoir async les paquets """
-
-        class ThreadedUDPRequestHandler(BaseRequestHandler):
-            """ Contient la logique pour traiter en callback une request. """
-            def handle(self):
-                """
-                    Récupère la request et unpickle le paquet brute dans la
-                    deque.
-                """
-                data = self.request[0]
-                p_packet_list.append(pickle.loads(data))
-        return ThreadedUDPRequestHandler
+    def _receive(self, datagrams):
+        """ Unpickle le lot de paquets brutes reçu par le moteur de réception dans la deque. """
+        for data in datagrams:
+            self.packet_list.append(pickle.loads(data))
 
     def receive_command(self):
         """ Vide la file et retourne une liste des paquets brutes. """
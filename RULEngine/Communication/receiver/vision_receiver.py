@@ -6,6 +6,7 @@
 
 from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
 from RULEngine.Communication.util.protobuf_packet_receiver import ProtobufPacketReceiver
+from RULEngine.Communication.util.raw_packet_buffer import vision_coalescing_key
 from config.config_service import ConfigService
 
 
@@ -17,4 +18,4 @@ class VisionReceiver(ProtobufPacketReceiver):
         cfg = ConfigService()
         host = cfg.config_dict["COMMUNICATION"]["udp_address"]
         port = int(cfg.config_dict["COMMUNICATION"]["vision_port"])
-        super(VisionReceiver, self).__init__(host, port, ssl_wrapper.SSL_WrapperPacket)
+        super(VisionReceiver, self).__init__(host, port, ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
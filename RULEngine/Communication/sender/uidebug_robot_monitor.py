@@ -1,4 +1,5 @@
 # Under MIT License, see LICENSE.txt
+import asyncio
 import threading
 from time import sleep, time
 
@@ -22,8 +23,8 @@ class UIDebugRobotMonitor(object):
     """
         Service pour loguer l'état du robot (niveau batterie, packet lost, etc.) et l'envoyer à l'uidebug
     """
-    def __init__(self, serial_com: SerialCommandSender, debug_interface: DebugInterface):
-        """ Constructeur """
+    def __init__(self, serial_com: SerialCommandSender, debug_interface: DebugInterface, autostart=True):
+        """ Constructeur, autostart=False laisse la boucle d'événements appeler async_monitor_loop. """
         self.serial_com = serial_com
         self.debug_interface = debug_interface
         self.robots_status = {}
@@ -33,28 +34,46 @@ class UIDebugRobotMonitor(object):
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.pause_cond = threading.Condition(threading.Lock())
 
-        self.monitor_thread.start()
+        if autostart:
+            self.monitor_thread.start()
 
     def _monitor_loop(self):
         """ Moniteur le niveau des batteries des robots. """
         while not self.terminate.is_set():
             for robot_id in range(PLAYER_PER_TEAM):
-                # Ask for batterie level
-                cmd = GetBattery(OurPlayer(None, robot_id), self.pause_cond)
-                response = self.serial_com.send_responding_command(cmd)
-                if response:
-                    # print("Response from id {} with bat lvl {}V".format(robot_id, response))
-                    self.robots_status[robot_id].battery_lvl = response
-                    self.robots_status[robot_id].time_since_last_reading = time()
-                # Send last known state to UI-Debug
-                self.debug_interface.send_robot_state(robot_id,
-                                                      self.robots_status[robot_id].battery_lvl,
-                                                      self.robots_status[robot_id].time_since_last_reading)
+                self._monitor_robot(robot_id)
                 if self.terminate.is_set():
                     return
                 sleep(PERIOD_BETWEEN_BAT_MONITORING)
 
+    async def async_monitor_loop(self):
+        """
+            Même boucle pour le backend asyncio. La requête au robot bloque sur
+            le lien série, elle est donc faite dans l'exécuteur de la boucle.
+        """
+        loop = asyncio.get_event_loop()
+        while not self.terminate.is_set():
+            for robot_id in range(PLAYER_PER_TEAM):
+                await loop.run_in_executor(None, self._monitor_robot, robot_id)
+                if self.terminate.is_set():
+                    return
+                await asyncio.sleep(PERIOD_BETWEEN_BAT_MONITORING)
+
+    def _monitor_robot(self, robot_id):
+        # Ask for batterie level
+        cmd = GetBattery(OurPlayer(None, robot_id), self.pause_cond)
+        response = self.serial_com.send_responding_command(cmd)
+        if response:
+            # print("Response from id {} with bat lvl {}V".format(robot_id, response))
+            self.robots_status[robot_id].battery_lvl = response
+            self.robots_status[robot_id].time_since_last_reading = time()
+        # Send last known state to UI-Debug
+        self.debug_interface.send_robot_state(robot_id,
+                                              self.robots_status[robot_id].battery_lvl,
+                                              self.robots_status[robot_id].time_since_last_reading)
+
     def stop(self):
         self.terminate.set()
-        self.monitor_thread.join()
+        if self.monitor_thread.is_alive():
+            self.monitor_thread.join()
         self.terminate.clear()
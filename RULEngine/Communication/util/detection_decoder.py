@@ -0,0 +1,168 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Décodeur spécialisé des SSL_DetectionFrame. Il ne lit que les champs
+    utilisés par l'IA (caméra, numéro de frame, temps, position, orientation,
+    confiance et identifiant des objets) et les écrit directement dans des
+    tableaux NumPy préalloués, sans construire les messages protobuf.
+"""
+import struct
+
+import numpy as np
+
+from RULEngine.Communication.util.wire_format import DETECTION_CAMERA_ID, DETECTION_FRAME_NUMBER, \
+    DETECTION_T_CAPTURE, DETECTION_T_SENT, WIRE_FIXED32, WIRE_FIXED64, WIRE_LENGTH_DELIMITED, WIRE_VARINT, \
+    WRAPPER_DETECTION, WireFormatError, read_tag, read_varint, skip_field
+
+# numéros des champs de SSL_DetectionFrame (suite)
+DETECTION_BALLS = 5
+DETECTION_ROBOTS_YELLOW = 6
+DETECTION_ROBOTS_BLUE = 7
+
+# numéros des champs de SSL_DetectionBall
+BALL_CONFIDENCE = 1
+BALL_X = 3
+BALL_Y = 4
+
+# numéros des champs de SSL_DetectionRobot
+ROBOT_CONFIDENCE = 1
+ROBOT_ID = 2
+ROBOT_X = 3
+ROBOT_Y = 4
+ROBOT_ORIENTATION = 5
+
+MAX_BALLS = 16
+MAX_ROBOTS = 16
+
+# colonnes des tableaux
+BALL_COLUMNS = ("x", "y", "confidence")
+ROBOT_COLUMNS = ("robot_id", "x", "y", "orientation", "confidence")
+
+_FLOAT = struct.Struct("<f")
+_DOUBLE = struct.Struct("<d")
+
+
+class DetectionArrays(object):
+    """
+        Contenu utile d'une SSL_DetectionFrame. Les tableaux sont alloués une
+        seule fois et réécrits à chaque décodage: seules les count premières
+        lignes sont valides.
+    """
+
+    def __init__(self):
+        self.camera_id = None
+        self.frame_number = 0
+        self.t_capture = 0.0
+        self.t_sent = 0.0
+        self.balls = np.zeros((MAX_BALLS, len(BALL_COLUMNS)))
+        self.ball_count = 0
+        self.blues = np.zeros((MAX_ROBOTS, len(ROBOT_COLUMNS)))
+        self.blue_count = 0
+        self.yellows = np.zeros((MAX_ROBOTS, len(ROBOT_COLUMNS)))
+        self.yellow_count = 0
+
+    def clear(self) -> None:
+        self.camera_id = None
+        self.frame_number = 0
+        self.t_capture = 0.0
+        self.t_sent = 0.0
+        self.ball_count = 0
+        self.blue_count = 0
+        self.yellow_count = 0
+
+
+def decode_detection(data: bytes, out: DetectionArrays) -> bool:
+    """
+        Décode la détection d'un SSL_WrapperPacket sérialisé dans out.
+
+        :return: False si le paquet n'a pas de détection (ex.: géométrie seule),
+                 il doit alors être décodé par les classes protobuf.
+    """
+    out.clear()
+    found = False
+    pos = 0
+    end = len(data)
+    while pos < end:
+        field, wire_type, pos = read_tag(data, pos)
+        if field == WRAPPER_DETECTION and wire_type == WIRE_LENGTH_DELIMITED:
+            length, pos = read_varint(data, pos)
+            if pos + length > end:
+                raise WireFormatError("Détection tronquée.")
+            try:
+                _decode_detection_frame(data, pos, pos + length, out)
+            except struct.error:
+                raise WireFormatError("Champ de la détection tronqué.")
+            pos += length
+            found = True
+        else:
+            pos = skip_field(data, pos, wire_type)
+    return found
+
+
+def _decode_detection_frame(data, pos, end, out):
+    while pos < end:
+        field, wire_type, pos = read_tag(data, pos)
+        if wire_type == WIRE_LENGTH_DELIMITED and DETECTION_BALLS <= field <= DETECTION_ROBOTS_BLUE:
+            length, pos = read_varint(data, pos)
+            if pos + length > end:
+                raise WireFormatError("Objet détecté tronqué.")
+            if field == DETECTION_BALLS:
+                if out.ball_count < MAX_BALLS:
+                    _decode_ball(data, pos, pos + length, out.balls[out.ball_count])
+                    out.ball_count += 1
+            elif field == DETECTION_ROBOTS_BLUE:
+                if out.blue_count < MAX_ROBOTS:
+                    _decode_robot(data, pos, pos + length, out.blues[out.blue_count])
+                    out.blue_count += 1
+            elif out.yellow_count < MAX_ROBOTS:
+                _decode_robot(data, pos, pos + length, out.yellows[out.yellow_count])
+                out.yellow_count += 1
+            pos += length
+        elif field == DETECTION_FRAME_NUMBER and wire_type == WIRE_VARINT:
+            out.frame_number, pos = read_varint(data, pos)
+        elif field == DETECTION_CAMERA_ID and wire_type == WIRE_VARINT:
+            out.camera_id, pos = read_varint(data, pos)
+        elif field == DETECTION_T_CAPTURE and wire_type == WIRE_FIXED64:
+            out.t_capture = _DOUBLE.unpack_from(data, pos)[0]
+            pos += 8
+        elif field == DETECTION_T_SENT and wire_type == WIRE_FIXED64:
+            out.t_sent = _DOUBLE.unpack_from(data, pos)[0]
+            pos += 8
+        else:
+            pos = skip_field(data, pos, wire_type)
+
+
+def _decode_ball(data, pos, end, row):
+    row[:] = 0
+    while pos < end:
+        field, wire_type, pos = read_tag(data, pos)
+        if wire_type == WIRE_FIXED32 and pos + 4 <= end:
+            if field == BALL_X:
+                row[0] = _FLOAT.unpack_from(data, pos)[0]
+            elif field == BALL_Y:
+                row[1] = _FLOAT.unpack_from(data, pos)[0]
+            elif field == BALL_CONFIDENCE:
+                row[2] = _FLOAT.unpack_from(data, pos)[0]
+            pos += 4
+        else:
+            pos = skip_field(data, pos, wire_type)
+
+
+def _decode_robot(data, pos, end, row):
+    row[:] = 0
+    while pos < end:
+        field, wire_type, pos = read_tag(data, pos)
+        if wire_type == WIRE_FIXED32 and pos + 4 <= end:
+            if field == ROBOT_X:
+                row[1] = _FLOAT.unpack_from(data, pos)[0]
+            elif field == ROBOT_Y:
+                row[2] = _FLOAT.unpack_from(data, pos)[0]
+            elif field == ROBOT_ORIENTATION:
+                row[3] = _FLOAT.unpack_from(data, pos)[0]
+            elif field == ROBOT_CONFIDENCE:
+                row[4] = _FLOAT.unpack_from(data, pos)[0]
+            pos += 4
+        elif field == ROBOT_ID and wire_type == WIRE_VARINT:
+            robot_id, pos = read_varint(data, pos)
+            row[0] = robot_id
+        else:
+            pos = skip_field(data, pos, wire_type)
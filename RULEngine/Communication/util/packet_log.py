@@ -0,0 +1,133 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Journal binaire des paquets bruts reçus de la vision et de l'arbitre.
+
+    Le journal est un fichier en ajout seul: un en-tête suivi d'enregistrements
+    [canal: u8][temps de réception monotone: f64][longueur: u32][octets]. Un
+    fichier d'index à côté (<journal>.idx) contient des entrées de taille fixe
+    [temps: f64][position: u64], écrites au plus une fois par INDEX_PERIOD
+    secondes, pour sauter à un temps du match sans lire tout le journal.
+"""
+import mmap
+import struct
+import threading
+import time
+from bisect import bisect_right
+
+CHANNEL_VISION = 0
+CHANNEL_REFEREE = 1
+
+LOG_MAGIC = b"ULPKTLOG"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<8sI")
+RECORD_HEADER = struct.Struct("<BdI")
+INDEX_ENTRY = struct.Struct("<dQ")
+INDEX_PERIOD = 1.0
+INDEX_SUFFIX = ".idx"
+
+
+class PacketLogError(ValueError):
+    """ Est levée si un fichier n'est pas un journal de paquets valide. """
+    pass
+
+
+class PacketLogWriter(object):
+    """ Ajoute les paquets reçus au journal. Peut être appelé de plusieurs threads. """
+
+    def __init__(self, path, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.log_file = open(path, "wb")
+        self.index_file = open(path + INDEX_SUFFIX, "wb")
+        self.log_file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+        self.offset = LOG_HEADER.size
+        self.next_index_time = None
+        self.record_count = 0
+        self._lock = threading.Lock()
+
+    def write(self, channel: int, datagrams: list, t_recv=None) -> None:
+        """ Ajoute un lot de datagrammes reçus au même moment sur un canal. """
+        if t_recv is None:
+            t_recv = self.clock()
+        with self._lock:
+            if self.log_file is None:
+                return
+            if self.next_index_time is None or t_recv >= self.next_index_time:
+                self.index_file.write(INDEX_ENTRY.pack(t_recv, self.offset))
+                self.next_index_time = t_recv + INDEX_PERIOD
+            for data in datagrams:
+                self.log_file.write(RECORD_HEADER.pack(channel, t_recv, len(data)))
+                self.log_file.write(data)
+                self.offset += RECORD_HEADER.size + len(data)
+            self.record_count += len(datagrams)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self.log_file is not None:
+                self.log_file.flush()
+                self.index_file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.index_file.close()
+                self.log_file = None
+                self.index_file = None
+
+
+class PacketLogReader(object):
+    """ Lit un journal par mmap. Les octets retournés sont des copies, le journal peut être fermé. """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as log_file:
+            self.log = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.log) < LOG_HEADER.size:
+            raise PacketLogError("Journal vide ou tronqué: {}".format(path))
+        magic, version = LOG_HEADER.unpack_from(self.log, 0)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise PacketLogError("Fichier {} n'est pas un journal de paquets.".format(path))
+        self.index_times, self.index_offsets = self._read_index(path + INDEX_SUFFIX)
+
+    @staticmethod
+    def _read_index(index_path):
+        try:
+            with open(index_path, "rb") as index_file:
+                raw_index = index_file.read()
+        except FileNotFoundError:
+            return [], []
+        usable = len(raw_index) - len(raw_index) % INDEX_ENTRY.size
+        entries = list(INDEX_ENTRY.iter_unpack(raw_index[:usable]))
+        return [t for t, _ in entries], [offset for _, offset in entries]
+
+    @property
+    def start_time(self):
+        for _, t_recv, _, _ in self.records():
+            return t_recv
+        return None
+
+    def records(self, offset=LOG_HEADER.size):
+        """ Itère les (canal, temps, octets, position suivante) à partir d'une position. """
+        end = len(self.log)
+        while offset + RECORD_HEADER.size <= end:
+            channel, t_recv, length = RECORD_HEADER.unpack_from(self.log, offset)
+            data_start = offset + RECORD_HEADER.size
+            if data_start + length > end:
+                # dernier enregistrement incomplet (enregistreur interrompu)
+                return
+            offset = data_start + length
+            yield channel, t_recv, self.log[data_start:offset], offset
+
+    def seek(self, t) -> int:
+        """ Retourne la position du premier enregistrement reçu au temps t ou après. """
+        i = bisect_right(self.index_times, t) - 1
+        offset = self.index_offsets[i] if i >= 0 else LOG_HEADER.size
+        for _, t_recv, _, next_offset in self.records(offset):
+            if t_recv >= t:
+                return offset
+            offset = next_offset
+        return offset
+
+    def close(self) -> None:
+        self.log.close()
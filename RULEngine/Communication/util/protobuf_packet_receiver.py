@@ -5,53 +5,61 @@
     l'envoie des commandes aux robots au niveau des systèmes embarqués.
 """
 
-from collections import deque
-from socketserver import BaseRequestHandler
-
+import threading
 import time
 
 from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2
-from RULEngine.Communication.util.threaded_udp_server import ThreadedUDPServer
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, latest_only_coalescing_key
+from RULEngine.Communication.util.udp_receive_engine import UDPReceiveEngine
 
 
 class ProtobufPacketReceiver(object):
     """
         Service qui implémente un serveur multicast UDP avec comme type de
-        paquets ceux défini par la SSL en utilisant protobuf. Le serveur est
-        async.
+        paquets ceux défini par la SSL en utilisant protobuf. La réception est
+        faite par le UDPReceiveEngine partagé. Les paquets sont gardés bruts et ne sont décodés qu'à la
+        lecture, voir RawPacketBuffer.
     """
 
-    def __init__(self, host, port, packet_type):
-        self.packet_list = deque(maxlen=100)
-        handler = self.get_udp_handler(self.packet_list, packet_type)
-        self.server = ThreadedUDPServer(host, port, handler)
+    def __init__(self, host, port, packet_type, coalescing_key=latest_only_coalescing_key):
+        self.packet_buffer = RawPacketBuffer(packet_type, coalescing_key)
+        self.new_frame_event = threading.Event()
+        self.packet_log = None
+        self.log_channel = None
+        self.socket = UDPReceiveEngine().register(host, port, self._receive)
 
-    def get_udp_handler(self, packet_list, packet_type):
-        class ThreadedUDPRequestHandler(BaseRequestHandler):
+    def _receive(self, datagrams):
+        """ Appelé par le thread du moteur de réception avec un lot de datagrammes. """
+        t_recv = time.monotonic()
+        if self.packet_log is not None:
+            self.packet_log.write(self.log_channel, datagrams, t_recv)
+        self.packet_buffer.extend(datagrams, t_recv)
+        self.new_frame_event.set()
 
-            def handle(self):
-                data = self.request[0]
-                packet = packet_type()
-                packet.ParseFromString(data)
-                packet_list.append(packet)
+    def record_to(self, packet_log, channel) -> None:
+        """ Enregistre dorénavant les paquets bruts reçus dans le journal donné. """
+        self.log_channel = channel
+        self.packet_log = packet_log
 
-        return ThreadedUDPRequestHandler
+    def wait_for_frames(self, timeout=None) -> bool:
+        """
+            Bloque jusqu'à l'arrivée d'un paquet depuis le dernier appel ou
+            jusqu'à l'expiration du délai. Retourne vrai si un paquet est arrivé.
+        """
+        has_frames = self.new_frame_event.wait(timeout)
+        self.new_frame_event.clear()
+        return has_frames
 
     # TODO change the typing here in case of refereeMGL 2017/02/24
     def pop_frames(self)->messages_robocup_ssl_wrapper_pb2:
-        """ Retourne une frame de la deque. """
-        new_list = list(self.packet_list)
-        new_list.reverse()
+        """ Retourne les dernières frames décodées, la plus récente en premier. """
+        return self.packet_buffer.pop_frames()
 
-        self.packet_list.clear()
-        return new_list
+    def pop_detection_frames(self):
+        """ Voir RawPacketBuffer.pop_detection_frames. """
+        return self.packet_buffer.pop_detection_frames()
 
     # TODO change the typing here in case of referee MGL 2017/02/24
     def get_latest_frame(self)->messages_robocup_ssl_wrapper_pb2:
         """ Retourne sans erreur la dernière frame reçu. """
-        try:
-            return self.packet_list[-1]
-        except IndexError:
-            return None
-
-
+        return self.packet_buffer.get_latest_frame()
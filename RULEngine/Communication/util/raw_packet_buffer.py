@@ -0,0 +1,157 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Tampon circulaire de paquets protobuf gardés sous forme d'octets bruts.
+    Le décodage est repoussé au moment où le consommateur demande les
+    paquets et ne touche que les paquets qui seront réellement utilisés.
+"""
+import time
+from collections import deque
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2
+from RULEngine.Communication.util.detection_decoder import DetectionArrays, decode_detection
+from RULEngine.Communication.util.wire_format import WireFormatError, peek_vision_header
+from google.protobuf.message import DecodeError
+
+RAW_PACKET_BUFFER_SIZE = 100
+
+
+def vision_coalescing_key(data: bytes):
+    """
+        Clé de fusion d'un paquet de vision: la caméra et son numéro de frame.
+        Les paquets de géométrie et les paquets illisibles ne sont jamais
+        fusionnés (clé None).
+    """
+    try:
+        camera_id, frame_number, has_geometry = peek_vision_header(data)
+    except WireFormatError:
+        return None, 0
+    if camera_id is None or has_geometry:
+        return None, 0
+    return camera_id, frame_number
+
+
+def latest_only_coalescing_key(data: bytes):
+    """ Clé de fusion qui ne garde que le paquet le plus récent. """
+    return 0, 0
+
+
+class RawPacketBuffer(object):
+    """
+        Garde les derniers paquets reçus en octets, étiquetés à la réception
+        par (clé, numéro de frame). À la lecture, seul le paquet au plus grand
+        numéro de frame de chaque clé est décodé.
+    """
+
+    def __init__(self, packet_type, coalescing_key=latest_only_coalescing_key, maxlen=RAW_PACKET_BUFFER_SIZE):
+        self.packet_type = packet_type
+        self.coalescing_key = coalescing_key
+        self.raw_packets = deque(maxlen=maxlen)
+        # clé -> (numéro de frame, temps de réception monotone) du dernier paquet reçu
+        self.receive_times = {}
+        self._latest_raw = None
+        self._latest_packet = None
+        # tableaux de détection réutilisés, un par clé (caméra)
+        self._detection_arrays = {}
+
+    def append(self, data: bytes, t_recv=None) -> None:
+        """ Ajoute un paquet brut. Appelé par le thread de réception. """
+        key, frame_number = self.coalescing_key(data)
+        self.raw_packets.append((key, frame_number, data))
+        if key is not None:
+            self.receive_times[key] = (frame_number, time.monotonic() if t_recv is None else t_recv)
+
+    def extend(self, datagrams: list, t_recv=None) -> None:
+        """ Ajoute un lot de paquets bruts reçus au même moment. """
+        if t_recv is None:
+            t_recv = time.monotonic()
+        for data in datagrams:
+            self.append(data, t_recv)
+
+    def receive_time(self, key, frame_number):
+        """ Temps de réception monotone d'un paquet, s'il est le dernier reçu de sa clé. """
+        try:
+            last_frame_number, t_recv = self.receive_times[key]
+        except KeyError:
+            return None
+        return t_recv if last_frame_number == frame_number else None
+
+    def pop_raw_frames(self) -> list:
+        """ Vide le tampon et retourne les entrées (clé, frame, octets), la plus vieille en premier. """
+        entries = []
+        while True:
+            try:
+                entries.append(self.raw_packets.popleft())
+            except IndexError:
+                return entries
+
+    def pop_frames(self) -> messages_robocup_ssl_wrapper_pb2:
+        """
+            Vide le tampon et retourne les paquets décodés, le plus récent en
+            premier, après fusion au dernier paquet de chaque clé.
+        """
+        packets = []
+        for _, data in self._pop_coalesced():
+            packet = self._parse(data)
+            if packet is not None:
+                packets.append(packet)
+        return packets
+
+    def pop_detection_frames(self):
+        """
+            Comme pop_frames, mais les détections sont décodées par le décodeur
+            spécialisé dans des DetectionArrays réutilisés d'un appel à l'autre
+            (à copier avant le prochain appel). Les autres paquets (géométrie)
+            sont décodés par les classes protobuf.
+
+            :return: (liste de DetectionArrays, liste des autres paquets)
+        """
+        detections = []
+        other_packets = []
+        for key, data in self._pop_coalesced():
+            if key is not None:
+                arrays = self._detection_arrays.get(key)
+                if arrays is None:
+                    arrays = self._detection_arrays[key] = DetectionArrays()
+                try:
+                    if decode_detection(data, arrays):
+                        detections.append(arrays)
+                        continue
+                except WireFormatError:
+                    continue
+            packet = self._parse(data)
+            if packet is not None:
+                other_packets.append(packet)
+        return detections, other_packets
+
+    def _pop_coalesced(self):
+        """ Vide le tampon et retourne les (clé, octets) à décoder, le plus récent en premier. """
+        entries = self.pop_raw_frames()
+
+        newest_by_key = {}
+        for key, frame_number, data in entries:
+            if key is not None:
+                newest = newest_by_key.get(key)
+                if newest is None or frame_number >= newest[0]:
+                    newest_by_key[key] = (frame_number, data)
+
+        return [(key, data) for key, _, data in reversed(entries)
+                if key is None or newest_by_key[key][1] is data]
+
+    def get_latest_frame(self) -> messages_robocup_ssl_wrapper_pb2:
+        """ Retourne sans erreur le dernier paquet reçu, décodé une seule fois. """
+        try:
+            _, _, data = self.raw_packets[-1]
+        except IndexError:
+            return None
+        if data is not self._latest_raw:
+            self._latest_packet = self._parse(data)
+            self._latest_raw = data
+        return self._latest_packet
+
+    def _parse(self, data: bytes):
+        packet = self.packet_type()
+        try:
+            packet.ParseFromString(data)
+        except DecodeError:
+            return None
+        return packet
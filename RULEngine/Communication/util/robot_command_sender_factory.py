@@ -1,3 +1,4 @@
+from RULEngine.Communication.aio.senders import AsyncGrSimCommandSender
 from RULEngine.Communication.sender.grsim_command_sender import GrSimCommandSender
 from RULEngine.Communication.sender.serial_command_sender import SerialCommandSender
 from config.config_service import ConfigService
@@ -8,7 +9,10 @@ class RobotCommandSenderFactory(object):
     @staticmethod
     def get_sender():
         type_of_connection = ConfigService().config_dict["COMMUNICATION"]["type"]
-        if type_of_connection == "sim":
+        backend = ConfigService().config_dict["COMMUNICATION"]["backend"]
+        if type_of_connection == "sim" and backend == "asyncio":
+            return AsyncGrSimCommandSender("127.0.0.1", 20011)
+        elif type_of_connection == "sim":
             return GrSimCommandSender("127.0.0.1", 20011)
         elif type_of_connection == "serial":
             return SerialCommandSender()
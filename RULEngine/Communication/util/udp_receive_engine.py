@@ -0,0 +1,99 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Moteur de réception UDP à un seul thread. Tous les sockets d'écoute
+    (vision, arbitre, UI-debug) sont multiplexés avec selectors: à chaque
+    réveil, un socket prêt est vidé en lot sans bloquer et le lot est remis
+    au tampon de son canal.
+"""
+import selectors
+import socket
+import threading
+import traceback
+
+from RULEngine.Communication.util.udp_socket import udp_server_socket
+from RULEngine.Util.singleton import Singleton
+
+RECEIVE_BUFFER_SIZE = 65536
+# limite par réveil pour qu'un canal inondé n'affame pas les autres
+MAX_DATAGRAMS_PER_WAKEUP = 64
+SELECT_TIMEOUT = 1
+
+
+class UDPReceiveEngine(metaclass=Singleton):
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.terminate = threading.Event()
+        self.receive_thread = None
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+        self._wakeup_receiver.setblocking(False)
+        self.selector.register(self._wakeup_receiver, selectors.EVENT_READ, None)
+
+    def register(self, host, port, callback) -> socket.socket:
+        """
+            Ouvre un socket d'écoute et l'ajoute au moteur. callback reçoit
+            une liste de datagrammes (bytes) à chaque réveil.
+        """
+        skt = udp_server_socket(host, port)
+        self.selector.register(skt, selectors.EVENT_READ, callback)
+        self._start()
+        return skt
+
+    def _start(self) -> None:
+        if self.receive_thread is None:
+            self.terminate.clear()
+            self.receive_thread = threading.Thread(target=self._receive_loop)
+            self.receive_thread.daemon = True
+            self.receive_thread.start()
+        else:
+            self._wakeup()
+
+    def _receive_loop(self) -> None:
+        while not self.terminate.is_set():
+            for key, _ in self.selector.select(SELECT_TIMEOUT):
+                if key.data is None:
+                    self._drain(key.fileobj)
+                    continue
+                datagrams = self._drain(key.fileobj)
+                if datagrams:
+                    self._dispatch(key.data, datagrams)
+
+    @staticmethod
+    def _dispatch(callback, datagrams: list) -> None:
+        # comme socketserver, un paquet fautif ne doit pas arrêter la réception
+        try:
+            callback(datagrams)
+        except Exception:
+            traceback.print_exc()
+
+    @staticmethod
+    def _drain(skt: socket.socket) -> list:
+        datagrams = []
+        while len(datagrams) < MAX_DATAGRAMS_PER_WAKEUP:
+            try:
+                datagrams.append(skt.recv(RECEIVE_BUFFER_SIZE))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # ex.: ICMP port unreachable remonté sur un socket UDP
+                break
+        return datagrams
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_sender.send(b'\0')
+        except OSError:
+            pass
+
+    def stop(self) -> None:
+        """ Arrête le thread de réception et ferme les sockets d'écoute. """
+        if self.receive_thread is None:
+            return
+        self.terminate.set()
+        self._wakeup()
+        self.receive_thread.join()
+        self.receive_thread = None
+        for key in list(self.selector.get_map().values()):
+            if key.data is not None:
+                self.selector.unregister(key.fileobj)
+                key.fileobj.close()
@@ -1,6 +1,8 @@
 # Under MIT License, see LICENSE.txt
 
 import socket
+import struct
+from ipaddress import ip_address
 
 
 def udp_socket(host, port):
@@ -9,3 +11,18 @@ def udp_socket(host, port):
     connection_info = (host, port)
     skt.connect(connection_info)
     return skt
+
+
+def udp_server_socket(host, port):
+    """ Socket non bloquant en écoute sur le port, abonné au groupe si host est multicast. """
+    skt = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    skt.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    skt.bind(('', port))
+    if ip_address(host).is_multicast:
+        skt.setsockopt(socket.IPPROTO_IP,
+                       socket.IP_ADD_MEMBERSHIP,
+                       struct.pack("=4sl",
+                                   socket.inet_aton(host),
+                                   socket.INADDR_ANY))
+    skt.setblocking(False)
+    return skt
@@ -0,0 +1,109 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Lecture minimale du format binaire protobuf. Permet de lire l'en-tête
+    d'un paquet de vision (caméra, numéro de frame) directement dans les
+    octets, sans construire les messages protobuf.
+"""
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+# numéros des champs de SSL_WrapperPacket
+WRAPPER_DETECTION = 1
+WRAPPER_GEOMETRY = 2
+
+# numéros des champs de SSL_DetectionFrame
+DETECTION_FRAME_NUMBER = 1
+DETECTION_T_CAPTURE = 2
+DETECTION_T_SENT = 3
+DETECTION_CAMERA_ID = 4
+
+
+class WireFormatError(ValueError):
+    """ Est levée si les octets ne forment pas un message protobuf valide. """
+    pass
+
+
+def read_varint(data: bytes, pos: int):
+    """ Lit un varint à la position donnée et retourne (valeur, nouvelle position). """
+    result = 0
+    shift = 0
+    try:
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return result, pos
+            shift += 7
+    except IndexError:
+        raise WireFormatError("Varint tronqué.")
+
+
+def read_tag(data: bytes, pos: int):
+    """ Retourne (numéro de champ, type de fil, nouvelle position). """
+    key, pos = read_varint(data, pos)
+    return key >> 3, key & 0x7, pos
+
+
+def skip_field(data: bytes, pos: int, wire_type: int) -> int:
+    """ Saute la valeur d'un champ et retourne la position suivante. """
+    if wire_type == WIRE_VARINT:
+        _, pos = read_varint(data, pos)
+    elif wire_type == WIRE_FIXED64:
+        pos += 8
+    elif wire_type == WIRE_LENGTH_DELIMITED:
+        length, pos = read_varint(data, pos)
+        pos += length
+    elif wire_type == WIRE_FIXED32:
+        pos += 4
+    else:
+        raise WireFormatError("Type de fil {} non supporté.".format(wire_type))
+    if pos > len(data):
+        raise WireFormatError("Champ tronqué.")
+    return pos
+
+
+def peek_vision_header(data: bytes):
+    """
+        Lit l'en-tête d'un SSL_WrapperPacket sérialisé sans le décoder.
+
+        :return: (camera_id, frame_number, has_geometry). camera_id et
+                 frame_number sont None si le paquet n'a pas de détection.
+    """
+    camera_id = None
+    frame_number = None
+    has_geometry = False
+
+    pos = 0
+    end = len(data)
+    while pos < end:
+        field, wire_type, pos = read_tag(data, pos)
+        if field == WRAPPER_DETECTION and wire_type == WIRE_LENGTH_DELIMITED:
+            length, pos = read_varint(data, pos)
+            detection_end = pos + length
+            if detection_end > end:
+                raise WireFormatError("Détection tronquée.")
+            camera_id, frame_number = _peek_detection_header(data, pos, detection_end)
+            pos = detection_end
+        else:
+            has_geometry = has_geometry or field == WRAPPER_GEOMETRY
+            pos = skip_field(data, pos, wire_type)
+
+    return camera_id, frame_number, has_geometry
+
+
+def _peek_detection_header(data: bytes, pos: int, end: int):
+    camera_id = None
+    frame_number = None
+    while pos < end and (camera_id is None or frame_number is None):
+        field, wire_type, pos = read_tag(data, pos)
+        if field == DETECTION_FRAME_NUMBER and wire_type == WIRE_VARINT:
+            frame_number, pos = read_varint(data, pos)
+        elif field == DETECTION_CAMERA_ID and wire_type == WIRE_VARINT:
+            camera_id, pos = read_varint(data, pos)
+        else:
+            pos = skip_field(data, pos, wire_type)
+    return camera_id, frame_number
@@ -3,7 +3,9 @@ import time
 
 from RULEngine.Debug.debug_command import DebugCommand
 from RULEngine.Util.singleton import Singleton
+from RULEngine.Util.stage_timer import HISTOGRAM_EDGES
 from RULEngine.Game.OurPlayer import OurPlayer
+from RULEngine.Util.constant import MAX_ROBOT_ID
 from config.config_service import ConfigService
 
 
@@ -35,12 +37,9 @@ COLOR_ID3 = MAGENTA
 COLOR_ID4 = VIOLET
 COLOR_ID5 = BLUE
 
-COLOR_ID_MAP = {0: COLOR_ID0,
-                1: COLOR_ID1,
-                2: COLOR_ID2,
-                3: COLOR_ID3,
-                4: COLOR_ID4,
-                5: COLOR_ID5}
+# les ids au-delà de 5 reprennent les mêmes couleurs
+COLOR_ID_MAP = {robot_id: (COLOR_ID0, COLOR_ID1, COLOR_ID2, COLOR_ID3, COLOR_ID4, COLOR_ID5)[robot_id % 6]
+                for robot_id in range(MAX_ROBOT_ID + 1)}
 
 DEFAULT_TEXT_SIZE = 14  # px
 DEFAULT_TEXT_FONT = 'Arial'
@@ -182,3 +181,12 @@ class DebugInterface(metaclass=Singleton):
                                   'auto_flag': auto_flag})
         self.debug_state.append(cmd)
 
+    def send_stage_timings(self, stages_summary):
+        """
+        of the form (durations in ms):
+        {'histogram_edges': [...], 'stages': {'ai.play': {'count', 'last', 'mean', 'max', 'p50', 'p95', 'p99',
+                                                        'histogram'}, ...}}
+        """
+        cmd = DebugCommand(1007, {'histogram_edges': [edge * 1000 for edge in HISTOGRAM_EDGES],
+                                  'stages': stages_summary})
+        self.debug_state.append(cmd)
@@ -7,28 +7,48 @@
     frames de la vision. Cette boucle est la boucle principale et appel le
     prochain état du **Coach**.
 """
+import asyncio
+import math
 import signal
 import threading
 import time
 
 from RULEngine.Communication.sender.uidebug_robot_monitor import UIDebugRobotMonitor
 from RULEngine.Command.command import Stop
+from RULEngine.Communication.aio.datagram_endpoint import AsyncDatagramEndpoint
+from RULEngine.Communication.aio.receivers import AsyncRefereeReceiver, AsyncUIDebugCommandReceiver, \
+    AsyncVisionReceiver
+from RULEngine.Communication.aio.senders import AsyncUIDebugCommandSender, AsyncUIDebugVisionSender
 from RULEngine.Communication.protobuf import \
     messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.receiver.log_replay import PacketLogReplay
 from RULEngine.Communication.receiver.referee_receiver import RefereeReceiver
 from RULEngine.Communication.receiver.uidebug_command_receiver import UIDebugCommandReceiver
 from RULEngine.Communication.receiver.vision_receiver import VisionReceiver
 from RULEngine.Communication.sender.uidebug_command_sender import UIDebugCommandSender
 from RULEngine.Communication.sender.uidebug_vision_sender import UIDebugVisionSender
+from RULEngine.Communication.util.packet_log import CHANNEL_REFEREE, CHANNEL_VISION, PacketLogWriter
+from RULEngine.Communication.util.udp_receive_engine import UDPReceiveEngine
 from RULEngine.Communication.util.robot_command_sender_factory import RobotCommandSenderFactory
 from RULEngine.Debug.debug_interface import DebugInterface
 from RULEngine.Game.Game import Game
 from RULEngine.Game.Referee import Referee
+from RULEngine.Util.fixed_rate_scheduler import FixedRateScheduler
 from RULEngine.Util.reference_transfer_object import ReferenceTransferObject
+from RULEngine.Util.latency_tracer import LatencyTracer
 from RULEngine.Util.image_transformer.image_transformer_factory import ImageTransformerFactory
 from RULEngine.Util.team_color_service import TeamColorService
+from RULEngine.Util.stage_timer import StageTimers
+from RULEngine.Util.world_snapshot import SnapshotDoubleBuffer
 from config.config_service import ConfigService
 
+# délai maximal d'attente d'un paquet de vision par le thread d'acquisition
+VISION_INGEST_TIMEOUT = 0.1
+# en rejeu aussi vite que possible, période minimale de la boucle de l'IA
+REPLAY_AS_FAST_AS_POSSIBLE_PERIOD = 0.0001
+# période d'envoi des temps des étapes à l'UI-debug (s)
+STAGE_TIMINGS_PUBLISH_PERIOD = 1.0
+
 
 class Framework(object):
     """
@@ -45,17 +65,29 @@ class Framework(object):
         """
         # config
         self.cfg = ConfigService()
+        self.replay_log = self.cfg.config_dict["COMMUNICATION"]["replay_log"]
+        self.replay_speed = float(self.cfg.config_dict["COMMUNICATION"]["replay_speed"])
+        # le rejeu d'un journal se fait toujours avec le backend threaded
+        self.is_asyncio_backend = self.cfg.config_dict["COMMUNICATION"]["backend"] == "asyncio" \
+            and not self.replay_log
+        self.fast_detection_decoder = self.cfg.config_dict["IMAGE"]["fast_decoder"] == "true"
+        self.asynchronous_fusion = self.cfg.config_dict["IMAGE"]["asynchronous_fusion"] == "true"
 
         # time
         self.last_frame_number = 0
         self.time_stamp = None  # time.time()
         self.last_camera_time = time.time()
-        self.time_of_last_loop = time.time()
         self.ai_timestamp = float(self.cfg.config_dict["GAME"]["ai_timestamp"])
+        self.scheduler = FixedRateScheduler(self._scheduler_period())
+        self.stage_timers = StageTimers()
+        self.latency_tracer = LatencyTracer()
+        self.last_stage_timings_publish = time.monotonic()
 
         # thread
         self.ia_running_thread = None
+        self.vision_ingest_thread = None
         self.thread_terminate = threading.Event()
+        self.snapshot_buffer = SnapshotDoubleBuffer()
 
         # Communication
         self.robot_command_sender = None
@@ -65,6 +97,8 @@ class Framework(object):
         self.uidebug_command_receiver = None
         self.uidebug_vision_sender = None
         self.uidebug_robot_monitor = None
+        self.replay = None
+        self.packet_log = None
         # because this thing below is a callable! can be used without being set
         self.vision_redirection_routine = lambda *args: None
         self.vision_routine = self._sim_vision  # self._normal_vision # self._test_vision self._redirected_vision
@@ -100,27 +134,65 @@ class Framework(object):
     def _choose_vision_routines(self):
         if self.cfg.config_dict["IMAGE"]["kalman"] == "true":
             self.vision_routine = self._kalman_vision
+            if self.cfg.config_dict["IMAGE"]["pipelined"] == "true":
+                self.vision_routine = self._pipelined_vision
+
+    def _scheduler_period(self):
+        """ En rejeu accéléré, l'IA tourne aussi vite que le journal. """
+        if not self.replay_log or self.replay_speed == 1:
+            return self.ai_timestamp
+        if self.replay_speed == 0:
+            return REPLAY_AS_FAST_AS_POSSIBLE_PERIOD
+        return self.ai_timestamp / self.replay_speed
+
+    def _tick_time_delta(self):
+        """ Temps de match écoulé depuis le tour précédent. """
+        if self.replay is not None and self.replay_speed == 0:
+            return self.replay.last_advance
+        return self.scheduler.last_tick_period * (self.replay_speed if self.replay is not None else 1)
 
     def _init_communication(self):
         # first make sure we are not already running
         if self.ia_running_thread is None:
             # where do we send the robots command (serial for bluetooth and rf)
             self.robot_command_sender = RobotCommandSenderFactory.get_sender()
-            # Referee
-            self.referee_command_receiver = RefereeReceiver()
-            # Vision
-            self.vision = VisionReceiver()
+            # with asyncio, the sockets are opened later by the event loop
+            if self.is_asyncio_backend:
+                referee_receiver, vision_receiver = AsyncRefereeReceiver, AsyncVisionReceiver
+                uidebug_sender, uidebug_receiver = AsyncUIDebugCommandSender, AsyncUIDebugCommandReceiver
+                uidebug_vision_sender = AsyncUIDebugVisionSender
+            else:
+                referee_receiver, vision_receiver = RefereeReceiver, VisionReceiver
+                uidebug_sender, uidebug_receiver = UIDebugCommandSender, UIDebugCommandReceiver
+                uidebug_vision_sender = UIDebugVisionSender
+            if self.replay_log:
+                # vision and referee come from a recorded packet log
+                self.replay = PacketLogReplay(self.replay_log, self.replay_speed, self.ai_timestamp)
+                self.referee_command_receiver = self.replay.referee_receiver()
+                self.vision = self.replay.vision_receiver()
+            else:
+                # Referee
+                self.referee_command_receiver = referee_receiver()
+                # Vision
+                self.vision = vision_receiver()
+
+                record_log = self.cfg.config_dict["OUTPUT"]["record_log"]
+                if record_log:
+                    self.packet_log = PacketLogWriter(record_log)
+                    self.vision.record_to(self.packet_log, CHANNEL_VISION)
+                    self.referee_command_receiver.record_to(self.packet_log, CHANNEL_REFEREE)
 
             # do we use the UIDebug?
             if self.cfg.config_dict["DEBUG"]["using_debug"] == "true":
-                self.uidebug_command_sender = UIDebugCommandSender()
-                self.uidebug_command_receiver = UIDebugCommandReceiver()
+                self.uidebug_command_sender = uidebug_sender()
+                self.uidebug_command_receiver = uidebug_receiver()
                 # Monitor robot if we are communicating with an actual robot
                 self.uidebug_robot_monitor = UIDebugRobotMonitor(self.robot_command_sender,
-                                                                 self.debug)
+                                                                 self.debug,
+                                                                 autostart=not self.is_asyncio_backend)
                 # are we redirecting the vision to the uidebug!
                 if self.cfg.config_dict["COMMUNICATION"]["redirect"] == "true":
-                    self.uidebug_vision_sender = UIDebugVisionSender()
+                    self.uidebug_vision_sender = uidebug_vision_sender()
                     self.vision_redirection_routine = self.uidebug_vision_sender.send_packet
 
         else:
@@ -131,11 +203,58 @@ class Framework(object):
 
         self._wait_for_first_frame()
         print(self.vision_routine)
+        if self.vision_routine == self._pipelined_vision:
+            self.vision_ingest_thread = threading.Thread(target=self._vision_ingest_main_loop)
+            self.vision_ingest_thread.start()
         # TODO: Faire arrêter quand l'arbitre signal la fin de la partie
+        self.scheduler.run(self._scheduled_tick, self.thread_terminate)
+
+    def _scheduled_tick(self):
+        """ Un tour de boucle, appelé une fois par période de l'IA. """
+        self.time_stamp = time.time()
+        self.vision_routine()
+
+    def async_game_main_loop(self):
+        """ Boucle principale du backend asyncio: une boucle d'événements possède les I/O et le temps. """
+        asyncio.run(self._async_game_main_loop())
+
+    async def _async_game_main_loop(self):
+        endpoints = [e for e in (self.vision, self.referee_command_receiver, self.robot_command_sender,
+                                 self.uidebug_command_sender, self.uidebug_command_receiver,
+                                 self.uidebug_vision_sender) if isinstance(e, AsyncDatagramEndpoint)]
+        for endpoint in endpoints:
+            await endpoint.open()
+
+        tasks = []
+        try:
+            await self._async_wait_for_first_frame()
+            if self.vision_routine == self._pipelined_vision:
+                tasks.append(asyncio.ensure_future(self._async_vision_ingest_main_loop()))
+            if self.uidebug_robot_monitor:
+                tasks.append(asyncio.ensure_future(self.uidebug_robot_monitor.async_monitor_loop()))
+
+            self.scheduler.start()
+            while not self.thread_terminate.is_set():
+                await asyncio.sleep(self.scheduler.time_until_next_tick())
+                self.scheduler.tick_started()
+                self._scheduled_tick()
+                self.scheduler.tick_finished()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for endpoint in endpoints:
+                endpoint.close()
+
+    async def _async_vision_ingest_main_loop(self):
+        last_ingest_time = time.monotonic()
         while not self.thread_terminate.is_set():
-            self.time_stamp = time.time()
-            self.vision_routine()
-            time.sleep(0)
+            if await self.vision.wait_for_frames(VISION_INGEST_TIMEOUT):
+                last_ingest_time = self._ingest_vision_frames(last_ingest_time)
+
+    async def _async_wait_for_first_frame(self):
+        while not self.vision.get_latest_frame() and not self.thread_terminate.is_set():
+            await asyncio.sleep(0.01)
+            print("En attente d'une image de la vision.")
 
     def start_game(self, p_ia_coach_mainloop, p_ia_coach_initializer):
         """ Démarrage du moteur de l'IA initial, ajustement de l'équipe de l'ia
@@ -153,7 +272,8 @@ class Framework(object):
         self.ia_coach_initializer(self.reference_transfer_object)
 
         signal.signal(signal.SIGINT, self._sigint_handler)
-        self.ia_running_thread = threading.Thread(target=self.game_thread_main_loop)
+        main_loop = self.async_game_main_loop if self.is_asyncio_backend else self.game_thread_main_loop
+        self.ia_running_thread = threading.Thread(target=main_loop)
         self.ia_running_thread.start()
         self.ia_running_thread.join()
 
@@ -177,15 +297,14 @@ class Framework(object):
         self.game.update(vision_frame, time_delta)
 
     def _is_frame_number_different(self, vision_frame):
-        # print(vision_frame.detection.frame_number)
         if vision_frame is not None:
-            return vision_frame.detection.frame_number != self.last_frame_number
+            return vision_frame.frame_number != self.last_frame_number
         else:
             return False
 
     def _compute_vision_time_delta(self, vision_frame):
-        self.last_frame_number = vision_frame.detection.frame_number
-        this_time = vision_frame.detection.t_capture  # time.time()  # vision_frame.detection.t_capture
+        self.last_frame_number = vision_frame.frame_number
+        this_time = vision_frame.t_capture
         time_delta = this_time - self.last_camera_time
         self.last_camera_time = this_time
         # FIXME: hack
@@ -195,10 +314,10 @@ class Framework(object):
         self.incoming_debug += self.uidebug_command_receiver.receive_command()
 
     def _sim_vision(self):
-        vision_frame = self._acquire_last_vision_frame()
-        if vision_frame.detection.frame_number != self.last_frame_number:
-            time_delta = self._compute_vision_time_delta(vision_frame)
-            self.game.update(vision_frame, time_delta)
+        merged_frame, vision_frames = self._pop_and_transform_vision(self.stage_timers.now())
+        self.game.field.update_field_dimensions(vision_frames)
+        if self._is_frame_number_different(merged_frame):
+            self._update_players_and_ball(merged_frame)
             self._update_debug_info()
             robot_commands = self.ia_coach_mainloop()
 
@@ -207,24 +326,129 @@ class Framework(object):
             self._send_debug_commands()
 
     def _kalman_vision(self):
-        vision_frames = self.vision.pop_frames()
-        new_image_packet = self.image_transformer.update(vision_frames)
+        timers = self.stage_timers
+        new_image_packet, vision_frames = self._pop_and_transform_vision(timers.now())
         referee_frames = self.referee_command_receiver.pop_frames()
         self.game.referee.update(referee_frames)
-        if time.time() - self.time_of_last_loop > self.ai_timestamp:
-            time_delta = time.time() - self.time_of_last_loop
+
+        time_delta = self._tick_time_delta()
+        t = timers.now()
+        if self.asynchronous_fusion:
+            self.game.fuse_camera_frames(new_image_packet, self._capture_time_to_local)
+            self.game.apply_snapshot(self.game.kalman_estimate_snapshot(0, time.monotonic(), time_delta), time_delta)
+        else:
             self.game.update(new_image_packet, time_delta)
-            self.game.field.update_field_dimensions(vision_frames)
+        timers.lap("framework.game_update", t)
+        self.latency_tracer.frames_filtered()
+        self.game.field.update_field_dimensions(vision_frames)
 
-            self._update_debug_info()
-            robot_commands = self.ia_coach_mainloop()
+        self._execute_ai_tick()
 
-            # Communication
-            self._send_robot_commands(robot_commands)
-            self.game.set_command(robot_commands)
-            self._send_debug_commands()
-            self._send_new_vision_packet()
-            self.time_of_last_loop = time.time()
+    def _pop_and_transform_vision(self, t):
+        """
+            Vide le tampon de la vision et passe les détections au
+            transformer. Retourne (image du transformer, paquets protobuf pour
+            la géométrie du terrain).
+        """
+        timers = self.stage_timers
+        if self.fast_detection_decoder:
+            detections, vision_frames = self.vision.pop_detection_frames()
+            t = timers.lap("framework.vision_pop", t)
+            self.latency_tracer.detections_popped(detections, self.vision.packet_buffer)
+            new_image_packet = self.image_transformer.update_detections(detections)
+        else:
+            vision_frames = self.vision.pop_frames()
+            t = timers.lap("framework.vision_pop", t)
+            self.latency_tracer.frames_popped(vision_frames, self.vision.packet_buffer)
+            new_image_packet = self.image_transformer.update(vision_frames)
+        timers.lap("framework.image_transformer", t)
+        return new_image_packet, vision_frames
+
+    def _capture_time_to_local(self, t_capture):
+        """
+            Ramène un t_capture de la vision à notre horloge monotone avec le
+            décalage estimé par le traceur de latence. Sans estimé, l'image
+            est datée de sa lecture.
+        """
+        now = time.monotonic()
+        offset = self.latency_tracer.clock_offset.offset
+        if offset is None or not t_capture or math.isnan(t_capture):
+            return now
+        return min(t_capture + offset, now)
+
+    def _vision_ingest_main_loop(self):
+        """
+            Boucle du thread d'acquisition en mode pipeline: filtre chaque
+            nouvelle image au rythme des caméras et publie l'état filtré dans
+            le tampon double, sans jamais attendre le tour de l'IA.
+        """
+        last_ingest_time = time.monotonic()
+        while not self.thread_terminate.is_set():
+            if self.vision.wait_for_frames(VISION_INGEST_TIMEOUT):
+                last_ingest_time = self._ingest_vision_frames(last_ingest_time)
+
+    def _ingest_vision_frames(self, last_ingest_time):
+        """ Filtre les nouvelles frames et publie un instantané. Retourne le temps du filtrage. """
+        timers = self.stage_timers
+        new_image_packet, vision_frames = self._pop_and_transform_vision(timers.now())
+        self.game.field.update_field_dimensions(vision_frames)
+        if not self.image_transformer.new_image_flag:
+            return last_ingest_time
+
+        now = time.monotonic()
+        t = timers.now()
+        if self.asynchronous_fusion:
+            self.game.fuse_camera_frames(new_image_packet, self._capture_time_to_local)
+            snapshot = self.game.kalman_estimate_snapshot(self.snapshot_buffer.next_sequence(), now,
+                                                          now - last_ingest_time)
+        else:
+            snapshot = self.game.kalman_snapshot(new_image_packet, now - last_ingest_time,
+                                                 self.snapshot_buffer.next_sequence(), now)
+        timers.lap("framework.game_update", t)
+        self.snapshot_buffer.publish(snapshot)
+        self.latency_tracer.frames_filtered()
+        return now
+
+    def _pipelined_vision(self):
+        """ Tour de l'IA en mode pipeline: prend le dernier instantané publié. """
+        referee_frames = self.referee_command_receiver.pop_frames()
+        self.game.referee.update(referee_frames)
+
+        snapshot = self.snapshot_buffer.latest()
+        if snapshot is None:
+            return
+        if self.asynchronous_fusion:
+            snapshot = self.game.extrapolate_snapshot(snapshot, time.monotonic())
+        self.game.apply_snapshot(snapshot, self._tick_time_delta())
+
+        self._execute_ai_tick()
+
+    def _execute_ai_tick(self):
+        """ Appelle l'IA sur l'état courant du jeu et envoie ses commandes. """
+        timers = self.stage_timers
+        self._update_debug_info()
+        t = timers.now()
+        robot_commands = self.ia_coach_mainloop()
+        t = timers.lap("framework.ai", t)
+        self.latency_tracer.ai_done()
+
+        # Communication
+        self._send_robot_commands(robot_commands)
+        timers.lap("framework.send_robot_commands", t)
+        self.latency_tracer.commands_sent()
+        self.game.set_command(robot_commands)
+        self._publish_stage_timings()
+        t = timers.now()
+        self._send_debug_commands()
+        timers.lap("framework.send_debug_commands", t)
+        self._send_new_vision_packet()
+
+    def _publish_stage_timings(self):
+        """ Envoie périodiquement le résumé des temps des étapes à l'UI-debug. """
+        now = time.monotonic()
+        if now - self.last_stage_timings_publish >= STAGE_TIMINGS_PUBLISH_PERIOD:
+            self.debug.send_stage_timings(self.stage_timers.summary())
+            self.last_stage_timings_publish = now
 
     """
     def _test_vision(self):
@@ -256,8 +480,17 @@ class Framework(object):
         """
         self.thread_terminate.set()
         self.ia_running_thread.join()
+        if self.vision_ingest_thread is not None:
+            self.vision_ingest_thread.join()
+            self.vision_ingest_thread = None
         self.thread_terminate.clear()
+        print("Ordonnanceur de l'IA:", self.scheduler.stats)
         self.robot_command_sender.stop()
+        UDPReceiveEngine().stop()
+        if self.packet_log is not None:
+            self.packet_log.close()
+        if self.replay is not None:
+            self.replay.close()
         if self.uidebug_robot_monitor:
             self.uidebug_robot_monitor.stop()
         try:
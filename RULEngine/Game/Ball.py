@@ -1,5 +1,4 @@
 # Under MIT License, see LICENSE.txt
-from RULEngine.Util.kalman_filter.ball_kalman_filter import BallKalmanFilter
 from ..Util.Position import Position
 
 
@@ -7,26 +6,37 @@ class Ball:
     kalman_type = 'ball'
 
     def __init__(self):
+        # réécrites en place à chaque image: à copier pour garder une valeur d'une image à l'autre
         self._position = Position()
-        self.velocity = Position()
-        self.kf = BallKalmanFilter()
+        self._velocity = Position()
 
-    def kalman_update(self, poses, delta):
-        # print(poses)
-        ret = self.kf.filter(poses, delta)
-        self._position = Position(ret[0], ret[1])
-        self.velocity = Position(ret[2], ret[3])
+    @staticmethod
+    def position_and_velocity(state):
+        """ Position et vitesse à partir d'un état [x, y, vx, vy] du filtre. """
+        return Position(state[0], state[1]), Position(state[2], state[3])
 
     @property
     def position(self):
         return self._position
 
+    @property
+    def velocity(self):
+        return self._velocity
+
+    def set_state(self, state) -> None:
+        """ Écrit en place un état [x, y, vx, vy] du filtre. """
+        self._position.x, self._position.y, self._velocity.x, self._velocity.y = state.tolist()
+
+    def set_position_and_velocity(self, position: Position, velocity: Position) -> None:
+        self._position.x, self._position.y = position.x, position.y
+        self._velocity.x, self._velocity.y = velocity.x, velocity.y
+
     def set_position(self, pos, delta):
         if pos != self._position and delta != 0:
-            self.velocity.x = (pos.x - self._position.x) / delta
-            self.velocity.y = (pos.y - self._position.y) / delta
+            self._velocity.x = (pos.x - self._position.x) / delta
+            self._velocity.y = (pos.y - self._position.y) / delta
             # FIXME: hack
             # print(math.sqrt(self.velocity.x**2 + self.velocity.y**2))
             # print(delta)
 
-            self._position = pos
+            self._position.x, self._position.y = pos.x, pos.y
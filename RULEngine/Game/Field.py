@@ -2,20 +2,26 @@
 from RULEngine.Game.Ball import Ball
 from config.config_service import ConfigService
 from ..Util.area import *
+from ..Util.field_geometry import FieldGeometry, GEOMETRY_FIELDS, field_constants
 
 
 class Field:
     def __init__(self, ball: Ball):
         self.ball = ball
 
+        # copie: les paquets de géométrie ne modifient pas les dictionnaires du module
         cfg = ConfigService()
         if cfg.config_dict["GAME"]["terrain_type"] == "normal":
-            self.constant = normal
+            self.constant = dict(normal)
         elif cfg.config_dict["GAME"]["terrain_type"] == "small":
-            self.constant = small
+            self.constant = dict(small)
         else:
             print("ERREUR lors de la création de l'objet field\n Mauvais terrain_type en config - normal choisi\n")
-            self.constant = normal
+            self.constant = dict(normal)
+        self._use_distance_grid = cfg.config_dict["GAME"]["field_distance_grid"] == "true"
+        self.geometry = FieldGeometry(self.constant, self._use_distance_grid)
+        # dimensions du dernier SSL_GeometryFieldSize compilé
+        self._dimensions = None
 
     def move_ball(self, position, delta):
         self.ball.set_position(position, delta)
@@ -23,21 +29,8 @@ class Field:
     def is_inside_goal_area(self, position, is_yellow):
         assert (isinstance(position, Position))
         assert (isinstance(is_yellow, bool))
-        x_left = self.constant["FIELD_GOAL_YELLOW_X_LEFT"] if is_yellow else self.constant["FIELD_GOAL_BLUE_X_LEFT"]
-        x_right = self.constant["FIELD_GOAL_YELLOW_X_RIGHT"] if is_yellow else self.constant["FIELD_GOAL_BLUE_X_RIGHT"]
-        top_circle = self.constant["FIELD_GOAL_YELLOW_TOP_CIRCLE"] if is_yellow\
-            else self.constant["FIELD_GOAL_BLUE_TOP_CIRCLE"]
-        bot_circle = self.constant["FIELD_GOAL_YELLOW_BOTTOM_CIRCLE"] if is_yellow\
-            else self.constant["FIELD_GOAL_BLUE_BOTTOM_CIRCLE"]
-        if isInsideSquare(position, self.constant["FIELD_GOAL_Y_TOP"], self.constant["FIELD_GOAL_Y_BOTTOM"],
-                          x_left, x_right):
-            if is_inside_circle(position, top_circle, self.constant["FIELD_GOAL_RADIUS"]):
-                return True
-            elif is_inside_circle(position, bot_circle, self.constant["FIELD_GOAL_RADIUS"]):
-                return True
-            return True
-        else:
-            return False
+        x_left, x_right, y_bottom, y_top = self.geometry.goal_areas[is_yellow]
+        return x_left < position.x < x_right and y_bottom < position.y < y_top
 
     def is_outside_goal_area(self, position, is_yellow):
         return not self.is_inside_goal_area(position, is_yellow)
@@ -47,87 +40,77 @@ class Field:
         if self.is_inside_goal_area(position, is_yellow):
             return Position(position.x, position.y)
         else:
-            x_left = self.constant["FIELD_GOAL_YELLOW_X_LEFT"] if is_yellow else self.constant["FIELD_GOAL_BLUE_X_LEFT"]
-            x_right = self.constant["FIELD_GOAL_YELLOW_X_RIGHT"] if is_yellow\
-                else self.constant["FIELD_GOAL_BLUE_X_RIGHT"]
-            position = stayInsideSquare(position, self.constant["FIELD_GOAL_Y_TOP"],
-                                        self.constant["FIELD_GOAL_Y_BOTTOM"], x_left, x_right)
-            if isInsideSquare(position, self.constant["FIELD_GOAL_Y_TOP"], self.constant["FIELD_GOAL_Y_BOTTOM"],
-                              x_left, x_right):
+            geometry = self.geometry
+            x_left, x_right, y_bottom, y_top = geometry.goal_areas[is_yellow]
+            position = stayInsideSquare(position, y_top, y_bottom, x_left, x_right)
+            if isInsideSquare(position, y_top, y_bottom, x_left, x_right):
                 return position
             else:
-                circle_top = self.constant["FIELD_GOAL_YELLOW_TOP_CIRCLE"] if is_yellow\
-                    else self.constant["FIELD_GOAL_BLUE_TOP_CIRCLE"]
-                circle_bot = self.constant["FIELD_GOAL_YELLOW_BOTTOM_CIRCLE"] if is_yellow\
-                    else self.constant["FIELD_GOAL_BLUE_BOTTOM_CIRCLE"]
+                circle_top, circle_bot = geometry.goal_circles[is_yellow]
                 dst_top = get_distance(circle_top, position)
                 dst_bot = get_distance(circle_bot, position)
 
                 if dst_top >= dst_bot:
-                    return stayInsideCircle(position, circle_top, self.constant["FIELD_GOAL_RADIUS"])
+                    return stayInsideCircle(position, circle_top, geometry.goal_radius)
                 else:
-                    return stayInsideCircle(position, circle_bot, self.constant["FIELD_GOAL_RADIUS"])
+                    return stayInsideCircle(position, circle_bot, geometry.goal_radius)
 
     def stay_outside_goal_area(self, position, is_yellow):
         # TODO Not tested: stayOutsideGoalArea
         if self.is_outside_goal_area(position, is_yellow):
             return Position(position.x, position.y)
         else:
-            x_left = self.constant["FIELD_GOAL_YELLOW_X_LEFT"] if is_yellow else self.constant["FIELD_GOAL_BLUE_X_LEFT"]
-            x_right = self.constant["FIELD_GOAL_YELLOW_X_RIGHT"] if is_yellow\
-                else self.constant["FIELD_GOAL_BLUE_X_RIGHT"]
-            y_top = self.constant["FIELD_GOAL_SEGMENT"] / 2
-            y_bottom = (self.constant["FIELD_GOAL_SEGMENT"] / 2) * -1
-            circle_top = self.constant["FIELD_GOAL_YELLOW_TOP_CIRCLE"] if is_yellow\
-                else self.constant["FIELD_GOAL_BLUE_TOP_CIRCLE"]
-            circle_bot = self.constant["FIELD_GOAL_YELLOW_BOTTOM_CIRCLE"] if is_yellow\
-                else self.constant["FIELD_GOAL_BLUE_BOTTOM_CIRCLE"]
+            geometry = self.geometry
+            x_left, x_right, _, _ = geometry.goal_areas[is_yellow]
+            y_top = geometry.goal_segment / 2
+            y_bottom = (geometry.goal_segment / 2) * -1
+            circle_top, circle_bot = geometry.goal_circles[is_yellow]
             position = stayOutsideSquare(position, y_top, y_bottom, x_left, x_right)
-            position = stayOutsideCircle(position, circle_top, self.constant["FIELD_GOAL_RADIUS"])
-            position = stayOutsideCircle(position, circle_bot, self.constant["FIELD_GOAL_RADIUS"])
+            position = stayOutsideCircle(position, circle_top, geometry.goal_radius)
+            position = stayOutsideCircle(position, circle_bot, geometry.goal_radius)
             return Position(position.x, position.y)
 
+    def legal_distances(self, points):
+        """
+            Distances signées (N,) des points à la zone permise (dans le
+            terrain, hors des zones de défense), positives dedans. Lues dans la
+            grille de distances si elle est activée (GAME field_distance_grid).
+        """
+        geometry = self.geometry
+        if geometry.distance_grid is not None:
+            return geometry.distance_grid.distances(points)
+        return geometry.legal_distances(points)
+
+    def is_legal(self, points, margin=0):
+        """ Masque des points à plus de margin mm dans la zone permise, pour rejeter des échantillons en lot. """
+        return self.legal_distances(points) > margin
+
     def update_field_dimensions(self, packets):
+        """
+            Recompile la géométrie quand un paquet de géométrie annonce des
+            dimensions différentes des dernières compilées; sinon ne fait rien.
+        """
         if not packets:
             return
 
+        field = None
         for packet in packets:
             if packet.HasField("geometry"):
                 field = packet.geometry.field
-                self._line_width = field.line_width
-                self._field_length = field.field_length
-                self._field_width = field.field_width
-                self._boundary_width = field.boundary_width
-                self._referee_width = field.referee_width
-                self._goal_width = field.goal_width
-                self._goal_depth = field.goal_depth
-                self._goal_wall_width = field.goal_wall_width
-                self._center_circle_radius = field.center_circle_radius
-                self._defense_radius = field.defense_radius
-                self._defense_stretch = field.defense_stretch
-                self._free_kick_from_defense_dist = field.free_kick_from_defense_dist
-                self._penalty_spot_from_field_line_dist = field.penalty_spot_from_field_line_dist
-                self._penalty_line_from_spot_dist = field.penalty_line_from_spot_dist
-
-                self.constant["FIELD_Y_TOP"] = self._field_width / 2
-                self.constant["FIELD_Y_BOTTOM"] = -self._field_width / 2
-                self.constant["FIELD_X_LEFT"] = -self._field_length / 2
-                self.constant["FIELD_X_RIGHT"] = self._field_length / 2
-                self.constant["FIELD_GOAL_RADIUS"] = self._defense_radius
-                self.constant["FIELD_GOAL_SEGMENT"] = self._defense_stretch
-
-                self.constant["FIELD_GOAL_Y_TOP"] = self._defense_radius + (self._defense_stretch / 2)
-                self.constant["FIELD_GOAL_Y_BOTTOM"] = -self.constant["FIELD_GOAL_Y_TOP"]
-                self.constant["FIELD_GOAL_BLUE_X_LEFT"] = self.constant["FIELD_X_LEFT"]
-                self.constant["FIELD_GOAL_BLUE_X_RIGHT"] = self.constant["FIELD_X_LEFT"] + self.constant["FIELD_GOAL_RADIUS"]
-                self.constant["FIELD_GOAL_YELLOW_X_LEFT"] = self.constant["FIELD_X_RIGHT"] - self.constant["FIELD_GOAL_RADIUS"]
-                self.constant["FIELD_GOAL_YELLOW_X_RIGHT"] = self.constant["FIELD_X_RIGHT"]
-
-                self.constant["FIELD_GOAL_BLUE_TOP_CIRCLE"] = Position(self.constant["FIELD_X_LEFT"], self.constant["FIELD_GOAL_SEGMENT"] / 2)
-                self.constant["FIELD_GOAL_BLUE_BOTTOM_CIRCLE"] = Position(self.constant["FIELD_X_LEFT"], -self.constant["FIELD_GOAL_SEGMENT"] / 2)
-                self.constant["FIELD_GOAL_YELLOW_TOP_CIRCLE"] = Position(self.constant["FIELD_X_RIGHT"], self.constant["FIELD_GOAL_SEGMENT"] / 2)
-                self.constant["FIELD_GOAL_YELLOW_BOTTOM_CIRCLE"] = Position(self.constant["FIELD_X_RIGHT"], -self.constant["FIELD_GOAL_SEGMENT"] / 2)
+        if field is None:
+            return
+
+        dimensions = tuple(getattr(field, name) for name in GEOMETRY_FIELDS)
+        if dimensions == self._dimensions:
+            return
+        self._dimensions = dimensions
 
+        constant = dict(self.constant)
+        constant.update(field_constants(field))
+        geometry = FieldGeometry(constant, self._use_distance_grid)
+        # en place d'un seul appel: GameState.const partage ce dictionnaire
+        self.constant.update(constant)
+        self.geometry = geometry
 
 
 normal = {
@@ -144,6 +127,7 @@ normal = {
     "FIELD_X_RIGHT": 4500,
     "FIELD_GOAL_RADIUS": 1000,
     "FIELD_GOAL_SEGMENT": 500,
+    "FIELD_PENALTY_SPOT_DISTANCE": 1000,  # de la ligne de but
 
     # Goal Parameters
     "FIELD_GOAL_Y_TOP": 1250,  # FIELD_GOAL_RADIUS + FIELD_GOAL_SEGMENT / 2
@@ -213,6 +197,7 @@ small = {
     "FIELD_X_RIGHT": 1636,
     "FIELD_GOAL_RADIUS": 363,
     "FIELD_GOAL_SEGMENT": 181,
+    "FIELD_PENALTY_SPOT_DISTANCE": 363,  # de la ligne de but
 
     # Goal Parameters
     "FIELD_GOAL_Y_TOP": 536,  # FIELD_GOAL_RADIUS + FIELD_GOAL_SEGMENT / 2
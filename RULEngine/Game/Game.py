@@ -1,11 +1,17 @@
 # Under MIT License, see LICENSE.txt
-from typing import List
+import numpy as np
 
-from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2
 from RULEngine.Game.OurTeam import OurTeam
+from RULEngine.Game.Player import Player
+from RULEngine.Util.image_transformer.camera_frame_store import BLUE, ROBOT_SLOTS, YELLOW, CameraFrameStore, \
+    MergedFrame
+from RULEngine.Util.kalman_filter.ball_hypotheses import BallHypotheses
+from RULEngine.Util.kalman_filter.kalman_filter_bank import ENEMY_PROCESS_VARIANCES, FRIEND_PROCESS_VARIANCES, \
+    KalmanFilterBank
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.Position import Position
 from RULEngine.Util.team_color_service import TeamColor
+from RULEngine.Util.world_snapshot import WorldSnapshot
 
 from RULEngine.Game.Team import Team
 from RULEngine.Game.Ball import Ball
@@ -13,6 +19,9 @@ from RULEngine.Game.Field import Field
 from RULEngine.Game.Referee import Referee
 from config.config_service import ConfigService
 
+# temps (s) sans être vu avant qu'un robot quitte le jeu et que sa piste soit abandonnée
+ROBOT_TRACK_TIMEOUT = 1
+
 
 class Game:
     def __init__(self):
@@ -27,9 +36,18 @@ class Game:
         self.enemies = None
         self.delta_t = None
         self.cmd = None
+        self.robot_kalman_bank = None
+        self.ball_tracker = None
+        # pistes actives: robots vus depuis moins de ROBOT_TRACK_TIMEOUT, piste team_index * ROBOT_SLOTS + id
+        self._active_tracks = np.zeros(0, dtype=int)
+        self._track_active = np.zeros(2 * ROBOT_SLOTS, dtype=bool)
+        self._track_last_seen = np.full(2 * ROBOT_SLOTS, -np.inf)
+        self._track_clock = 0
+        self._default_dt = float(ConfigService().config_dict["GAME"]["ai_timestamp"])
         self._create_teams()
         self.update = self._update
         if ConfigService().config_dict["IMAGE"]["kalman"] == "true":
+            self._create_kalman_bank()
             self.update = self._kalman_update
 
     def set_command(self, cmd):
@@ -56,6 +74,75 @@ class Game:
         else:
             raise ValueError("Config file contains wrong colors!")
 
+    def _create_kalman_bank(self):
+        """
+            Une seule banque de filtres pour les joueurs des deux équipes: la
+            piste d'un joueur est team_index * ROBOT_SLOTS + id et le filtre
+            du joueur devient une vue de cette piste. Seules les pistes
+            actives (voir _see_tracks et _age_tracks) sont filtrées.
+        """
+        teams = (self.blue_team, self.yellow_team)
+        process_variances = [FRIEND_PROCESS_VARIANCES if team is self.friends else ENEMY_PROCESS_VARIANCES
+                             for team in teams for _ in range(ROBOT_SLOTS)]
+        self.robot_kalman_bank = KalmanFilterBank.for_robots(process_variances)
+        self.ball_tracker = BallHypotheses()
+
+    def _see_tracks(self, seen, t) -> None:
+        """
+            Crée les pistes des robots vus pour la première fois et note le
+            temps t où les robots ont été vus. Avec ou sans les filtres, un
+            robot est en jeu tant que sa piste est active.
+        """
+        new = seen & ~self._track_active
+        if new.any():
+            if self.robot_kalman_bank is not None:
+                self.robot_kalman_bank.reset(np.flatnonzero(new), self.robot_kalman_bank.initial_state)
+            self._track_active |= new
+            self._active_tracks = np.flatnonzero(self._track_active)
+        self._track_last_seen[seen] = np.fmax(self._track_last_seen[seen], t)
+
+    def _age_tracks(self, t) -> None:
+        """ Abandonne les pistes des robots qui n'ont pas été vus depuis ROBOT_TRACK_TIMEOUT. """
+        expired = self._track_active & (t - self._track_last_seen > ROBOT_TRACK_TIMEOUT)
+        if expired.any():
+            self._track_active &= ~expired
+            self._active_tracks = np.flatnonzero(self._track_active)
+
+    @staticmethod
+    def _players_from_states(tracks, states):
+        """ (bleus, jaunes): tuples de (player_id, pose, vitesse) des joueurs des pistes données. """
+        teams = ([], [])
+        for track, state in zip(tracks, states):
+            team_index, player_id = divmod(int(track), ROBOT_SLOTS)
+            teams[team_index].append((player_id,) + Player.pose_and_velocity(state))
+        return tuple(teams[0]), tuple(teams[1])
+
+    def _apply_players(self, blue, yellow) -> None:
+        """ Met en jeu exactement les joueurs donnés et publie leurs poses et vitesses. """
+        for team_index, (team, players) in enumerate(((self.blue_team, blue), (self.yellow_team, yellow))):
+            self._update_roster(team_index, team, [player_id for player_id, _, _ in players])
+            for player_id, pose, velocity in players:
+                team.players[player_id].set_pose_and_velocity(pose, velocity)
+
+    def _apply_states(self, tracks, states) -> None:
+        """ Comme _apply_players, en écrivant en place les états du filtre des pistes données. """
+        team_indexes, player_ids = self._update_rosters(tracks)
+        teams = (self.blue_team, self.yellow_team)
+        for team_index, player_id, state in zip(team_indexes.tolist(), player_ids.tolist(), states):
+            teams[team_index].players[player_id].set_state(state)
+
+    def _update_rosters(self, tracks):
+        """ Met en jeu exactement les joueurs des pistes données, retourne (team_indexes, player_ids) des pistes. """
+        team_indexes, player_ids = np.divmod(tracks, ROBOT_SLOTS)
+        for team_index, team in enumerate((self.blue_team, self.yellow_team)):
+            self._update_roster(team_index, team, player_ids[team_indexes == team_index].tolist())
+        return team_indexes, player_ids
+
+    def _update_roster(self, team_index, team, player_ids) -> None:
+        for player_id in team.update_roster(player_ids):
+            if self.robot_kalman_bank is not None:
+                team.players[player_id].kf = self.robot_kalman_bank.view(team_index * ROBOT_SLOTS + player_id)
+
     def update_game_state(self, referee_command):
         # TODO: Réviser code, ça semble louche
         # TODO: remove or change completly! WHAT IS THIS??? MGL 2017/05/14
@@ -68,13 +155,12 @@ class Game:
         # command = Referee.Command(referee_command.command.name)
         # self.referee.command = command
 
-    def _update(self, vision_frame: messages_robocup_ssl_wrapper_pb2, delta: float) -> None:
+    def _update(self, vision_frame: MergedFrame, delta: float) -> None:
         self.delta_t = delta
-        # print(delta)
         self._update_ball(vision_frame, delta)
         self._update_players(vision_frame, delta)
 
-    def _kalman_update(self, vision_frame: List, delta: float) -> None:
+    def _kalman_update(self, vision_frame: CameraFrameStore, delta: float) -> None:
         self.delta_t = delta
         self.kalman_update_ball(vision_frame, delta)
         self.kalman_update_players(vision_frame, delta)
@@ -82,44 +168,111 @@ class Game:
     def is_team_yellow(self):
         return self.our_team_color == TeamColor.YELLOW
 
-    def _update_ball(self, vision_frame, delta):
-        try:
-            ball_position = Position(vision_frame.detection.balls[0].x,
-                                     vision_frame.detection.balls[0].y,
-                                     vision_frame.detection.balls[0].z)
-            self.field.move_ball(ball_position, delta)
-        except IndexError:
-            pass
-            # print("Ball not found")
-
-    def _update_players(self, vision_frame, delta):
-        blue_team = vision_frame.detection.robots_blue
-        yellow_team = vision_frame.detection.robots_yellow
-
-        self._update_players_of_team(blue_team, self.blue_team, delta)
-        self._update_players_of_team(yellow_team, self.yellow_team, delta)
-
-    def kalman_update_ball(self, vision_frame, delta):
-        kalman_list = []
-        for c in vision_frame:
-            kalman_list.append(c["ball"])
-        self.ball.kalman_update(kalman_list, delta)
+    def _update_ball(self, vision_frame: MergedFrame, delta):
+        if vision_frame.ball_valid:
+            self.field.move_ball(vision_frame.ball_position, delta)
+
+    def _update_players(self, vision_frame: MergedFrame, delta):
+        """ Publie les poses des robots vus. Comme avec les filtres, un robot quitte le jeu après ROBOT_TRACK_TIMEOUT. """
+        detections = (vision_frame.players(BLUE), vision_frame.players(YELLOW))
+        seen = np.zeros(len(self._track_active), dtype=bool)
+        for team_index, (player_ids, _) in enumerate(detections):
+            seen[team_index * ROBOT_SLOTS + player_ids] = True
+        self._track_clock += delta or self._default_dt
+        self._see_tracks(seen, self._track_clock)
+        self._age_tracks(self._track_clock)
+        self._update_rosters(self._active_tracks)
+        for team, (player_ids, poses) in zip((self.blue_team, self.yellow_team), detections):
+            self._update_players_of_team(player_ids, poses, team)
+
+    def kalman_update_ball(self, vision_frame: CameraFrameStore, delta):
+        self.ball.set_state(self.ball_tracker.filter(vision_frame.ball_detections(), delta))
+
+    def _kalman_filter_ball(self, vision_frame: CameraFrameStore, delta):
+        return Ball.position_and_velocity(self.ball_tracker.filter(vision_frame.ball_detections(), delta))
 
     def kalman_update_players(self, vision_frame, delta):
-        kalman_blue = [[] for _ in range(0, 6)]
-        kalman_yellow = [[] for _ in range(0, 6)]
-        for c in vision_frame:
-            for i in range(0, 6):
-                kalman_blue[i].append(c["blues"][i])
-                kalman_yellow[i].append(c["yellows"][i])
+        self._apply_states(*self._kalman_filter_tracks(vision_frame, delta))
+
+    def _kalman_filter_players(self, vision_frame, delta):
+        """ Filtre tous les joueurs présents en une passe de la banque, retourne (bleus, jaunes). """
+        return self._players_from_states(*self._kalman_filter_tracks(vision_frame, delta))
 
-        for i in range(0, 6):
-            self.blue_team.update_player(i, kalman_blue[i], delta)
-            self.yellow_team.update_player(i, kalman_yellow[i], delta)
+    def _kalman_filter_tracks(self, vision_frame, delta):
+        """ Filtre tous les joueurs présents en une passe de la banque, retourne (pistes, états). """
+        observations = self._kalman_player_observations(vision_frame)
+        self._track_clock += delta or self.robot_kalman_bank.default_dt
+        self._see_tracks(~np.isnan(observations[:, :, 0]).all(axis=1), self._track_clock)
+        self._age_tracks(self._track_clock)
+        tracks = self._active_tracks
+        return tracks, self.robot_kalman_bank.filter(tracks, observations[tracks], delta)
+
+    @staticmethod
+    def _kalman_player_observations(vision_frame: CameraFrameStore) -> np.ndarray:
+        """ Observations (pistes, caméras, [x, y, orientation]), NaN si la caméra ne voit pas le joueur. """
+        return vision_frame.robot_observations(ROBOT_SLOTS)
+
+    def kalman_snapshot(self, vision_frame: CameraFrameStore, delta: float, sequence: int, timestamp: float) -> WorldSnapshot:
+        """
+            Filtre les frames de la vision et retourne le résultat dans un
+            instantané immuable, sans modifier les objets lus par l'IA.
+        """
+        ball = self._kalman_filter_ball(vision_frame, delta)
+
+        blue, yellow = self._kalman_filter_players(vision_frame, delta)
+
+        return WorldSnapshot(sequence, timestamp, delta, ball, blue, yellow)
+
+    def fuse_camera_frames(self, vision_frame: CameraFrameStore, to_local_time) -> None:
+        """
+            Fusion asynchrone: intègre l'image de chaque caméra mise à jour à
+            son temps de capture, ramené à notre horloge par to_local_time.
+        """
+        observations = self._kalman_player_observations(vision_frame)
+        ball_detections = vision_frame.ball_detections()
+        for camera in sorted(vision_frame.updated_cameras, key=lambda c: vision_frame.t_capture[c]):
+            t = to_local_time(vision_frame.t_capture[camera])
+
+            seen = ~np.isnan(observations[:, camera, 0])
+            if seen.any():
+                self._see_tracks(seen, t)
+                camera_observations = np.full((np.count_nonzero(seen),) + observations.shape[1:], np.nan)
+                camera_observations[:, camera] = observations[seen, camera]
+                self.robot_kalman_bank.fuse(np.flatnonzero(seen), camera_observations, t)
+
+            if vision_frame.ball_count[camera]:
+                self.ball_tracker.fuse(camera, ball_detections[camera], t)
+
+    def kalman_estimate_snapshot(self, sequence: int, timestamp: float, delta: float) -> WorldSnapshot:
+        """ Instantané des estimés de la fusion asynchrone, prédits au temps timestamp de notre horloge. """
+        ball_state = self.ball_tracker.estimate(timestamp)
+        self._age_tracks(timestamp)
+        states = self.robot_kalman_bank.estimate(self._active_tracks, timestamp)
+        blue, yellow = self._players_from_states(self._active_tracks, states)
+
+        return WorldSnapshot(sequence, timestamp, delta, Ball.position_and_velocity(ball_state), blue, yellow)
+
+    @staticmethod
+    def extrapolate_snapshot(snapshot: WorldSnapshot, timestamp: float) -> WorldSnapshot:
+        """ Prédit un instantané jusqu'au temps timestamp avec le modèle à vitesse constante des filtres. """
+        dt = max(timestamp - snapshot.timestamp, 0)
+        position, velocity = snapshot.ball
+        ball = Position(position.x + velocity.x * dt, position.y + velocity.y * dt), velocity
+        blue, yellow = (tuple((player_id, Pose(Position(pose.position.x + velocity.position.x * dt,
+                                                        pose.position.y + velocity.position.y * dt),
+                                               Pose.wrap_to_pi(pose.orientation + velocity.orientation * dt)),
+                                          velocity)
+                              for player_id, pose, velocity in players)
+                        for players in (snapshot.blue, snapshot.yellow))
+        return snapshot._replace(timestamp=timestamp, ball=ball, blue=blue, yellow=yellow)
+
+    def apply_snapshot(self, snapshot: WorldSnapshot, delta: float) -> None:
+        """ Publie un instantané dans les objets du jeu lus par l'IA. """
+        self.delta_t = delta
+        self.ball.set_position_and_velocity(*snapshot.ball)
+        self._apply_players(snapshot.blue, snapshot.yellow)
 
     @staticmethod
-    def _update_players_of_team(players, team, delta):
-        for player in players:
-            player_position = Position(player.x, player.y, player.height)
-            player_pose = Pose(player_position, player.orientation)
-            team.update_player(player.robot_id, player_pose, delta)
+    def _update_players_of_team(player_ids, poses, team):
+        for player_id, (x, y, orientation) in zip(player_ids.tolist(), poses.tolist()):
+            team.players[player_id].set_pose(x, y, orientation)
@@ -1,21 +1,17 @@
 from RULEngine.Game.OurPlayer import OurPlayer
 from RULEngine.Game.Team import Team
-from RULEngine.Util.constant import TeamColor, PLAYER_PER_TEAM
 
 
 class OurTeam(Team):
 
-    def __init__(self, team_color: TeamColor):
-        super().__init__(team_color)
+    def _create_player(self, player_id: int) -> OurPlayer:
         # It is our team so we use our player!
-        for player_id in range(PLAYER_PER_TEAM):
-            self.players[player_id] = OurPlayer(self, player_id)
-            if player_id < 6:
-                self.players[player_id].in_play = True
-                self.available_players[player_id] = self.players[player_id]
+        return OurPlayer(self, player_id)
 
     def _kalman_update(self, player_id, pose_list, delta=0):
         try:
+            if player_id not in self.available_players:
+                self.enter_player(player_id)
             self.players[player_id].update(pose_list, delta)
         except KeyError as err:
             raise err
@@ -25,4 +21,4 @@ class OurTeam(Team):
         try:
             self.players[player_id].set_command(cmd)
         except KeyError as err:
-            raise err
\ No newline at end of file
+            raise err
@@ -1,34 +1,80 @@
 # Under MIT License, see LICENSE.txt
-import RULEngine.Util.Position
-from RULEngine.Util.kalman_filter.enemy_kalman_filter import EnemyKalmanFilter
+from RULEngine.Util.kalman_filter.kalman_filter_bank import ENEMY_PROCESS_VARIANCES, KalmanFilterBank
 from config.config_service import ConfigService
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.Position import Position
 
 
 class Player:
+    # bruit de processus du filtre à soi, quand le joueur n'a pas de piste dans la banque du Game
+    process_variances = ENEMY_PROCESS_VARIANCES
 
     def __init__(self, team, id):
         self.cmd = [0, 0, 0]
         self.id = id
         self.team = team
-        self.pose = Pose()
-        self.velocity = Pose()
-        self.kf = EnemyKalmanFilter()
+        # réécrites en place à chaque image: à copier pour garder une valeur d'une image à l'autre
+        self._pose = Pose()
+        self._velocity = Pose()
+        self.in_play = False
+        self._kf = None
         self.update = self._update
         if ConfigService().config_dict["IMAGE"]["kalman"] == "true":
-            self.update = self._enemy_kalman_update
+            self.update = self._kalman_update
+
+    @property
+    def kf(self):
+        """ Vue de la piste du joueur dans la banque du Game, ou filtre à soi créé au premier usage. """
+        if self._kf is None:
+            self._kf = KalmanFilterBank.for_robots([self.process_variances]).view(0)
+        return self._kf
+
+    @kf.setter
+    def kf(self, kf):
+        self._kf = kf
+
+    @property
+    def pose(self) -> Pose:
+        return self._pose
+
+    @pose.setter
+    def pose(self, pose: Pose):
+        self._pose.set(pose.position.x, pose.position.y, pose.orientation)
+
+    @property
+    def velocity(self) -> Pose:
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, velocity: Pose):
+        self._velocity.set(velocity.position.x, velocity.position.y, velocity.orientation)
 
     def has_id(self, pid):
         return self.id == pid
 
-    def _update(self, pose):
+    def set_pose(self, x: float, y: float, orientation: float) -> None:
+        self._pose.set(x, y, orientation)
+
+    def set_state(self, state) -> None:
+        """ Écrit en place un état [x, y, vx, vy, orientation, vitesse angulaire] du filtre. """
+        x, y, vx, vy, orientation, angular_speed = state.tolist()
+        self._pose.set(x, y, orientation)
+        self._velocity.set(vx, vy, angular_speed)
+
+    def set_pose_and_velocity(self, pose: Pose, velocity: Pose) -> None:
         self.pose = pose
+        self.velocity = velocity
+
+    def _update(self, pose, delta=0):
+        self.pose = pose
+
+    def _kalman_update(self, poses, delta):
+        self.set_state(self.kf.filter(poses, delta))
 
-    def _enemy_kalman_update(self, poses, delta):
-        ret = self.kf.filter(poses, delta)
-        self.pose = Pose(Position(ret[0], ret[1]), ret[4])
-        self.velocity = Pose(Position(ret[2], ret[3]), ret[5])
+    @staticmethod
+    def pose_and_velocity(state):
+        """ Pose et vitesse à partir d'un état [x, y, vx, vy, orientation, vitesse angulaire] du filtre. """
+        return Pose(Position(state[0], state[1]), state[4]), Pose(Position(state[2], state[3]), state[5])
 
     def __str__(self):
         return str(self.team.team_color.name)+" id: "+str(self.id)+"   "+str(hex(id(self)))
@@ -1,21 +1,31 @@
 # Under MIT License, see LICENSE.txt
 
 from RULEngine.Game.Player import Player
-from RULEngine.Util.constant import PLAYER_PER_TEAM
+from RULEngine.Util.constant import MAX_ROBOT_ID
 from RULEngine.Util.team_color_service import TeamColor
 from config.config_service import ConfigService
 
 
+class Roster(dict):
+    """ Joueurs d'une équipe par id, créés la première fois qu'on les demande. """
+
+    def __init__(self, create_player):
+        super().__init__()
+        self._create_player = create_player
+
+    def __missing__(self, player_id):
+        if not 0 <= player_id <= MAX_ROBOT_ID:
+            raise KeyError(player_id)
+        player = self[player_id] = self._create_player(player_id)
+        return player
+
+
 class Team:
     def __init__(self, team_color: TeamColor):
         assert isinstance(team_color, TeamColor)
-        self.players = {}
+        self.players = Roster(self._create_player)
+        # joueurs présents sur le terrain, tenus à jour par la vision
         self.available_players = {}
-        for player_id in range(PLAYER_PER_TEAM):
-            self.players[player_id] = Player(self, player_id)
-            if player_id < 6:
-                self.players[player_id].in_play = True
-                self.available_players[player_id] = self.players[player_id]
 
         self.team_color = team_color
         self.score = 0
@@ -23,6 +33,31 @@ class Team:
         if ConfigService().config_dict["IMAGE"]["kalman"] == "true":
             self.update_player = self._kalman_update
 
+    def _create_player(self, player_id: int) -> Player:
+        return Player(self, player_id)
+
+    def enter_player(self, player_id: int) -> Player:
+        """ Met un joueur en jeu et le retourne. """
+        player = self.players[player_id]
+        player.in_play = True
+        self.available_players[player_id] = player
+        return player
+
+    def leave_player(self, player_id: int) -> None:
+        player = self.available_players.pop(player_id, None)
+        if player is not None:
+            player.in_play = False
+
+    def update_roster(self, player_ids) -> list:
+        """ Garde en jeu exactement les joueurs player_ids, retourne les ids des joueurs entrés. """
+        player_ids = set(player_ids)
+        for player_id in [player_id for player_id in self.available_players if player_id not in player_ids]:
+            self.leave_player(player_id)
+        entered = [player_id for player_id in player_ids if player_id not in self.available_players]
+        for player_id in entered:
+            self.enter_player(player_id)
+        return entered
+
     def has_player(self, player):
         has_player = False
 
@@ -37,12 +72,16 @@ class Team:
 
     def _update_player(self, player_id, pose, delta=0):
         try:
+            if player_id not in self.available_players:
+                self.enter_player(player_id)
             self.players[player_id].update(pose, delta)
         except KeyError as err:
             raise err
 
     def _kalman_update(self, player_id, pose_list, delta=0):
         try:
+            if player_id not in self.available_players:
+                self.enter_player(player_id)
             self.players[player_id].update(pose_list, delta)
         except KeyError as err:
             raise err
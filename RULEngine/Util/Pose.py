@@ -8,6 +8,7 @@ from RULEngine.Util.constant import ORIENTATION_ABSOLUTE_TOLERANCE
 
 
 class Pose(object):
+    __slots__ = ('_position', '_orientation')
 
     def __init__(self, *args):
 
@@ -69,6 +70,12 @@ class Pose(object):
     def orientation(self, orientation):
         self._orientation = Pose.wrap_to_pi(orientation)
 
+    def set(self, x: float, y: float, orientation: float) -> None:
+        """ Réécrit la pose en place, sans créer d'objet. """
+        self._position.x = x
+        self._position.y = y
+        self._orientation = Pose.wrap_to_pi(orientation)
+
     def __add__(self, other: Union['Pose', Position]):
         if isinstance(other, Pose):
             res = Pose(self.position + other.position, self.orientation + other.orientation)
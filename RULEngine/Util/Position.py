@@ -1,95 +1,227 @@
 # Under MIT License, see LICENSE.txt
 
-import numpy as np
+import math
+import numbers
 import warnings
 
+import numpy as np
 
-class Position(np.ndarray):
-
-    def __new__(cls, *args, z=0, abs_tol=0.01):
-        if len(args) == 0:
-            obj = Position(0, 0)
+# tolérance relative de np.allclose, gardée pour que l'égalité ne change pas
+EQUALITY_RELATIVE_TOLERANCE = 1e-05
+
+
+class Position(object):
+    """
+        Vecteur 2D à attributs fixes (__slots__): les calculs scalaires de
+        géométrie ne paient pas la création d'un ndarray par objet. NumPy le
+        voit comme un tableau de deux éléments (__array__), et les ufuncs qui
+        donnent un résultat de forme (2,) retournent une Position, comme
+        lorsque Position était une sous-classe de np.ndarray.
+    """
+    __slots__ = ('x', 'y', 'z', 'abs_tol')
+
+    def __init__(self, *args, z=0, abs_tol=0.01):
+        if len(args) == 2:
+            x, y = args
+        elif len(args) == 0:
+            x, y = 0, 0
         elif len(args) == 1:
-            if isinstance(args[0], list) and len(args[0]) == 2:
-                obj = np.asarray(args[0].copy()).view(cls)
-            elif isinstance(args[0], tuple) and len(args[0]) == 2:
-                obj = np.asarray(args[0]).view(cls)
-            elif isinstance(args[0], Position) and len(args[0]) == 2:
-                obj = np.asarray(args[0].copy()).view(cls)
-            elif isinstance(args[0], np.ndarray) and args[0].size == 2:
-                obj = np.asarray(args[0].copy()).view(cls)
-            else:
-                raise ValueError
-        elif len(args) == 2:
-            obj = np.asarray(args).copy().view(cls)
+            x, y = self._components(args[0])
         else:
             raise ValueError
 
-        obj.x = obj[0]
-        obj.y = obj[1]
-        obj.z = z
-
-        obj.abs_tol = abs_tol
-
-        return obj
-
-    def __array_finalize__(self, obj):
-        if obj is None:
-            return
-        self.z = getattr(obj, 'z', 0)
-        self.abs_tol = getattr(obj, 'abs_tol', 0.01)
-
-    @property
-    def x(self):
-        return float(self[0])
-
-    @x.setter
-    def x(self, x):
-        self[0] = x
-
-    @property
-    def y(self):
-        return float(self[1])
+        self.x = float(x)
+        self.y = float(y)
+        self.z = z
+        self.abs_tol = abs_tol
 
-    @y.setter
-    def y(self, y):
-        self[1] = y
+    @staticmethod
+    def _components(other):
+        if isinstance(other, Position):
+            return other.x, other.y
+        if isinstance(other, (list, tuple)) and len(other) == 2:
+            return other
+        if isinstance(other, np.ndarray) and other.size == 2:
+            return other.ravel().tolist()
+        raise ValueError
 
     def norm(self):
         """Return the distance of the point from the origin"""
-        return float(np.linalg.norm(self.view(np.ndarray)))
+        return math.hypot(self.x, self.y)
 
     def angle(self):
         """Return the angle of the point from the x-axis between -pi and pi"""
         if self == Position(0, 0):
             warnings.warn('Angle is not defined for (0, 0). Result will be 0.')
-        return float(np.arctan2(self[1], self[0]))
+        return math.atan2(self.y, self.x)
 
     def rotate(self, angle):
-        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]).view(Position)
-        return np.dot(rotation, self)
+        cos, sin = math.cos(angle), math.sin(angle)
+        return Position(cos * self.x - sin * self.y, sin * self.x + cos * self.y)
 
     def normalized(self):
-        if self.norm() == 0:
+        norm = self.norm()
+        if norm == 0:
             raise ZeroDivisionError
-        return self / self.norm()
+        return Position(self.x / norm, self.y / norm)
+
+    def copy(self):
+        return Position(self.x, self.y, z=self.z, abs_tol=self.abs_tol)
 
     def __eq__(self, other):
         if isinstance(other, Position):
             min_abs_tol = min(self.abs_tol, other.abs_tol)
-            return np.allclose(self, other, atol=min_abs_tol)
-        # elif isinstance(other, np.ndarray):
-        #     min_abs_tol = min(self.abs_tol, other.position.abs_tol)
-        #     return np.allclose(self, other.position, atol=min_abs_tol)
+            return abs(self.x - other.x) <= min_abs_tol + EQUALITY_RELATIVE_TOLERANCE * abs(other.x) and \
+                abs(self.y - other.y) <= min_abs_tol + EQUALITY_RELATIVE_TOLERANCE * abs(other.y)
         else:
             raise TypeError
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def to_array(self):
+    def __hash__(self):
+        return hash((round(self.x, 3), round(self.y, 3)))
+
+    # Accès comme un tableau de deux éléments
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return np.array((self.x, self.y))[item]
+        if item == 0 or item == -2:
+            return self.x
+        if item == 1 or item == -1:
+            return self.y
+        raise IndexError('Out of range')
+
+    def __setitem__(self, item, value):
+        if item == 0 or item == -2:
+            self.x = float(value)
+        elif item == 1 or item == -1:
+            self.y = float(value)
+        else:
+            raise IndexError('Out of range')
+
+    def __array__(self, dtype=None):
+        return np.array((self.x, self.y), dtype=dtype)
+
+    def __array_wrap__(self, array, context=None, return_scalar=False):
+        # résultats des fonctions NumPy qui passent par np.asarray (np.clip, np.round, ...)
+        if array.shape == (2,):
+            return Position(array)
+        return array if array.ndim else array[()]
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [np.array((value.x, value.y)) if isinstance(value, Position) else value for value in inputs]
+        result = getattr(ufunc, method)(*inputs, **kwargs)
+        if isinstance(result, np.ndarray) and result.shape == (2,) and kwargs.get('out') is None:
+            return Position(result)
+        return result
+
+    # Arithmétique: scalaires, Positions, et tableaux de deux éléments
+
+    def _other_components(self, other):
+        if isinstance(other, Position):
+            return other.x, other.y
+        if isinstance(other, numbers.Real):
+            return other, other
+        if isinstance(other, (np.ndarray, list, tuple)) and np.shape(other) == (2,):
+            return other[0], other[1]
+        return None
+
+    def __add__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return np.add(self, other)
+        return Position(self.x + components[0], self.y + components[1])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return np.subtract(self, other)
+        return Position(self.x - components[0], self.y - components[1])
+
+    def __rsub__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return np.subtract(other, self)
+        return Position(components[0] - self.x, components[1] - self.y)
+
+    def __mul__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return np.multiply(self, other)
+        return Position(self.x * components[0], self.y * components[1])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        components = self._other_components(other)
+        try:
+            return Position(self.x / components[0], self.y / components[1])
+        except (TypeError, ZeroDivisionError):
+            # division par zéro: inf ou nan avec un avertissement, comme NumPy
+            return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        components = self._other_components(other)
+        try:
+            return Position(components[0] / self.x, components[1] / self.y)
+        except (TypeError, ZeroDivisionError):
+            return np.true_divide(other, self)
+
+    def __iadd__(self, other):
+        # en place, comme pour un ndarray: les autres références voient le changement
+        components = self._other_components(other)
+        if components is None:
+            return NotImplemented
+        self.x += components[0]
+        self.y += components[1]
+        return self
+
+    def __isub__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return NotImplemented
+        self.x -= components[0]
+        self.y -= components[1]
+        return self
+
+    def __imul__(self, other):
+        components = self._other_components(other)
+        if components is None:
+            return NotImplemented
+        self.x *= components[0]
+        self.y *= components[1]
+        return self
+
+    def __itruediv__(self, other):
+        result = self / other
+        if not isinstance(result, Position):
+            return NotImplemented
+        self.x, self.y = result.x, result.y
         return self
 
+    def __neg__(self):
+        return Position(-self.x, -self.y)
+
+    def __pos__(self):
+        return Position(self.x, self.y)
+
+    def __abs__(self):
+        return Position(abs(self.x), abs(self.y))
+
+    def to_array(self):
+        return np.array((self.x, self.y))
+
     def conv_2_np(self):
         """Legacy. Do not use."""
         return self.to_array()
@@ -100,11 +232,7 @@ class Position(np.ndarray):
         return Position(array)
 
     def __repr__(self):
-        return 'Position({:8.3f}, {:8.3f})'.format(self[0], self[1])
+        return 'Position({:8.3f}, {:8.3f})'.format(self.x, self.y)
 
     def __str__(self):
-        return '[{:8.3f}, {:8.3f}]'.format(self[0], self[1])
-
-    def __hash__(self):
-        return hash(str(self))
-
+        return '[{:8.3f}, {:8.3f}]'.format(self.x, self.y)
@@ -8,6 +8,10 @@ __author__ = 'RoboCupULaval'
 ROBOT_RADIUS = 90
 BALL_RADIUS = 21
 PLAYER_PER_TEAM = 12
+# plus grand id de robot que la SSL-Vision peut rapporter
+MAX_ROBOT_ID = 15
+# plus grand id de caméra de la SSL-Vision
+MAX_CAMERA_ID = 7
 
 # Communication information
 DEBUG_RECEIVE_BUFFER_SIZE = 100
@@ -0,0 +1,116 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Distances signées du terrain (voir FieldGeometry.field_distances,
+    defense_distances et legal_distances) échantillonnées une fois sur une
+    grille régulière, avec le gradient de la distance à la zone permise.
+    Les requêtes sur des tableaux de points (N, 2) sont des interpolations
+    bilinéaires: elles coûtent le même prix quelle que soit la forme des
+    zones, et sont justes à une case près près des coins.
+
+    Hors de la grille (plus de margin mm hors du terrain), la valeur du
+    bord le plus proche est prolongée de la distance jusqu'à ce bord.
+"""
+import numpy as np
+
+from RULEngine.Util.geometry_kernel import as_points
+
+__author__ = 'RoboCupULaval'
+
+DISTANCE_GRID_RESOLUTION = 20  # mm par case
+DISTANCE_GRID_MARGIN = 500  # mm hors du terrain
+# pas de projection vers la zone permise, pour rattraper l'erreur de l'interpolation
+NEAREST_LEGAL_ITERATIONS = 3
+
+
+class FieldDistanceGrid(object):
+
+    def __init__(self, geometry, resolution=DISTANCE_GRID_RESOLUTION, margin=DISTANCE_GRID_MARGIN):
+        self.resolution = resolution
+        self.x0 = geometry.x_left - margin
+        self.y0 = geometry.y_bottom - margin
+        self.nx = int(np.ceil((geometry.x_right - geometry.x_left + 2 * margin) / resolution)) + 1
+        self.ny = int(np.ceil((geometry.y_top - geometry.y_bottom + 2 * margin) / resolution)) + 1
+
+        xs = self.x0 + resolution * np.arange(self.nx)
+        ys = self.y0 + resolution * np.arange(self.ny)
+        points = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        # (ny, nx): ligne j, colonne i au point (x0 + i * resolution, y0 + j * resolution)
+        self.field = geometry.field_distances(points).reshape(self.ny, self.nx)
+        self.defense = geometry.defense_distances(points).reshape(self.ny, self.nx)
+        self.legal = np.minimum(self.field, self.defense)
+        gradient_y, gradient_x = np.gradient(self.legal, resolution)
+        self.gradient = np.stack((gradient_x, gradient_y), axis=-1)
+
+    def _interpolate(self, grid, points):
+        """ Interpolation bilinéaire de grid aux points ramenés dans la grille, et distance de ce ramenage. """
+        points = as_points(points)
+        fx = np.clip((points[:, 0] - self.x0) / self.resolution, 0, self.nx - 1)
+        fy = np.clip((points[:, 1] - self.y0) / self.resolution, 0, self.ny - 1)
+        i = np.minimum(fx.astype(int), self.nx - 2)
+        j = np.minimum(fy.astype(int), self.ny - 2)
+        tx = (fx - i)[:, np.newaxis] if grid.ndim == 3 else fx - i
+        ty = (fy - j)[:, np.newaxis] if grid.ndim == 3 else fy - j
+        values = (grid[j, i] * (1 - tx) + grid[j, i + 1] * tx) * (1 - ty) + \
+                 (grid[j + 1, i] * (1 - tx) + grid[j + 1, i + 1] * tx) * ty
+        overshoot = np.hypot(points[:, 0] - (self.x0 + fx * self.resolution),
+                             points[:, 1] - (self.y0 + fy * self.resolution))
+        return values, overshoot
+
+    # Requêtes en lot
+
+    def field_distances(self, points) -> np.ndarray:
+        values, overshoot = self._interpolate(self.field, points)
+        return values - overshoot
+
+    def defense_distances(self, points) -> np.ndarray:
+        values, overshoot = self._interpolate(self.defense, points)
+        return values + overshoot
+
+    def distances(self, points) -> np.ndarray:
+        """ Distance signée à la zone permise: positive dans le terrain hors des zones de défense. """
+        values, overshoot = self._interpolate(self.legal, points)
+        return values - overshoot
+
+    def gradients(self, points) -> np.ndarray:
+        """ Gradient (N, 2) de distances, vers l'intérieur de la zone permise. """
+        points = as_points(points)
+        values, overshoot = self._interpolate(self.gradient, points)
+        # hors de la grille: vers la grille
+        outside = overshoot > 0
+        if outside.any():
+            inward = np.column_stack((np.clip(points[outside, 0], self.x0, self.x0 + (self.nx - 1) * self.resolution),
+                                      np.clip(points[outside, 1], self.y0, self.y0 + (self.ny - 1) * self.resolution)))
+            values[outside] = (inward - points[outside]) / overshoot[outside, np.newaxis]
+        return values
+
+    def outside_field(self, points) -> np.ndarray:
+        return self.field_distances(points) < 0
+
+    def inside_defense_area(self, points) -> np.ndarray:
+        """ Dans l'une ou l'autre des zones de défense. """
+        return self.defense_distances(points) < 0
+
+    def is_legal(self, points, margin=0) -> np.ndarray:
+        """ Points à plus de margin mm de la limite, du côté permis: pour rejeter des échantillons en lot. """
+        return self.distances(points) > margin
+
+    def nearest_legal_points(self, points, margin=0) -> np.ndarray:
+        """ Points (N, 2) poussés le long du gradient jusqu'à margin mm dans la zone permise; les autres ne bougent pas. """
+        points = as_points(points).copy()
+        for _ in range(NEAREST_LEGAL_ITERATIONS):
+            missing = margin - self.distances(points)
+            moving = missing > 0
+            if not moving.any():
+                break
+            gradients = self.gradients(points[moving])
+            norms = np.hypot(gradients[:, 0], gradients[:, 1])
+            # sur une crête (au milieu de la ligne de but par exemple), vers le centre de la grille
+            flat = norms == 0
+            if flat.any():
+                center = np.array((self.x0 + (self.nx - 1) * self.resolution / 2,
+                                   self.y0 + (self.ny - 1) * self.resolution / 2))
+                gradients[flat] = center - points[moving][flat]
+                norms[flat] = np.hypot(gradients[flat, 0], gradients[flat, 1])
+                norms[norms == 0] = 1
+            points[moving] += gradients * (missing[moving] / norms)[:, np.newaxis]
+        return points
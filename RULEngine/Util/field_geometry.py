@@ -0,0 +1,153 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Géométrie du terrain compilée une fois à partir des constantes (voir
+    Field): bornes, zones de but, cercles des zones de défense, points de
+    penalty et contour des zones de défense sont précalculés. Un objet
+    FieldGeometry ne change plus une fois construit; Field en construit un
+    nouveau et le remplace d'un bloc quand la vision annonce une géométrie
+    différente.
+
+    Les côtés sont indexés par is_yellow: 0 pour le but bleu, 1 pour le but
+    jaune. Les requêtes en lot prennent des tableaux de points (N, 2) (voir
+    geometry_kernel). Avec distance_grid, les distances signées sont aussi
+    échantillonnées sur une grille (voir field_distance_grid).
+"""
+import numpy as np
+
+from RULEngine.Util.Position import Position
+from RULEngine.Util.field_distance_grid import FieldDistanceGrid
+from RULEngine.Util.geometry_kernel import as_points, point_segment_distances
+
+__author__ = 'RoboCupULaval'
+
+# champs de SSL_GeometryFieldSize qui définissent la géométrie
+GEOMETRY_FIELDS = ("line_width", "field_length", "field_width", "boundary_width", "referee_width", "goal_width",
+                   "goal_depth", "goal_wall_width", "center_circle_radius", "defense_radius", "defense_stretch",
+                   "free_kick_from_defense_dist", "penalty_spot_from_field_line_dist", "penalty_line_from_spot_dist")
+# segments de chaque quart de cercle du contour des zones de défense
+ARC_SEGMENTS = 16
+
+
+def field_constants(field) -> dict:
+    """ Constantes du terrain (clés de Field.constant) tirées d'un SSL_GeometryFieldSize. """
+    constant = {}
+    constant["FIELD_Y_TOP"] = field.field_width / 2
+    constant["FIELD_Y_BOTTOM"] = -field.field_width / 2
+    constant["FIELD_X_LEFT"] = -field.field_length / 2
+    constant["FIELD_X_RIGHT"] = field.field_length / 2
+    constant["FIELD_GOAL_RADIUS"] = field.defense_radius
+    constant["FIELD_GOAL_SEGMENT"] = field.defense_stretch
+    constant["FIELD_PENALTY_SPOT_DISTANCE"] = field.penalty_spot_from_field_line_dist
+
+    constant["FIELD_GOAL_Y_TOP"] = field.defense_radius + (field.defense_stretch / 2)
+    constant["FIELD_GOAL_Y_BOTTOM"] = -constant["FIELD_GOAL_Y_TOP"]
+    constant["FIELD_GOAL_BLUE_X_LEFT"] = constant["FIELD_X_LEFT"]
+    constant["FIELD_GOAL_BLUE_X_RIGHT"] = constant["FIELD_X_LEFT"] + constant["FIELD_GOAL_RADIUS"]
+    constant["FIELD_GOAL_YELLOW_X_LEFT"] = constant["FIELD_X_RIGHT"] - constant["FIELD_GOAL_RADIUS"]
+    constant["FIELD_GOAL_YELLOW_X_RIGHT"] = constant["FIELD_X_RIGHT"]
+
+    constant["FIELD_GOAL_BLUE_TOP_CIRCLE"] = Position(constant["FIELD_X_LEFT"], constant["FIELD_GOAL_SEGMENT"] / 2)
+    constant["FIELD_GOAL_BLUE_BOTTOM_CIRCLE"] = Position(constant["FIELD_X_LEFT"], -constant["FIELD_GOAL_SEGMENT"] / 2)
+    constant["FIELD_GOAL_BLUE_MID_GOAL"] = Position(constant["FIELD_X_LEFT"], 0)
+    constant["FIELD_GOAL_YELLOW_TOP_CIRCLE"] = Position(constant["FIELD_X_RIGHT"], constant["FIELD_GOAL_SEGMENT"] / 2)
+    constant["FIELD_GOAL_YELLOW_BOTTOM_CIRCLE"] = Position(constant["FIELD_X_RIGHT"],
+                                                           -constant["FIELD_GOAL_SEGMENT"] / 2)
+    constant["FIELD_GOAL_YELLOW_MID_GOAL"] = Position(constant["FIELD_X_RIGHT"], 0)
+    return constant
+
+
+class FieldGeometry(object):
+
+    def __init__(self, constant: dict, distance_grid=False):
+        self.x_left = float(constant["FIELD_X_LEFT"])
+        self.x_right = float(constant["FIELD_X_RIGHT"])
+        self.y_bottom = float(constant["FIELD_Y_BOTTOM"])
+        self.y_top = float(constant["FIELD_Y_TOP"])
+        self.goal_radius = float(constant["FIELD_GOAL_RADIUS"])
+        self.goal_segment = float(constant["FIELD_GOAL_SEGMENT"])
+
+        # par côté: (x_left, x_right, y_bottom, y_top) des zones de but
+        self.goal_areas = tuple((float(constant["FIELD_GOAL_{}_X_LEFT".format(color)]),
+                                 float(constant["FIELD_GOAL_{}_X_RIGHT".format(color)]),
+                                 float(constant["FIELD_GOAL_Y_BOTTOM"]), float(constant["FIELD_GOAL_Y_TOP"]))
+                                for color in ("BLUE", "YELLOW"))
+        # par côté: (centre du cercle du haut, centre du cercle du bas)
+        self.goal_circles = tuple((Position(constant["FIELD_GOAL_{}_TOP_CIRCLE".format(color)]),
+                                   Position(constant["FIELD_GOAL_{}_BOTTOM_CIRCLE".format(color)]))
+                                  for color in ("BLUE", "YELLOW"))
+        self.mid_goals = tuple(Position(constant["FIELD_GOAL_{}_MID_GOAL".format(color)])
+                               for color in ("BLUE", "YELLOW"))
+        # du but vers le centre du terrain, en x
+        self.directions = tuple(1.0 if mid_goal.x < 0 else -1.0 for mid_goal in self.mid_goals)
+        penalty_distance = float(constant.get("FIELD_PENALTY_SPOT_DISTANCE", self.goal_radius))
+        self.penalty_spots = tuple(Position(mid_goal.x + direction * penalty_distance, mid_goal.y)
+                                   for mid_goal, direction in zip(self.mid_goals, self.directions))
+
+        self._goal_area_bounds = np.array(self.goal_areas)
+        self._goal_circle_centers = np.array([[(top.x, top.y), (bottom.x, bottom.y)]
+                                              for top, bottom in self.goal_circles])
+        self.defense_boundaries = tuple(self._defense_boundary(side) for side in (0, 1))
+        # grille construite avec la géométrie: elle est remplacée avec elle, d'un bloc
+        self.distance_grid = FieldDistanceGrid(self) if distance_grid else None
+
+    def _defense_boundary(self, side) -> np.ndarray:
+        """ Contour (K, 2) de la zone de défense: quart de cercle du haut, ligne droite, quart de cercle du bas. """
+        top, bottom = self._goal_circle_centers[side]
+        direction = self.directions[side]
+        top_angles = np.linspace(np.pi / 2, 0, ARC_SEGMENTS + 1)
+        bottom_angles = np.linspace(0, -np.pi / 2, ARC_SEGMENTS + 1)
+        top_arc = top + self.goal_radius * np.column_stack((direction * np.cos(top_angles), np.sin(top_angles)))
+        bottom_arc = bottom + self.goal_radius * np.column_stack((direction * np.cos(bottom_angles),
+                                                                  np.sin(bottom_angles)))
+        return np.concatenate((top_arc, bottom_arc))
+
+    # Requêtes en lot
+
+    def inside_field(self, points) -> np.ndarray:
+        points = as_points(points)
+        x, y = points[:, 0], points[:, 1]
+        return (self.x_left < x) & (x < self.x_right) & (self.y_bottom < y) & (y < self.y_top)
+
+    def outside_field(self, points) -> np.ndarray:
+        return ~self.inside_field(points)
+
+    def inside_goal_area(self, points, is_yellow: bool) -> np.ndarray:
+        """ Comme Field.is_inside_goal_area: le rectangle qui englobe la zone de défense. """
+        points = as_points(points)
+        x_left, x_right, y_bottom, y_top = self._goal_area_bounds[int(is_yellow)]
+        x, y = points[:, 0], points[:, 1]
+        return (x_left < x) & (x < x_right) & (y_bottom < y) & (y < y_top)
+
+    def inside_defense_area(self, points, is_yellow: bool) -> np.ndarray:
+        """ Zone de défense exacte: à moins de goal_radius du segment entre les centres, du côté du terrain. """
+        side = int(is_yellow)
+        points = as_points(points)
+        top, bottom = self._goal_circle_centers[side]
+        near = point_segment_distances(points, top, bottom) < self.goal_radius
+        return near & ((points[:, 0] - top[0]) * self.directions[side] > 0)
+
+    # Distances signées, que FieldDistanceGrid échantillonne
+
+    def field_distances(self, points) -> np.ndarray:
+        """ Distance signée à la limite du terrain: positive dedans, négative dehors. """
+        points = as_points(points)
+        center = np.array(((self.x_left + self.x_right) / 2, (self.y_bottom + self.y_top) / 2))
+        half_size = np.array(((self.x_right - self.x_left) / 2, (self.y_top - self.y_bottom) / 2))
+        excess = np.abs(points - center) - half_size
+        outside = np.hypot(np.maximum(excess[:, 0], 0), np.maximum(excess[:, 1], 0))
+        inside = np.minimum(np.maximum(excess[:, 0], excess[:, 1]), 0)
+        return -(outside + inside)
+
+    def defense_distances(self, points) -> np.ndarray:
+        """
+            Distance signée à la zone de défense la plus proche: positive
+            dehors, négative dedans. La moitié des disques derrière la ligne
+            de but, hors du terrain, compte comme zone de défense.
+        """
+        points = as_points(points)
+        return np.min([point_segment_distances(points, top, bottom) - self.goal_radius
+                       for top, bottom in self._goal_circle_centers], axis=0)
+
+    def legal_distances(self, points) -> np.ndarray:
+        """ Distance signée à la zone permise (dans le terrain, hors des zones de défense): positive dedans. """
+        return np.minimum(self.field_distances(points), self.defense_distances(points))
@@ -0,0 +1,107 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Ordonnanceur à période fixe basé sur des échéances absolues d'une horloge
+    monotone. Remplace l'attente active de la boucle principale: le thread
+    dort jusqu'à la prochaine échéance au lieu de sonder l'horloge.
+"""
+import threading
+import time
+
+
+class FixedRateScheduler(object):
+    """
+        Réveille une tâche une fois par période. Les échéances sont calculées
+        à partir de l'échéance précédente (et non de la fin de la tâche) pour
+        que la période réelle ne dérive pas avec la charge. Si une tâche
+        déborde sur une ou plusieurs périodes, les échéances manquées sont
+        sautées plutôt que rattrapées en rafale.
+    """
+
+    def __init__(self, period: float, clock=time.monotonic):
+        assert period > 0, "La période de l'ordonnanceur doit être positive."
+        self.period = period
+        self.clock = clock
+
+        self.next_deadline = None
+        self.last_tick_start = None
+        self.last_tick_period = period
+
+        # statistiques
+        self.tick_count = 0
+        self.overrun_count = 0
+        self.missed_periods = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+
+    def start(self) -> None:
+        """ Fixe la première échéance une période après maintenant. """
+        self.next_deadline = self.clock() + self.period
+        self.last_tick_start = None
+
+    def time_until_next_tick(self) -> float:
+        """ Retourne le temps (s) à dormir avant la prochaine échéance. """
+        if self.next_deadline is None:
+            self.start()
+        return max(0.0, self.next_deadline - self.clock())
+
+    def tick_started(self) -> float:
+        """
+            À appeler au réveil. Enregistre la gigue (retard du réveil sur
+            l'échéance) et retourne le temps écoulé depuis le début du tick
+            précédent.
+        """
+        now = self.clock()
+        jitter = max(0.0, now - self.next_deadline)
+        self.last_jitter = jitter
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.total_jitter += jitter
+        self.tick_count += 1
+
+        if self.last_tick_start is not None:
+            self.last_tick_period = now - self.last_tick_start
+        self.last_tick_start = now
+        return self.last_tick_period
+
+    def tick_finished(self) -> None:
+        """
+            À appeler à la fin de la tâche. Avance l'échéance d'une période et
+            compte un dépassement si la tâche a consommé l'échéance suivante.
+        """
+        self.next_deadline += self.period
+        now = self.clock()
+        if now > self.next_deadline:
+            self.overrun_count += 1
+            skipped = int((now - self.next_deadline) // self.period) + 1
+            self.missed_periods += skipped
+            self.next_deadline += skipped * self.period
+
+    def run(self, task, stop_event: threading.Event) -> None:
+        """
+            Exécute la tâche une fois par période jusqu'à ce que stop_event
+            soit levé. L'attente se fait sur l'événement pour que l'arrêt soit
+            immédiat.
+        """
+        self.start()
+        while not stop_event.is_set():
+            if stop_event.wait(self.time_until_next_tick()):
+                break
+            self.tick_started()
+            task()
+            self.tick_finished()
+
+    @property
+    def mean_jitter(self) -> float:
+        if self.tick_count == 0:
+            return 0.0
+        return self.total_jitter / self.tick_count
+
+    @property
+    def stats(self) -> dict:
+        return {"period": self.period,
+                "tick_count": self.tick_count,
+                "overrun_count": self.overrun_count,
+                "missed_periods": self.missed_periods,
+                "last_jitter": self.last_jitter,
+                "mean_jitter": self.mean_jitter,
+                "max_jitter": self.max_jitter}
@@ -2,25 +2,32 @@
 import math as m
 
 import numpy as np
-import warnings
 
 from ..Util.Position import Position
 from ..Util.Pose import Pose
+from ..Util.geometry_kernel import as_points, nearest_indexes, wrap_to_pi
 
 __author__ = 'RoboCupULaval'
 
 
 def remove_duplicates(seq, concurent_list=None, round_up_threshold=1):
-    seen = set()
-    seen2 = set()
-    seen_add = seen.add
-    seen2_add = seen2.add
-    seq_rounded = round_position_to_number(seq, round_up_threshold)
+    """
+        Retire les positions qui tombent sur la même case de grille
+        (round_up_threshold) qu'une position précédente. Les éléments de
+        concurent_list aux mêmes indices sont retirés avec elles, si la liste
+        est alignée sur seq; sinon elle est retournée telle quelle.
+    """
+    if not seq:
+        return seq if concurent_list is None else (seq, concurent_list)
+    cells = np.round(as_points(seq) / round_up_threshold)
+    _, first_indexes = np.unique(cells, axis=0, return_index=True)
+    kept = np.sort(first_indexes).tolist()
     if concurent_list is None:
-        return [x for idx, x in enumerate(seq) if not seq_rounded[idx] in seen or seen_add(seq_rounded[idx])]
+        return [seq[idx] for idx in kept]
+    elif len(concurent_list) != len(seq):
+        return [seq[idx] for idx in kept], concurent_list
     else:
-        return [x for idx, x in enumerate(seq) if not seq_rounded[idx] in seen or seen_add(seq_rounded[idx])], \
-               [y for idx, y in enumerate(concurent_list) if not seq_rounded[idx] in seen or seen_add(seq_rounded[idx])]
+        return [seq[idx] for idx in kept], [concurent_list[idx] for idx in kept]
 
 
 def round_position_to_number(positions, base=2):
@@ -40,11 +47,7 @@ def get_distance(position_1: Position, position_2: Position) -> float:
         Returns:
             La distance en millimètres entre les deux positions
     """
-    # assert isinstance(position_1, Position)
-    # assert isinstance(position_2, Position)
-    warnings.warn('(position_1 - position_2).norm() should be use instead.')
-    return m.sqrt((position_2.x - position_1.x) ** 2 +
-                  (position_2.y - position_1.y) ** 2)
+    return m.hypot(position_2.x - position_1.x, position_2.y - position_1.y)
 
 
 def get_angle(main_position: Position, other: Position) -> float:
@@ -57,12 +60,7 @@ def get_angle(main_position: Position, other: Position) -> float:
         Returns:
             L'angle entre les deux positions et l'axe des abscisses.
     """
-    assert isinstance(main_position, Position), "TypeError main_position"
-    assert isinstance(other, Position), "TypeError other"
-    warnings.warn('(position_1 - position_2).angle() should be use instead.')
-    position_x = float(other.x - main_position.x)
-    position_y = float(other.y - main_position.y)
-    return m.atan2(position_y, position_x)
+    return m.atan2(other.y - main_position.y, other.x - main_position.x)
 
 
 def get_nearest(ref_position: Position, list_of_position: list, number=1):
@@ -82,20 +80,9 @@ def get_nearest(ref_position: Position, list_of_position: list, number=1):
     assert isinstance(list_of_position, list)
     assert isinstance(number, int)
 
-    dict_position_distance = {}
-    for bot_position in list_of_position:
-        dst = get_distance(ref_position, bot_position)
-
-        while dst in dict_position_distance.keys():
-            dst += 0.1
-        dict_position_distance[dst] = bot_position
-
-    list_sorted = []
-    for i, bot_dst in enumerate(sorted(dict_position_distance.keys())):
-        if i < number:
-            list_sorted.append(dict_position_distance[bot_dst])
-        else:
-            return list_sorted
+    if not list_of_position:
+        return []
+    return [list_of_position[i] for i in nearest_indexes(ref_position, list_of_position, number).tolist()]
 
 
 def get_line_equation(position1: Position, position2: Position) -> tuple:
@@ -137,33 +124,14 @@ def get_closest_point_on_line(reference: Position,
             La position du point de la droite le plus proche de la position de
             référence.
     """
-    assert isinstance(reference, Position)
-    assert isinstance(position1, Position)
-    assert isinstance(position2, Position)
-
     delta_x = position2.x - position1.x
     delta_y = position2.y - position1.y
+    squared_length = delta_x * delta_x + delta_y * delta_y
+    if squared_length == 0:
+        return Position(position1.x, reference.y)
 
-    if delta_x != 0 and delta_y != 0:   # droite quelconque
-        pente = delta_y / delta_x
-        ordonnee = position1.y - pente*position1.x
-
-        pente_orthogonale = -1/pente
-        ordonnee_orthogonale = reference.y - pente_orthogonale*reference.x
-
-        # Calcul des coordonnées de la destination
-        pos_x = (ordonnee_orthogonale - ordonnee)/(pente - pente_orthogonale)
-        pos_y = pente*pos_x + ordonnee
-
-    elif delta_x == 0:  # droite verticale
-        pos_x = position1.x
-        pos_y = reference.y
-
-    elif delta_y == 0:  # droite horizontale
-        pos_x = reference.x
-        pos_y = position1.y
-
-    return Position(pos_x, pos_y)
+    ratio = ((reference.x - position1.x) * delta_x + (reference.y - position1.y) * delta_y) / squared_length
+    return Position(position1.x + ratio * delta_x, position1.y + ratio * delta_y)
 
 
 def get_angle_between_three_points(pointA : Position, pointO : Position, pointB : Position):
@@ -188,10 +156,6 @@ def conv_position_2_list(position: Position):
     return [position.x, position.y]
 
 
-def wrap_to_pi(angle):
-    return (angle + np.pi) % (2 * np.pi) - np.pi
-
-
 def compare_angle(angle1, angle2, abs_tol=0.004):
     return m.isclose(Pose.wrap_to_pi(angle1 - angle2), 0, abs_tol=abs_tol, rel_tol=0)
 
@@ -0,0 +1,90 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Géométrie en lot: les fonctions prennent des tableaux de points
+    (..., [x, y]) qui se diffusent (broadcasting NumPy) les uns contre les
+    autres, pour traiter tous les obstacles ou toutes les paires de points en
+    un seul appel. Les versions scalaires, pour un seul point, sont dans
+    geometry.
+
+    Une droite ou un segment dégénéré (deux extrémités confondues) est
+    ramené à son point de départ.
+"""
+import numpy as np
+
+__author__ = 'RoboCupULaval'
+
+
+def as_points(positions) -> np.ndarray:
+    """ Tableau (N, 2) à partir d'une séquence de Positions ou d'un tableau. """
+    if isinstance(positions, np.ndarray):
+        return positions.reshape(-1, 2).astype(float, copy=False)
+    return np.array([(position[0], position[1]) for position in positions], dtype=float).reshape(-1, 2)
+
+
+def as_point(position) -> np.ndarray:
+    return np.array((position[0], position[1]), dtype=float)
+
+
+def wrap_to_pi(angles):
+    return (angles + np.pi) % (2 * np.pi) - np.pi
+
+
+def distances(points, others) -> np.ndarray:
+    """ Distances entre points et others, diffusés l'un contre l'autre. """
+    delta = np.asarray(points, dtype=float) - np.asarray(others, dtype=float)
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def pairwise_distances(points, others) -> np.ndarray:
+    """ Matrice (N, M) des distances entre les points (N, 2) et les points (M, 2). """
+    return distances(as_points(points)[:, np.newaxis], as_points(others)[np.newaxis])
+
+
+def angles(origins, targets) -> np.ndarray:
+    """ Angles entre -pi et pi des vecteurs origins -> targets. """
+    delta = np.asarray(targets, dtype=float) - np.asarray(origins, dtype=float)
+    return np.arctan2(delta[..., 1], delta[..., 0])
+
+
+def nearest_indexes(point, points, count=1) -> np.ndarray:
+    """ Indices des count points les plus proches de point, du plus proche au plus loin (ordre stable). """
+    return np.argsort(distances(as_points(points), as_point(point)), kind='stable')[:count]
+
+
+def _projection_ratios(points, starts, ends):
+    """ Position t de la projection de chaque point le long de start -> end (0 au départ, 1 à la fin). """
+    points = np.asarray(points, dtype=float)
+    starts = np.asarray(starts, dtype=float)
+    direction = np.asarray(ends, dtype=float) - starts
+    squared_length = np.einsum('...i,...i', direction, direction)
+    dot = np.einsum('...i,...i', points - starts, direction)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(squared_length > 0, dot / squared_length, 0)
+    return ratios, starts, direction
+
+
+def closest_points_on_lines(points, starts, ends) -> np.ndarray:
+    """ Points des droites (start, end) les plus proches des points. """
+    ratios, starts, direction = _projection_ratios(points, starts, ends)
+    return starts + ratios[..., np.newaxis] * direction
+
+
+def closest_points_on_segments(points, starts, ends) -> np.ndarray:
+    """ Points des segments [start, end] les plus proches des points. """
+    ratios, starts, direction = _projection_ratios(points, starts, ends)
+    return starts + np.clip(ratios, 0, 1)[..., np.newaxis] * direction
+
+
+def point_line_distances(points, starts, ends) -> np.ndarray:
+    """ Distances entre les points et les droites (start, end). """
+    return distances(points, closest_points_on_lines(points, starts, ends))
+
+
+def point_segment_distances(points, starts, ends) -> np.ndarray:
+    """ Distances entre les points et les segments [start, end]. """
+    return distances(points, closest_points_on_segments(points, starts, ends))
+
+
+def segments_intersect_circles(starts, ends, centers, radii) -> np.ndarray:
+    """ Vrai où le segment [start, end] touche le disque (center, radius). """
+    return point_segment_distances(centers, starts, ends) <= np.asarray(radii)
@@ -0,0 +1,210 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Dernière image de chaque caméra, rangée en colonnes NumPy préallouées et
+    réécrites en place. Les robots sont rangés (couleur, robot, caméra,
+    [x, y, orientation]), la disposition des observations des filtres de
+    Kalman; une observation absente vaut NaN.
+
+    Les caméras de la SSL-Vision prennent les places du magasin dans l'ordre
+    de leur première image, quel que soit leur id. Quand les ncameras places
+    sont prises, les images d'une autre caméra sont ignorées avec un
+    avertissement.
+"""
+import time
+import warnings
+
+import numpy as np
+
+from RULEngine.Util.constant import MAX_ROBOT_ID
+from RULEngine.Util.Position import Position
+
+BLUE = 0
+YELLOW = 1
+ROBOT_SLOTS = MAX_ROBOT_ID + 1
+BALL_SLOTS = 16
+ROBOT_COMPONENTS = ("x", "y", "orientation")
+BALL_COMPONENTS = ("x", "y")
+
+
+class CameraFrameStore(object):
+
+    def __init__(self, ncameras: int):
+        self.ncameras = ncameras
+        # id SSL de la caméra de chaque place, -1 pour une place libre
+        self.camera_id = np.full(ncameras, -1)
+        self._camera_slots = {}
+        self._rejected_cameras = set()
+        self.frame_number = np.zeros(ncameras, dtype=np.int64)
+        self.t_capture = np.full(ncameras, np.nan)
+        self.timestamp = np.zeros(ncameras)
+        # caméras qui ont reçu une nouvelle image depuis clear_updates
+        self.updated_cameras = []
+
+        self.robot_ids = np.arange(ROBOT_SLOTS)
+        self.robots = np.full((2, ROBOT_SLOTS, ncameras, len(ROBOT_COMPONENTS)), np.nan)
+        self.robot_confidence = np.zeros((2, ROBOT_SLOTS, ncameras))
+        self.robot_valid = np.zeros((2, ROBOT_SLOTS, ncameras), dtype=bool)
+
+        # toutes les balles détectées, et la dernière détectée par caméra
+        self.balls = np.full((ncameras, BALL_SLOTS, len(BALL_COMPONENTS)), np.nan)
+        self.balls_confidence = np.zeros((ncameras, BALL_SLOTS))
+        self.ball_count = np.zeros(ncameras, dtype=int)
+        self.ball = np.full((ncameras, len(BALL_COMPONENTS)), np.nan)
+        self.ball_confidence = np.zeros(ncameras)
+        self.ball_valid = np.zeros(ncameras, dtype=bool)
+
+    def camera_slot(self, camera_id: int):
+        """ Place de la caméra d'id SSL camera_id, prise à sa première image. None s'il ne reste plus de place. """
+        slot = self._camera_slots.get(camera_id)
+        if slot is None:
+            if len(self._camera_slots) < self.ncameras:
+                slot = self._camera_slots[camera_id] = len(self._camera_slots)
+                self.camera_id[slot] = camera_id
+            elif camera_id not in self._rejected_cameras:
+                self._rejected_cameras.add(camera_id)
+                warnings.warn("Images de la caméra {} ignorées: les {} places (number_of_camera) sont prises par les "
+                              "caméras {}".format(camera_id, self.ncameras, self.camera_id.tolist()))
+        return slot
+
+    def is_new_frame(self, camera_id: int, frame_number: int) -> bool:
+        """ camera_id est une place du magasin (voir camera_slot). """
+        return frame_number > self.frame_number[camera_id]
+
+    def clear_updates(self) -> None:
+        self.updated_cameras = []
+
+    def begin_frame(self, camera_id: int, frame_number: int, t_capture: float, timestamp: float) -> None:
+        """ Oublie l'image précédente de la caméra avant d'y écrire la nouvelle. """
+        if camera_id not in self.updated_cameras:
+            self.updated_cameras.append(camera_id)
+        self.frame_number[camera_id] = frame_number
+        self.t_capture[camera_id] = t_capture
+        self.timestamp[camera_id] = timestamp
+        self.robots[:, :, camera_id] = np.nan
+        self.robot_confidence[:, :, camera_id] = 0
+        self.robot_valid[:, :, camera_id] = False
+        self.balls[camera_id] = np.nan
+        self.balls_confidence[camera_id] = 0
+        self.ball_count[camera_id] = 0
+        self.ball[camera_id] = np.nan
+        self.ball_confidence[camera_id] = 0
+        self.ball_valid[camera_id] = False
+
+    def set_ball(self, camera_id: int, x: float, y: float, confidence: float) -> None:
+        count = self.ball_count[camera_id]
+        if count < BALL_SLOTS:
+            self.balls[camera_id, count] = x, y
+            self.balls_confidence[camera_id, count] = confidence
+            self.ball_count[camera_id] = count + 1
+        self.ball[camera_id] = x, y
+        self.ball_confidence[camera_id] = confidence
+        self.ball_valid[camera_id] = True
+
+    def set_robot(self, color: int, camera_id: int, robot_id: int, x: float, y: float, orientation: float,
+                  confidence: float) -> None:
+        if robot_id >= ROBOT_SLOTS:
+            return
+        self.robots[color, robot_id, camera_id] = x, y, orientation
+        self.robot_confidence[color, robot_id, camera_id] = confidence
+        self.robot_valid[color, robot_id, camera_id] = True
+
+    def set_robots(self, color: int, camera_id: int, rows: np.ndarray) -> None:
+        """ Écrit des lignes [robot_id, x, y, orientation, confiance] (voir detection_decoder) d'un coup. """
+        robot_ids = rows[:, 0].astype(int)
+        rows = rows[robot_ids < ROBOT_SLOTS]
+        robot_ids = robot_ids[robot_ids < ROBOT_SLOTS]
+        self.robots[color, robot_ids, camera_id] = rows[:, 1:4]
+        self.robot_confidence[color, robot_ids, camera_id] = rows[:, 4]
+        self.robot_valid[color, robot_ids, camera_id] = True
+
+    def update_packets(self, packets) -> bool:
+        """ Range les nouvelles images de paquets protobuf SSL_WrapperPacket, retourne vrai s'il y en a. """
+        new_image = False
+        for packet in packets:
+            if packet.HasField("detection"):
+                detection = packet.detection
+                c_id = self.camera_slot(detection.camera_id)
+
+                if c_id is not None and self.is_new_frame(c_id, detection.frame_number):
+                    self.begin_frame(c_id, detection.frame_number, detection.t_capture, time.time())
+
+                    for ball in detection.balls:
+                        self.set_ball(c_id, ball.x, ball.y, ball.confidence)
+
+                    for color, robots in ((BLUE, detection.robots_blue), (YELLOW, detection.robots_yellow)):
+                        for robot in robots:
+                            self.set_robot(color, c_id, robot.robot_id, robot.x, robot.y, robot.orientation,
+                                           robot.confidence)
+
+                    new_image = True
+        return new_image
+
+    def update_detections(self, detections) -> bool:
+        """ Comme update_packets, à partir des DetectionArrays du décodeur spécialisé. """
+        new_image = False
+        for detection in detections:
+            c_id = self.camera_slot(detection.camera_id)
+
+            if c_id is not None and self.is_new_frame(c_id, detection.frame_number):
+                self.begin_frame(c_id, detection.frame_number, detection.t_capture, time.time())
+
+                for x, y, confidence in detection.balls[:detection.ball_count]:
+                    self.set_ball(c_id, x, y, confidence)
+
+                self.set_robots(BLUE, c_id, detection.blues[:detection.blue_count])
+                self.set_robots(YELLOW, c_id, detection.yellows[:detection.yellow_count])
+
+                new_image = True
+        return new_image
+
+    def robot_observations(self, robots_per_team: int) -> np.ndarray:
+        """ Observations (bleus puis jaunes, caméras, [x, y, orientation]) des robots 0 à robots_per_team - 1. """
+        return self.robots[:, :robots_per_team].reshape(2 * robots_per_team, self.ncameras, len(ROBOT_COMPONENTS))
+
+    def ball_observations(self) -> np.ndarray:
+        """ Observations (caméras, [x, y]) de la balle: la dernière détectée par chaque caméra. """
+        return self.ball
+
+    def ball_detections(self) -> np.ndarray:
+        """ Toutes les balles détectées (caméras, BALL_SLOTS, [x, y]), NaN au-delà de ball_count. """
+        return self.balls
+
+
+class MergedFrame(object):
+    """
+        Image unique de toutes les caméras: pour chaque robot et pour la balle,
+        la détection la plus sûre parmi les dernières images des caméras.
+        Les tableaux sont préalloués et réécrits en place à chaque fusion.
+    """
+
+    def __init__(self):
+        self.frame_number = 0
+        self.t_capture = 0
+        self.robot_ids = np.arange(ROBOT_SLOTS)
+        self.robots = np.full((2, ROBOT_SLOTS, len(ROBOT_COMPONENTS)), np.nan)
+        self.robot_valid = np.zeros((2, ROBOT_SLOTS), dtype=bool)
+        self.ball = np.full(len(BALL_COMPONENTS), np.nan)
+        self.ball_position = Position(np.nan, np.nan)
+        self.ball_valid = False
+
+    def merge(self, store: CameraFrameStore) -> None:
+        """ Garde, par robot et pour la balle, la détection de plus grande confiance. """
+        best_camera = np.argmax(store.robot_confidence, axis=2)[..., np.newaxis]
+        best_confidence = np.take_along_axis(store.robot_confidence, best_camera, axis=2)[..., 0]
+        self.robots[:] = np.take_along_axis(store.robots, best_camera[..., np.newaxis], axis=2)[:, :, 0]
+        # comme avant, une détection de confiance nulle est ignorée
+        np.greater(best_confidence, 0, out=self.robot_valid)
+
+        best_ball = np.unravel_index(np.argmax(store.balls_confidence), store.balls_confidence.shape)
+        self.ball_valid = bool(store.balls_confidence[best_ball] > 0)
+        if self.ball_valid:
+            self.ball[:] = store.balls[best_ball]
+            self.ball_position.x, self.ball_position.y = self.ball.tolist()
+
+        self.frame_number += 1
+        self.t_capture = np.nanmax(store.t_capture) if not np.all(np.isnan(store.t_capture)) else 0
+
+    def players(self, color: int):
+        """ (ids, [x, y, orientation]) des robots vus d'une couleur. """
+        valid = self.robot_valid[color]
+        return self.robot_ids[valid], self.robots[color, valid]
@@ -0,0 +1,120 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Plusieurs hypothèses de balle suivies en parallèle dans une banque de
+    filtres de Kalman. Chaque détection est associée à l'hypothèse la plus
+    proche au sens de Mahalanobis si elle tombe dans sa fenêtre; une
+    détection hors de toutes les fenêtres (reflet, balle d'un autre terrain,
+    balle qui vient d'être replacée) démarre une nouvelle hypothèse à la
+    place de la moins crédible. La balle publiée est l'hypothèse dont le
+    score, le nombre d'images récentes où elle a été confirmée, est le plus
+    élevé: une détection parasite isolée ne déplace donc plus la balle, mais
+    une balle qui réapparaît ailleurs et y reste finit par l'emporter.
+
+    Sans fenêtrage (outlier_gating=false), une seule hypothèse est suivie
+    avec la dernière balle détectée par chaque caméra, comme avant.
+"""
+import numpy as np
+
+from config.config_service import ConfigService
+from RULEngine.Util.kalman_filter.kalman_filter_bank import BALL_OBSERVED_COMPONENTS, KalmanFilterBank
+
+BALL_HYPOTHESES = 4
+# à chaque image, le score d'une hypothèse est multiplié par ce facteur puis augmenté de 1 si elle est confirmée
+HYPOTHESIS_SCORE_DECAY = 0.8
+# deux détections plus proches que cette distance (mm) démarrent une seule hypothèse
+NEW_HYPOTHESIS_RADIUS = 100
+
+
+class BallHypotheses(object):
+
+    def __init__(self, ncameras=None, size=BALL_HYPOTHESES, gating=None):
+        if gating is None:
+            gating = ConfigService().config_dict["IMAGE"]["outlier_gating"] == "true"
+        self.gating = gating
+        self.size = size if gating else 1
+        self.bank = KalmanFilterBank.for_ball(ncameras, gating=False, size=self.size)
+        self.tracks = np.arange(self.size)
+        self.scores = np.zeros(self.size)
+        self.alive = np.zeros(self.size, dtype=bool)
+        self.best = 0
+
+    def filter(self, detections, dt) -> np.ndarray:
+        """
+            :param detections: balles détectées (caméras, K, [x, y]), NaN si absentes
+            :return: état [x, y, vx, vy] de la meilleure hypothèse
+        """
+        observations = self._associate(self.bank.x, self.bank.P, detections)
+        states = self.bank.filter(self.tracks, observations, dt)
+        self._score(observations)
+        return states[self.best]
+
+    def fuse(self, camera, detections, t) -> None:
+        """ Fusion asynchrone des balles (K, [x, y]) vues par une caméra à son temps de capture t. """
+        camera_detections = np.full((self.bank.ncameras,) + detections.shape, np.nan)
+        camera_detections[camera] = detections
+        observations = self._associate(self.bank.estimate(self.tracks, t), self.bank.P, camera_detections)
+        self.bank.fuse(self.tracks, observations, t)
+        self._score(observations)
+
+    def estimate(self, t) -> np.ndarray:
+        """ État de la meilleure hypothèse prédit au temps t. """
+        return self.bank.estimate(self.tracks[[self.best]], t)[0]
+
+    def _associate(self, x, P, detections) -> np.ndarray:
+        """ Observations (hypothèses, caméras, [x, y]) des hypothèses, une détection au plus par caméra. """
+        ncameras = detections.shape[0]
+        observations = np.full((self.size, ncameras, len(BALL_OBSERVED_COMPONENTS)), np.nan)
+        valid = ~np.isnan(detections[..., 0])
+        if not valid.any():
+            return observations
+        if not self.gating:
+            for camera in np.flatnonzero(valid.any(axis=1)):
+                observations[0, camera] = detections[camera, np.flatnonzero(valid[camera])[-1]]
+            return observations
+
+        flat = detections.reshape(-1, detections.shape[-1])
+        inside = self.bank.in_gate(x, P, flat) & self.alive[:, np.newaxis]
+        distances = np.where(inside, self.bank.squared_mahalanobis(x, P, flat), np.inf)
+        distances = distances.reshape(self.size, ncameras, -1)
+        nearest = np.argmin(distances, axis=0)
+        nearest_distance = np.min(distances, axis=0)
+        assigned = valid & np.isfinite(nearest_distance)
+
+        # la plus proche en dernier: c'est elle que l'hypothèse garde pour cette caméra
+        cameras, indexes = np.nonzero(assigned)
+        for i in np.argsort(-nearest_distance[cameras, indexes]):
+            camera, index = cameras[i], indexes[i]
+            observations[nearest[camera, index], camera] = detections[camera, index]
+
+        spawned = []
+        for camera, index in zip(*np.nonzero(valid & ~assigned)):
+            position = detections[camera, index]
+            for hypothesis in spawned:
+                if np.hypot(*(self.bank.x[hypothesis, :2] - position)) < NEW_HYPOTHESIS_RADIUS:
+                    observations[hypothesis, camera] = position
+                    break
+            else:
+                hypothesis = self._replaceable_hypothesis(spawned)
+                if hypothesis is None:
+                    continue
+                self.bank.reset(np.array([hypothesis]), np.concatenate((position, [0, 0])))
+                self.scores[hypothesis] = 0
+                self.alive[hypothesis] = True
+                observations[hypothesis] = np.nan
+                observations[hypothesis, camera] = position
+                spawned.append(hypothesis)
+        return observations
+
+    def _replaceable_hypothesis(self, spawned):
+        """ Hypothèse la moins crédible, en gardant la meilleure et celles démarrées à cette image. """
+        scores = np.where(self.alive, self.scores, -np.inf)
+        if self.alive[self.best]:
+            scores[self.best] = np.inf
+        scores[spawned] = np.inf
+        hypothesis = int(np.argmin(scores))
+        return None if np.isinf(scores[hypothesis]) and scores[hypothesis] > 0 else hypothesis
+
+    def _score(self, observations) -> None:
+        confirmed = ~np.all(np.isnan(observations[..., 0]), axis=1)
+        self.scores = self.scores * HYPOTHESIS_SCORE_DECAY + confirmed
+        self.best = int(np.argmax(np.where(self.alive, self.scores, -np.inf))) if self.alive.any() else 0
@@ -0,0 +1,461 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Banque de filtres de Kalman: les états et covariances de toutes les
+    pistes (robots ou balle) sont empilés dans des tableaux (N, n) et
+    (N, n, n), et la mise à jour puis la prédiction de toutes les pistes se
+    font en une passe NumPy par frame.
+
+    Les observations manquantes (caméra qui ne voit pas l'objet) sont
+    traitées en mettant à zéro leurs lignes de H et leur innovation: leur
+    gain est alors nul et elles ne changent ni l'état ni la covariance. Une
+    piste sans aucune observation n'est que prédite, comme avec les filtres
+    individuels.
+
+    En mode séquentiel, les observations sont intégrées une composante à la
+    fois. R étant diagonale, chaque étape est une mise à jour scalaire sans
+    inversion de matrice, et seules les caméras qui ont vu au moins une
+    piste sont parcourues.
+
+    En mode gain permanent, une piste dont la covariance a convergé vers le
+    régime permanent de son groupe (bruit de processus, dt arrondi, caméras
+    qui la voient) utilise le gain en cache de ce groupe: sa mise à jour
+    n'est plus qu'un produit matrice-vecteur et sa covariance n'est plus
+    propagée. Si les caméras qui la voient changent, la covariance du régime
+    précédent ne correspond plus et la piste repasse en propagation complète.
+
+    Avec le fenêtrage, une observation dont la distance de Mahalanobis à la
+    prédiction dépasse le seuil du chi carré est rejetée avant la mise à
+    jour, pour toutes les pistes à la fois. Une piste dont toutes les
+    observations sont rejetées trop longtemps est considérée perdue et
+    repart de ses observations.
+"""
+import numpy as np
+
+from config.config_service import ConfigService
+
+# composantes de l'état des robots: x, y, vx, vy, orientation, vitesse angulaire
+ROBOT_STATE_SIZE = 6
+ROBOT_OBSERVED_COMPONENTS = (0, 1, 4)
+ROBOT_ANGLE_COMPONENT = 4
+ROBOT_OBSERVATION_VARIANCES = (10 ** 0, 10 ** 0, 10 ** (-3))
+ROBOT_INITIAL_STATE = (9999, 9999, 0, 0, 0, 0)
+FRIEND_PROCESS_VARIANCES = (10 ** 0, 10 ** 0, 10 ** 1, 10 ** 1, 10 ** (-1), 10 ** (-1))
+ENEMY_PROCESS_VARIANCES = (10 ** 0, 10 ** 0, 10 ** 0, 10 ** 0, 10 ** 2, 10 ** (-1))
+
+# composantes de l'état de la balle: x, y, vx, vy
+BALL_STATE_SIZE = 4
+BALL_OBSERVED_COMPONENTS = (0, 1)
+BALL_OBSERVATION_VARIANCES = (10 ** 0, 10 ** 0)
+BALL_INITIAL_STATE = (0, 0, 0, 0)
+BALL_PROCESS_VARIANCES = (10 ** 0, 10 ** 0, 10 ** 0, 10 ** 0)
+
+INITIAL_COVARIANCE = 10 ** 3
+
+STEADY_STATE_DT_BUCKET = 0.0005  # s
+# écart entre la covariance d'une piste et celle du régime permanent, relatif à la plus grande variance de celle-ci
+STEADY_STATE_TOLERANCE = 10 ** (-2)
+RICCATI_TOLERANCE = 10 ** (-12)
+RICCATI_MAX_ITERATIONS = 100
+
+# seuils du chi carré à 99.9 % selon le nombre de composantes observées
+GATE_THRESHOLDS = {2: 13.82, 3: 16.27}
+# au-delà de cette variance de position (mm^2), une piste n'est pas fenêtrée
+GATE_MAX_POSITION_VARIANCE = 100
+# une observation à moins de cette distance (mm) de la position prédite est toujours gardée: le modèle à
+# vitesse constante sous-estime les accélérations des robots et de la balle
+GATE_MIN_DISTANCE = 250
+# images consécutives entièrement rejetées avant de réinitialiser une piste
+GATE_MAX_REJECTIONS = 10
+
+
+def constant_velocity_transition(state_size, dt):
+    """ Modèle de transition à vitesse constante: chaque position paire avance de dt fois sa vitesse. """
+    transition = np.eye(state_size)
+    if state_size == ROBOT_STATE_SIZE:
+        transition[0, 2] = transition[1, 3] = transition[4, 5] = dt
+    else:
+        transition[0, 2] = transition[1, 3] = dt
+    return transition
+
+
+def constant_velocity_transitions(state_size, dts) -> np.ndarray:
+    """ Modèles de transition (len(dts), n, n), un par pas de temps. """
+    transitions = np.tile(np.eye(state_size), (len(dts), 1, 1))
+    transitions[:, 0, 2] = transitions[:, 1, 3] = dts
+    if state_size == ROBOT_STATE_SIZE:
+        transitions[:, 4, 5] = dts
+    return transitions
+
+
+class KalmanFilterBank(object):
+    """
+        N pistes partageant les mêmes modèles de transition et d'observation.
+        Chaque piste a sa propre covariance de bruit de processus.
+    """
+
+    def __init__(self, process_variances, state_size, observed_components, observation_variances,
+                 initial_state, angle_component=None, ncameras=None, sequential=None, steady_state_gain=None,
+                 gating=None):
+        cfg = ConfigService()
+        self.default_dt = float(cfg.config_dict["GAME"]["ai_timestamp"])
+        if ncameras is None:
+            ncameras = int(cfg.config_dict["IMAGE"]["number_of_camera"])
+        if sequential is None:
+            sequential = cfg.config_dict["IMAGE"]["sequential_update"] == "true"
+        if steady_state_gain is None:
+            steady_state_gain = cfg.config_dict["IMAGE"]["steady_state_gain"] == "true"
+        if gating is None:
+            gating = cfg.config_dict["IMAGE"]["outlier_gating"] == "true"
+        self.ncameras = ncameras
+        self.sequential = sequential
+        self.steady_state_gain = steady_state_gain
+        self.gating = gating
+        self.size = len(process_variances)
+        self.state_size = state_size
+        self.angle_component = angle_component
+
+        self.initial_state = np.array(initial_state, dtype=float)
+        self.x = np.tile(self.initial_state, (self.size, 1))
+        self.P = np.tile(INITIAL_COVARIANCE * np.eye(state_size), (self.size, 1, 1))
+        self.rejections = np.zeros(self.size, dtype=int)
+        # temps de l'estimé de chaque piste en fusion asynchrone, NaN avant la première image
+        self.t = np.full(self.size, np.nan)
+        self.Q = np.array([np.diag(variances) for variances in process_variances], dtype=float)
+        # les pistes de même bruit de processus partagent leurs régimes permanents
+        profiles, self._profiles = np.unique(np.array(process_variances, dtype=float), axis=0, return_inverse=True)
+        self._profile_Q = [np.diag(variances) for variances in profiles]
+        self._steady_states = {}
+
+        # H et R empilés par caméra: ligne (caméra, composante observée)
+        observation_count = len(observed_components)
+        self.H = np.zeros((ncameras * observation_count, state_size))
+        for camera in range(ncameras):
+            for i, component in enumerate(observed_components):
+                self.H[camera * observation_count + i, component] = 1
+        self.R = np.diag(np.tile(np.array(observation_variances, dtype=float), ncameras))
+        self.observed_components = observed_components
+        self.observation_variances = observation_variances
+        # index de l'angle dans le vecteur d'observation d'une caméra
+        self._observed_angle = observed_components.index(angle_component) if angle_component is not None else None
+
+        self._dt = None
+        self._F = None
+
+    @classmethod
+    def for_robots(cls, process_variances, ncameras=None, sequential=None, steady_state_gain=None, gating=None):
+        return cls(process_variances, ROBOT_STATE_SIZE, ROBOT_OBSERVED_COMPONENTS, ROBOT_OBSERVATION_VARIANCES,
+                   ROBOT_INITIAL_STATE, ROBOT_ANGLE_COMPONENT, ncameras, sequential, steady_state_gain, gating)
+
+    @classmethod
+    def for_ball(cls, ncameras=None, sequential=None, steady_state_gain=None, gating=None, size=1):
+        return cls([BALL_PROCESS_VARIANCES] * size, BALL_STATE_SIZE, BALL_OBSERVED_COMPONENTS,
+                   BALL_OBSERVATION_VARIANCES, BALL_INITIAL_STATE, None, ncameras, sequential, steady_state_gain, gating)
+
+    @property
+    def observation_size(self):
+        return self.H.shape[0] // self.ncameras
+
+    def transition_model(self, dt):
+        if dt != self._dt:
+            self._F = constant_velocity_transition(self.state_size, dt)
+            self._dt = dt
+        return self._F
+
+    def filter(self, tracks, observations, dt=0) -> np.ndarray:
+        """
+            Met à jour puis prédit les pistes données.
+
+            :param tracks: index des pistes (tableau d'entiers)
+            :param observations: (len(tracks), ncameras, composantes observées), NaN si non observé
+            :return: les états (len(tracks), n) prédits, angle ramené dans [-pi, pi[
+        """
+        if not dt:
+            dt = self.default_dt
+        F = self.transition_model(dt)
+        x = self.x[tracks]
+        P = self.P[tracks]
+
+        z = observations.reshape(len(tracks), -1)
+        seen = ~np.isnan(z)
+        if self.gating:
+            seen = self._gate(tracks, x, P, z, seen)
+        if self.steady_state_gain:
+            # pistes en régime permanent: x mis à jour avec le gain en cache, P laissée au régime permanent
+            full = ~self._steady_state_update(tracks, x, P, z, seen, dt)
+            if full.any():
+                x[full], P[full] = self._measurement_update(x[full], P[full], z[full], seen[full])
+                P[full] = np.matmul(np.matmul(F, P[full]), F.T) + self.Q[tracks[full]]
+        else:
+            x, P = self._measurement_update(x, P, z, seen)
+            P = np.matmul(np.matmul(F, P), F.T) + self.Q[tracks]
+
+        # prédiction
+        x = x.dot(F.T)
+        if self.angle_component is not None:
+            x[:, self.angle_component] = (x[:, self.angle_component] + np.pi) % (2 * np.pi) - np.pi
+
+        self.x[tracks] = x
+        self.P[tracks] = P
+        return x
+
+    def fuse(self, tracks, observations, t) -> np.ndarray:
+        """
+            Fusion asynchrone: prédit les pistes jusqu'au temps de capture t
+            puis les met à jour avec les observations prises à ce temps. Une
+            image plus vieille que l'estimé d'une piste est intégrée sans
+            remonter le temps.
+
+            :param observations: (len(tracks), ncameras, composantes observées), NaN si non observé
+            :return: les états (len(tracks), n) a posteriori au temps t
+        """
+        dts = np.nan_to_num(np.maximum(t - self.t[tracks], 0))
+        F = constant_velocity_transitions(self.state_size, dts)
+        x = np.einsum('tij,tj->ti', F, self.x[tracks])
+        P = np.matmul(np.matmul(F, self.P[tracks]), F.transpose(0, 2, 1)) + self.Q[tracks] * self._noise_scale(dts)
+
+        z = observations.reshape(len(tracks), -1)
+        seen = ~np.isnan(z)
+        if self.gating:
+            seen = self._gate(tracks, x, P, z, seen)
+        x, P = self._measurement_update(x, P, z, seen)
+        if self.angle_component is not None:
+            x[:, self.angle_component] = (x[:, self.angle_component] + np.pi) % (2 * np.pi) - np.pi
+
+        self.x[tracks] = x
+        self.P[tracks] = P
+        self.t[tracks] = np.fmax(self.t[tracks], t)
+        return x
+
+    def squared_mahalanobis(self, x, P, observations) -> np.ndarray:
+        """
+            Distances de Mahalanobis au carré entre les observations et les
+            observations prédites des pistes, en une opération.
+
+            :param x: états prédits (T, n)
+            :param P: covariances prédites (T, n, n)
+            :param observations: (T, K, composantes observées) ou (K, composantes observées), NaN si absent
+            :return: (T, K), NaN pour les observations absentes
+        """
+        components = list(self.observed_components)
+        S = P[:, components][:, :, components] + np.diag(self.observation_variances)
+        y = observations - x[:, np.newaxis, components]
+        if self._observed_angle is not None:
+            y[..., self._observed_angle] = (y[..., self._observed_angle] + np.pi) % (2 * np.pi) - np.pi
+        weighted = np.linalg.solve(S[:, np.newaxis], np.nan_to_num(y)[..., np.newaxis])[..., 0]
+        distances = np.einsum('tkm,tkm->tk', np.nan_to_num(y), weighted)
+        distances[np.isnan(y).any(axis=-1)] = np.nan
+        return distances
+
+    def in_gate(self, x, P, observations) -> np.ndarray:
+        """
+            Masque (T, K) des observations dans la fenêtre des pistes (mêmes
+            paramètres que squared_mahalanobis), False pour les absentes.
+        """
+        distances = self.squared_mahalanobis(x, P, observations)
+        with np.errstate(invalid='ignore'):
+            close = np.hypot(observations[..., 0] - x[:, np.newaxis, 0],
+                             observations[..., 1] - x[:, np.newaxis, 1]) < GATE_MIN_DISTANCE
+            inside = (distances <= GATE_THRESHOLDS[self.observation_size]) | close
+        unsure = P[:, 0, 0] >= GATE_MAX_POSITION_VARIANCE
+        return (inside | unsure[:, np.newaxis]) & ~np.isnan(distances)
+
+    def _gate(self, tracks, x, P, z, seen) -> np.ndarray:
+        """ Retourne le masque des observations gardées après le rejet des aberrantes. """
+        observation_size = self.observation_size
+        observations = z.reshape(len(tracks), self.ncameras, observation_size)
+        rejected = ~self.in_gate(x, P, observations) & ~np.isnan(observations[..., 0])
+
+        observed = seen[:, ::observation_size].any(axis=1)
+        all_rejected = observed & np.all(rejected | ~seen[:, ::observation_size], axis=1)
+        self.rejections[tracks] = np.where(all_rejected, self.rejections[tracks] + 1, 0)
+        # piste perdue: elle repart de ses observations
+        lost = self.rejections[tracks] > GATE_MAX_REJECTIONS
+        if lost.any():
+            rejected[lost] = False
+            P[lost] = INITIAL_COVARIANCE * np.eye(self.state_size)
+            unobserved = [i for i in range(self.state_size) if i not in self.observed_components]
+            x[np.ix_(lost, unobserved)] = 0
+            self.rejections[tracks[lost]] = 0
+        return seen & ~np.repeat(rejected, observation_size, axis=1)
+
+    def reset(self, tracks, states) -> None:
+        """ Réinitialise des pistes à des états donnés, avec la covariance initiale. """
+        self.x[tracks] = states
+        self.P[tracks] = INITIAL_COVARIANCE * np.eye(self.state_size)
+        self.t[tracks] = np.nan
+        self.rejections[tracks] = 0
+
+    def _noise_scale(self, dts) -> np.ndarray:
+        """ Q est le bruit d'un pas de ai_timestamp: il est mis à l'échelle du pas réel. """
+        return (dts / self.default_dt)[:, np.newaxis, np.newaxis]
+
+    def estimate(self, tracks, t) -> np.ndarray:
+        """ États (len(tracks), n) des pistes prédits au temps t, sans modifier la banque. """
+        dts = np.nan_to_num(np.maximum(t - self.t[tracks], 0))
+        x = np.einsum('tij,tj->ti', constant_velocity_transitions(self.state_size, dts), self.x[tracks])
+        if self.angle_component is not None:
+            x[:, self.angle_component] = (x[:, self.angle_component] + np.pi) % (2 * np.pi) - np.pi
+        return x
+
+    def _measurement_update(self, x, P, z, seen):
+        if self.sequential:
+            return self._sequential_update(x, P, z, seen)
+        if seen.any():
+            return self._update(x, P, z, seen)
+        return x, P
+
+    def _update(self, x, P, z, seen):
+        H = self.H * seen[:, :, np.newaxis]
+        y = np.where(seen, z, 0) - np.einsum('tkn,tn->tk', H, x)
+        if self._observed_angle is not None:
+            angles = y[:, self._observed_angle::self.observation_size]
+            y[:, self._observed_angle::self.observation_size] = (angles + np.pi) % (2 * np.pi) - np.pi
+
+        HP = np.matmul(H, P)
+        S = np.matmul(HP, H.transpose(0, 2, 1)) + self.R
+        # K = P H^T S^-1, S symétrique donc K^T = S^-1 H P
+        K = np.linalg.solve(S, HP).transpose(0, 2, 1)
+        x = x + np.einsum('tnk,tk->tn', K, y)
+        P = P - np.matmul(K, HP)
+        return x, P
+
+    def _sequential_update(self, x, P, z, seen):
+        """
+            Intègre chaque composante observée l'une après l'autre: mises à
+            jour scalaires, sans inversion. Chaque étape dépend de la
+            précédente: la boucle en Python sur les caméras et les
+            composantes reste, mais chaque étape traite toutes les pistes à
+            la fois, avec un gain nul pour celles qui n'ont pas l'observation.
+            Plus lent que la mise à jour en bloc dès quelques caméras, qui
+            reste le mode par défaut.
+        """
+        x = x.copy()
+        P = P.copy()
+        observation_size = self.observation_size
+        y = np.where(seen, z, 0)
+        for column in np.flatnonzero(seen.any(axis=0)):
+            i = column % observation_size
+            component = self.observed_components[i]
+            innovation = y[:, column] - x[:, component]
+            if i == self._observed_angle:
+                innovation = (innovation + np.pi) % (2 * np.pi) - np.pi
+            # H est une ligne unitaire: S = P[c, c] + r et K = P[:, c] / S
+            PH = P[:, :, component]
+            K = PH * (seen[:, column] / (PH[:, component] + self.observation_variances[i]))[:, np.newaxis]
+            x += K * innovation[:, np.newaxis]
+            P -= K[:, :, np.newaxis] * PH[:, np.newaxis, :]
+        return x, P
+
+    def _steady_state_update(self, tracks, x, P, z, seen, dt) -> np.ndarray:
+        """
+            Met à jour en place les pistes qui ont convergé vers le régime
+            permanent de leur groupe et retourne le masque de ces pistes.
+        """
+        observation_size = self.observation_size
+        bucket = int(round(dt / STEADY_STATE_DT_BUCKET))
+        camera_masks = seen[:, ::observation_size].dot(1 << np.arange(self.ncameras))
+        groups = self._profiles[tracks] * (1 << self.ncameras) + camera_masks
+        steady = np.zeros(len(tracks), dtype=bool)
+        for group in np.unique(groups[camera_masks > 0]):
+            gain, steady_covariance = self._steady_state(bucket, group)
+            rows = np.flatnonzero(groups == group)
+            difference = np.abs(P[rows] - steady_covariance).max(axis=(1, 2))
+            converged = difference <= STEADY_STATE_TOLERANCE * np.abs(steady_covariance).max()
+            rows = rows[converged]
+            if not len(rows):
+                continue
+
+            predicted = np.tile(x[rows][:, self.observed_components], self.ncameras)
+            y = np.where(seen[rows], z[rows] - predicted, 0)
+            if self._observed_angle is not None:
+                angles = y[:, self._observed_angle::observation_size]
+                y[:, self._observed_angle::observation_size] = (angles + np.pi) % (2 * np.pi) - np.pi
+            x[rows] += y.dot(gain.T)
+            P[rows] = steady_covariance
+            steady[rows] = True
+        return steady
+
+    def _steady_state(self, bucket, group):
+        """
+            Gain (n, ncameras * composantes) et covariance prédite du régime
+            permanent d'un groupe. L'équation de Riccati discrète
+                P = F P (I + G P)^-1 F^T + Q,  G = H^T R^-1 H
+            est résolue par doublement: la convergence est quadratique, une
+            quinzaine d'itérations suffisent.
+        """
+        key = (bucket, group)
+        try:
+            return self._steady_states[key]
+        except KeyError:
+            pass
+        profile, camera_mask = divmod(group, 1 << self.ncameras)
+        observation_size = self.observation_size
+        columns = [camera * observation_size + i
+                   for camera in range(self.ncameras) if camera_mask & (1 << camera)
+                   for i in range(observation_size)]
+        H = self.H[columns]
+        R = self.R[np.ix_(columns, columns)]
+
+        identity = np.eye(self.state_size)
+        A = constant_velocity_transition(self.state_size, bucket * STEADY_STATE_DT_BUCKET).T
+        G = H.T.dot(H / np.diag(R)[:, np.newaxis])
+        P = self._profile_Q[profile].copy()
+        for _ in range(RICCATI_MAX_ITERATIONS):
+            W = np.linalg.inv(identity + G.dot(P))
+            next_P = P + A.T.dot(P).dot(W).dot(A)
+            A, G = A.dot(W).dot(A), G + A.dot(W).dot(G).dot(A.T)
+            converged = np.allclose(next_P, P, rtol=RICCATI_TOLERANCE, atol=RICCATI_TOLERANCE)
+            P = next_P
+            if converged:
+                break
+
+        gain = np.zeros((self.state_size, self.H.shape[0]))
+        gain[:, columns] = np.linalg.solve(H.dot(P).dot(H.T) + R, H.dot(P)).T
+        self._steady_states[key] = gain, P
+        return gain, P
+
+    def view(self, track):
+        return KalmanTrackView(self, track)
+
+
+class KalmanTrackView(object):
+    """ Vue d'une piste de la banque, avec l'interface des filtres individuels. """
+
+    def __init__(self, bank: KalmanFilterBank, track: int):
+        self.bank = bank
+        self.track = track
+        self._tracks = np.array([track])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.bank.x[self.track]
+
+    @property
+    def P(self) -> np.ndarray:
+        return self.bank.P[self.track]
+
+    def filter(self, observation=None, dt=0, command=None):
+        """
+            Filtre une piste. observation: tableau (caméras, composantes) avec
+            NaN si non observé, ou liste par caméra de Pose/Position ou None.
+        """
+        observations = np.full((1, self.bank.ncameras, self.bank.observation_size), np.nan)
+        if observation is not None:
+            if not isinstance(observation, np.ndarray):
+                observation = observations_from_poses(observation, self.bank.observation_size)
+            observed = observation[:self.bank.ncameras]
+            observations[0, :len(observed)] = observed
+        return self.bank.filter(self._tracks, observations, dt)[0]
+
+
+def observations_from_poses(poses, observation_size) -> np.ndarray:
+    """ (ncameras, observation_size) à partir d'une liste par caméra de Pose (robots) ou Position (balle). """
+    observations = np.full((len(poses), observation_size), np.nan)
+    for camera, pose in enumerate(poses):
+        if pose is None:
+            continue
+        if observation_size == len(ROBOT_OBSERVED_COMPONENTS):
+            observations[camera] = pose.position.x, pose.position.y, pose.orientation
+        else:
+            observations[camera] = pose.x, pose.y
+    return observations
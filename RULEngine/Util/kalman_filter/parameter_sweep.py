@@ -0,0 +1,224 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Recherche hors ligne des variances des filtres de Kalman. Les détections
+    d'un journal de paquets (voir packet_log) sont rejouées dans autant de
+    filtres qu'il y a de jeux de paramètres: les jeux forment une dimension
+    de lot NumPy, comme les pistes de KalmanFilterBank, et toute la grille
+    avance d'une mesure à la fois.
+
+    Chaque mesure d'un objet est intégrée à son temps de capture (prédiction
+    jusqu'à ce temps puis mise à jour, comme KalmanFilterBank.fuse). Chaque
+    jeu est noté sur:
+        - la NIS (innovation normalisée au carré): sa moyenne vaut le nombre
+          de composantes observées si le filtre est cohérent, plus s'il est
+          trop confiant, moins s'il ne l'est pas assez;
+        - l'erreur de prédiction: la position prédite horizon secondes plus
+          loin comparée à la mesure prise à ce moment.
+"""
+from collections import namedtuple
+from itertools import product
+
+import numpy as np
+
+from RULEngine.Communication.util.detection_decoder import DetectionArrays, decode_detection
+from RULEngine.Communication.util.packet_log import CHANNEL_VISION, PacketLogReader
+from RULEngine.Communication.util.wire_format import WireFormatError
+from RULEngine.Util.kalman_filter.kalman_filter_bank import BALL_OBSERVED_COMPONENTS, BALL_STATE_SIZE, \
+    INITIAL_COVARIANCE, ROBOT_ANGLE_COMPONENT, ROBOT_OBSERVED_COMPONENTS, ROBOT_STATE_SIZE, \
+    constant_velocity_transitions
+
+# observed_components: composantes de l'état mesurées, dans l'ordre des colonnes des observations
+FilterModel = namedtuple('FilterModel', ['state_size', 'observed_components', 'angle_component'])
+ROBOT_MODEL = FilterModel(ROBOT_STATE_SIZE, ROBOT_OBSERVED_COMPONENTS, ROBOT_ANGLE_COMPONENT)
+BALL_MODEL = FilterModel(BALL_STATE_SIZE, BALL_OBSERVED_COMPONENTS, None)
+
+# composantes de l'état et des observations qui partagent une même variance dans les grilles
+ROBOT_PROCESS_GROUPS = ((0, 1), (2, 3), (4,), (5,))
+ROBOT_OBSERVATION_GROUPS = ((0, 1), (2,))
+BALL_PROCESS_GROUPS = ((0, 1), (2, 3))
+BALL_OBSERVATION_GROUPS = ((0, 1),)
+
+# mesures du début de chaque flux exclues des statistiques, le temps que le filtre converge
+SWEEP_WARMUP = 10
+PREDICTION_HORIZON = 0.1  # s
+
+# times: (K,) temps de capture croissants, observations: (K, composantes observées)
+DetectionStream = namedtuple('DetectionStream', ['name', 'times', 'observations'])
+# chaque champ: (jeux de paramètres,)
+SweepResult = namedtuple('SweepResult', ['mean_nis', 'rms_innovation', 'rms_prediction_error', 'score'])
+
+
+def read_detection_streams(path, target="robots", min_length=2 * SWEEP_WARMUP):
+    """
+        Flux de mesures des objets d'un journal de paquets, toutes caméras
+        confondues, triés par temps de capture.
+
+        :param target: "robots" (un flux par couleur et id, [x, y, orientation]) ou
+                       "ball" (la balle la plus sûre de chaque image, [x, y])
+    """
+    reader = PacketLogReader(path)
+    detection = DetectionArrays()
+    measurements = {}
+    try:
+        for channel, _, data, _ in reader.records():
+            if channel != CHANNEL_VISION:
+                continue
+            try:
+                if not decode_detection(data, detection):
+                    continue
+            except WireFormatError:
+                continue
+            if target == "ball":
+                if detection.ball_count:
+                    balls = detection.balls[:detection.ball_count]
+                    best = balls[np.argmax(balls[:, 2])]
+                    measurements.setdefault("ball", []).append((detection.t_capture, best[0], best[1]))
+            else:
+                for color, rows in (("blue", detection.blues[:detection.blue_count]),
+                                    ("yellow", detection.yellows[:detection.yellow_count])):
+                    for robot_id, x, y, orientation, _ in rows:
+                        measurements.setdefault("{} {}".format(color, int(robot_id)), []).append(
+                            (detection.t_capture, x, y, orientation))
+    finally:
+        reader.close()
+
+    streams = []
+    for name, rows in sorted(measurements.items()):
+        if len(rows) < min_length:
+            continue
+        rows = np.array(sorted(rows))
+        streams.append(DetectionStream(name, rows[:, 0], rows[:, 1:]))
+    return streams
+
+
+def parameter_grid(process_groups, observation_groups, exponents, state_size, observation_size):
+    """
+        Toutes les combinaisons de puissances de dix, une par groupe de
+        composantes liées.
+
+        :return: (variances de processus (S, n), variances d'observation (S, m))
+    """
+    powers = [10.0 ** exponent for exponent in exponents]
+    combinations = np.array(list(product(powers, repeat=len(process_groups) + len(observation_groups))))
+    process_variances = np.zeros((len(combinations), state_size))
+    observation_variances = np.zeros((len(combinations), observation_size))
+    for i, group in enumerate(process_groups):
+        process_variances[:, list(group)] = combinations[:, i, np.newaxis]
+    for i, group in enumerate(observation_groups):
+        observation_variances[:, list(group)] = combinations[:, len(process_groups) + i, np.newaxis]
+    return process_variances, observation_variances
+
+
+def sweep(streams, process_variances, observation_variances, model: FilterModel, default_dt,
+          horizon=PREDICTION_HORIZON, warmup=SWEEP_WARMUP) -> SweepResult:
+    """
+        Rejoue les flux dans un filtre par jeu de paramètres et par flux, tous
+        dans un même lot (flux x jeux).
+
+        :param process_variances: (S, n) diagonales de Q pour un pas de default_dt, mises à l'échelle du pas réel
+        :param observation_variances: (S, m) diagonales de R
+    """
+    process_variances = np.asarray(process_variances, dtype=float)
+    observation_variances = np.asarray(observation_variances, dtype=float)
+    nsets = len(process_variances)
+    nstreams = len(streams)
+    n = model.state_size
+    components = list(model.observed_components)
+    m = len(components)
+    observed_angle = components.index(model.angle_component) if model.angle_component is not None else None
+
+    # flux bouchés par NaN jusqu'au plus long
+    length = max(len(stream.times) for stream in streams)
+    times = np.full((nstreams, length), np.nan)
+    observations = np.full((nstreams, length, m), np.nan)
+    for i, stream in enumerate(streams):
+        times[i, :len(stream.times)] = stream.times
+        observations[i, :len(stream.times)] = stream.observations
+    # index de la mesure de chaque flux prise horizon secondes après chacune de ses mesures
+    targets = [np.minimum(np.searchsorted(stream.times, stream.times + horizon), len(stream.times) - 1)
+               for stream in streams]
+
+    batch = nstreams * nsets
+    Q = np.tile(np.array([np.diag(q) for q in process_variances]), (nstreams, 1, 1))
+    R = np.tile(np.array([np.diag(r) for r in observation_variances]), (nstreams, 1, 1))
+
+    x = np.zeros((batch, n))
+    x[:, components] = np.repeat(observations[:, 0], nsets, axis=0)
+    P = np.tile(INITIAL_COVARIANCE * np.eye(n), (batch, 1, 1))
+    t = np.repeat(times[:, 0], nsets)
+
+    nis_sum = np.zeros(batch)
+    innovation_sum = np.zeros(batch)
+    prediction_sum = np.zeros(batch)
+    counts = np.zeros(batch)
+    prediction_counts = np.zeros(batch)
+    for k in range(length):
+        stream_active = ~np.isnan(times[:, k])
+        active = np.repeat(stream_active, nsets)
+        t_k = np.repeat(times[:, k], nsets)
+        z = np.repeat(observations[:, k], nsets, axis=0)
+
+        # prédiction jusqu'au temps de capture, Q mis à l'échelle du pas
+        dts = np.where(active, t_k - t, 0)
+        F = constant_velocity_transitions(n, dts)
+        x = np.einsum('bij,bj->bi', F, x)
+        P = np.matmul(np.matmul(F, P), F.transpose(0, 2, 1)) + Q * (dts / default_dt)[:, np.newaxis, np.newaxis]
+
+        y = np.where(active[:, np.newaxis], z - x[:, components], 0)
+        if observed_angle is not None:
+            y[:, observed_angle] = (y[:, observed_angle] + np.pi) % (2 * np.pi) - np.pi
+        HP = P[:, components]
+        S = HP[:, :, components] + R
+        # une seule résolution pour le gain (S^-1 H P) et l'innovation normalisée (S^-1 y)
+        solved = np.linalg.solve(S, np.concatenate((HP, y[..., np.newaxis]), axis=2))
+        K = solved[..., :n].transpose(0, 2, 1)
+        weighted = solved[..., n]
+        x = x + np.einsum('bnm,bm->bn', K, y)
+        P = P - np.matmul(K, HP)
+        t = np.where(active, t_k, t)
+
+        if k >= warmup:
+            nis_sum += np.where(active, np.einsum('bm,bm->b', y, weighted), 0)
+            innovation_sum += np.where(active, y[:, 0] ** 2 + y[:, 1] ** 2, 0)
+            counts += active
+            errors, predicted = _prediction_errors(streams, targets, nsets, k, x)
+            prediction_sum += errors
+            prediction_counts += predicted
+
+    def per_set(values):
+        return values.reshape(nstreams, nsets).sum(axis=0)
+
+    counts = np.maximum(per_set(counts), 1)
+    mean_nis = per_set(nis_sum) / counts
+    rms_innovation = np.sqrt(per_set(innovation_sum) / counts)
+    rms_prediction_error = np.sqrt(per_set(prediction_sum) / np.maximum(per_set(prediction_counts), 1))
+    # un filtre incohérent (NIS loin de m) est pénalisé même si ses prédictions sont bonnes sur ce journal
+    consistency = np.exp(np.abs(np.log(np.maximum(mean_nis, 1e-12) / m)))
+    return SweepResult(mean_nis, rms_innovation, rms_prediction_error, rms_prediction_error * consistency)
+
+
+def _prediction_errors(streams, targets, nsets, k, x):
+    """
+        Carré de l'erreur entre la position prédite à partir de la mesure k
+        et la mesure prise horizon plus tard.
+
+        :return: (erreurs (lot,), masque des lignes où une prédiction a été notée)
+    """
+    errors = np.zeros(len(x))
+    predicted = np.zeros(len(x), dtype=bool)
+    for i, stream in enumerate(streams):
+        if k >= len(stream.times) or targets[i][k] == k:
+            continue
+        target = targets[i][k]
+        dt = stream.times[target] - stream.times[k]
+        rows = slice(i * nsets, (i + 1) * nsets)
+        position = x[rows, 0:2] + x[rows, 2:4] * dt
+        errors[rows] = np.sum((position - stream.observations[target, 0:2]) ** 2, axis=1)
+        predicted[rows] = True
+    return errors, predicted
+
+
+def best_parameters(result: SweepResult, process_variances, observation_variances, count=10):
+    """ Les count meilleurs jeux: liste de (index du jeu, variances de processus, variances d'observation). """
+    order = np.argsort(result.score)[:count]
+    return [(int(i), process_variances[i], observation_variances[i]) for i in order]
@@ -0,0 +1,140 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Trace la latence de chaque frame de vision, de la capture par la caméra
+    jusqu'à l'envoi des commandes des robots, et la découpe en étapes:
+
+        vision:    t_sent - t_capture (traitement de SSL-Vision, horloge de la vision)
+        network:   réception - t_sent (ramené à notre horloge)
+        queueing:  lecture du tampon par le Framework - réception
+        filtering: fin du filtre (transformer + Kalman) - lecture
+        ai:        fin du tour de l'IA - fin du filtre
+        send:      fin de l'envoi des commandes - fin du tour de l'IA
+        total:     fin de l'envoi des commandes - t_capture (ramené à notre horloge)
+
+    Les durées sont enregistrées dans les StageTimers (étapes latency.*).
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+from RULEngine.Util.stage_timer import StageTimers
+
+CLOCK_OFFSET_WINDOW = 600  # paquets, environ 10 s à 60 Hz
+
+FrameTrace = namedtuple('FrameTrace', ['camera_id', 'frame_number', 't_capture', 't_sent', 't_recv', 't_pop'])
+
+
+class ClockOffsetEstimator(object):
+    """
+        Estime le décalage entre l'horloge de SSL-Vision et notre horloge
+        monotone par le minimum glissant de (réception - t_sent). Le minimum
+        retire la gigue du réseau et de l'ordonnancement, mais garde le délai
+        réseau minimal: la latence réseau mesurée est celle au-dessus de ce
+        minimum.
+    """
+
+    def __init__(self, window=CLOCK_OFFSET_WINDOW):
+        self.window = window
+        self.sample_count = 0
+        # (numéro d'échantillon, décalage) croissants en décalage: le minimum est en tête
+        self._candidates = deque()
+
+    def update(self, t_sent: float, t_recv: float) -> float:
+        """ Ajoute une paire (t_sent de la vision, réception locale) et retourne le décalage. """
+        offset = t_recv - t_sent
+        while self._candidates and self._candidates[-1][1] >= offset:
+            self._candidates.pop()
+        self._candidates.append((self.sample_count, offset))
+        self.sample_count += 1
+        if self._candidates[0][0] <= self.sample_count - 1 - self.window:
+            self._candidates.popleft()
+        return self._candidates[0][1]
+
+    @property
+    def offset(self) -> float:
+        if not self._candidates:
+            return None
+        return self._candidates[0][1]
+
+    def to_local(self, t_vision: float) -> float:
+        """ Ramène un temps de l'horloge de la vision à notre horloge monotone. """
+        return t_vision + self.offset
+
+
+class LatencyTracer(object):
+    """
+        Suit les frames lues par le Framework jusqu'à l'envoi des commandes.
+        Les frames lues et filtrées (possiblement dans le thread
+        d'acquisition) attendent le prochain tour de l'IA.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.clock_offset = ClockOffsetEstimator()
+        self.stage_timers = StageTimers()
+        self._t_pop = None
+        self._popped = []
+        self._filtered = []
+        self._in_ai = []
+        self._t_ai_done = None
+        # découpage (s) de la dernière frame tracée jusqu'aux commandes
+        self.last_breakdown = None
+        self._lock = threading.Lock()
+
+    def frames_popped(self, packets, packet_buffer) -> None:
+        """ À appeler après avoir vidé le tampon de la vision (paquets protobuf). """
+        self._start_pop()
+        for packet in packets:
+            if packet.HasField("detection"):
+                detection = packet.detection
+                self._trace(detection.camera_id, detection.frame_number, detection.t_capture, detection.t_sent,
+                            packet_buffer)
+
+    def detections_popped(self, detections, packet_buffer) -> None:
+        """ Comme frames_popped, pour les DetectionArrays du décodeur spécialisé. """
+        self._start_pop()
+        for detection in detections:
+            self._trace(detection.camera_id, detection.frame_number, detection.t_capture, detection.t_sent,
+                        packet_buffer)
+
+    def _start_pop(self):
+        self._t_pop = self.clock()
+        self._popped = []
+
+    def _trace(self, camera_id, frame_number, t_capture, t_sent, packet_buffer):
+        t_recv = packet_buffer.receive_time(camera_id, frame_number)
+        if t_recv is None or not t_sent:
+            return
+        self.clock_offset.update(t_sent, t_recv)
+        self._popped.append(FrameTrace(camera_id, frame_number, t_capture, t_sent, t_recv, self._t_pop))
+
+    def frames_filtered(self) -> None:
+        """ À appeler quand les frames lues ont passé le filtre et sont visibles par l'IA. """
+        t_filtered = self.clock()
+        with self._lock:
+            self._filtered += [(trace, t_filtered) for trace in self._popped]
+        self._popped = []
+
+    def ai_done(self) -> None:
+        """ À appeler à la fin du tour de l'IA. """
+        self._t_ai_done = self.clock()
+        with self._lock:
+            self._in_ai, self._filtered = self._filtered, []
+
+    def commands_sent(self) -> None:
+        """ À appeler après l'envoi des commandes: termine la trace des frames du tour. """
+        t_sent_commands = self.clock()
+        offset = self.clock_offset.offset
+        timers = self.stage_timers
+        for trace, t_filtered in self._in_ai:
+            breakdown = {"vision": trace.t_sent - trace.t_capture,
+                         "network": trace.t_recv - (trace.t_sent + offset),
+                         "queueing": trace.t_pop - trace.t_recv,
+                         "filtering": t_filtered - trace.t_pop,
+                         "ai": self._t_ai_done - t_filtered,
+                         "send": t_sent_commands - self._t_ai_done,
+                         "total": t_sent_commands - (trace.t_capture + offset)}
+            for stage, duration in breakdown.items():
+                timers.record("latency." + stage, duration)
+            self.last_breakdown = breakdown
+        self._in_ai = []
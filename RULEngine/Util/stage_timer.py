@@ -0,0 +1,121 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Chronométrage des étapes de la boucle de l'IA (exécuteurs du Coach,
+    étapes du Framework). Chaque étape garde ses dernières durées dans un
+    tampon circulaire préalloué et un histogramme à classes fixes: un
+    enregistrement n'alloue rien.
+"""
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from RULEngine.Util.singleton import Singleton
+
+STAGE_HISTORY_SIZE = 1024
+# bornes supérieures des classes de l'histogramme (s), la dernière classe est ouverte
+HISTOGRAM_EDGES = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class StageHistogram(object):
+    """ Durées d'une étape: tampon circulaire des dernières valeurs et histogramme cumulatif. """
+
+    def __init__(self, capacity=STAGE_HISTORY_SIZE):
+        self.samples = np.zeros(capacity)
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.bins = [0 for _ in range(len(HISTOGRAM_EDGES) + 1)]
+
+    def record(self, duration: float) -> None:
+        self.samples[self.index] = duration
+        self.index += 1
+        if self.index == self.capacity:
+            self.index = 0
+        self.count += 1
+        self.total += duration
+        if duration > self.maximum:
+            self.maximum = duration
+        self.bins[bisect_right(HISTOGRAM_EDGES, duration)] += 1
+
+    @property
+    def last(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return float(self.samples[self.index - 1])
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def recent_samples(self) -> np.ndarray:
+        """ Copie des durées encore dans le tampon, dans un ordre quelconque. """
+        return self.samples[:min(self.count, self.capacity)].copy()
+
+    def percentiles(self, percentiles=SUMMARY_PERCENTILES) -> list:
+        """ Percentiles (s) des durées encore dans le tampon. """
+        if self.count == 0:
+            return [0.0 for _ in percentiles]
+        return [float(p) for p in np.percentile(self.samples[:min(self.count, self.capacity)], percentiles)]
+
+    def summary(self) -> dict:
+        """ Résumé en millisecondes, prêt à être envoyé à l'UI-debug. """
+        data = {"count": self.count,
+                "last": self.last * 1000,
+                "mean": self.mean * 1000,
+                "max": self.maximum * 1000,
+                "histogram": list(self.bins)}
+        for percentile, value in zip(SUMMARY_PERCENTILES, self.percentiles()):
+            data["p{}".format(percentile)] = value * 1000
+        return data
+
+
+class StageTimers(metaclass=Singleton):
+    """
+        Registre des chronomètres d'étapes partagé par le RULEngine et l'IA.
+
+        Usage, sans allocation par tour:
+            t = timers.now()
+            etape_1()
+            t = timers.lap("etape_1", t)
+            etape_2()
+            t = timers.lap("etape_2", t)
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.capacity = STAGE_HISTORY_SIZE
+        self.clock = time.perf_counter
+
+    def now(self) -> float:
+        return self.clock()
+
+    def lap(self, name: str, start: float) -> float:
+        """ Enregistre la durée écoulée depuis start pour l'étape et retourne le temps actuel. """
+        now = self.clock()
+        self.record(name, now - start)
+        return now
+
+    def record(self, name: str, duration: float) -> None:
+        try:
+            stage = self.stages[name]
+        except KeyError:
+            stage = self.stages[name] = StageHistogram(self.capacity)
+        stage.record(duration)
+
+    def get_stage(self, name: str) -> StageHistogram:
+        return self.stages.get(name)
+
+    def summary(self) -> dict:
+        """ Résumé de chaque étape, en millisecondes. """
+        return {name: stage.summary() for name, stage in self.stages.items()}
+
+    def reset(self, capacity=STAGE_HISTORY_SIZE) -> None:
+        """ Oublie toutes les durées. capacity: nombre de durées gardées par étape. """
+        self.stages = {}
+        self.capacity = capacity
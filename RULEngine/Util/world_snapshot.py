@@ -0,0 +1,45 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Instantané immuable de l'état filtré du monde et tampon double pour
+    l'échanger entre le thread d'acquisition de la vision et celui de l'IA.
+"""
+import threading
+from collections import namedtuple
+
+
+# ball: (position, velocity), blue/yellow: tuple de (player_id, pose, velocity)
+WorldSnapshot = namedtuple('WorldSnapshot', ['sequence', 'timestamp', 'delta_t', 'ball', 'blue', 'yellow'])
+
+
+class SnapshotDoubleBuffer(object):
+    """
+        Tampon double: l'écrivain remplit la case arrière puis l'échange avec
+        la case avant. Le lecteur prend toujours la case avant, donc le dernier
+        instantané complet, sans jamais attendre l'écrivain.
+    """
+
+    def __init__(self):
+        self._slots = [None, None]
+        self._front = 0
+        self._swap_lock = threading.Lock()
+        self._sequence = 0
+
+    def next_sequence(self) -> int:
+        """ Numéro du prochain instantané à publier. """
+        return self._sequence + 1
+
+    def publish(self, snapshot: WorldSnapshot) -> None:
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._swap_lock:
+            self._front = back
+            self._sequence = snapshot.sequence
+
+    def latest(self) -> WorldSnapshot:
+        """ Retourne le dernier instantané publié ou None. """
+        with self._swap_lock:
+            return self._slots[self._front]
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
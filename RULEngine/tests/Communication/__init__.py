@@ -0,0 +1,2 @@
+#Under MIT License, see LICENSE.txt
+__author__ = 'RoboCupULaval'
@@ -0,0 +1,51 @@
+# Under MIT License, see LICENSE.txt
+
+import asyncio
+import unittest
+
+from RULEngine.Communication.aio.datagram_endpoint import AsyncDatagramEndpoint, AsyncDatagramReceiver, \
+    AsyncDatagramSender
+from RULEngine.Communication.aio.receivers import AsyncProtobufPacketReceiver
+from RULEngine.Communication.protobuf import referee_pb2 as ssl_referee
+
+
+class TestAsyncEndpoints(unittest.TestCase):
+
+    def test_hooks_are_abstract(self):
+        class IncompleteReceiver(AsyncDatagramReceiver):
+            pass
+
+        self.assertRaises(TypeError, AsyncDatagramEndpoint, "127.0.0.1", 0)
+        self.assertRaises(TypeError, IncompleteReceiver, "127.0.0.1", 0)
+
+    def test_send_and_receive_in_one_loop(self):
+        asyncio.run(self._send_and_receive())
+
+    async def _send_and_receive(self):
+        receiver = AsyncProtobufPacketReceiver("127.0.0.1", 0, ssl_referee.SSL_Referee)
+        await receiver.open()
+        self.assertFalse(await receiver.wait_for_frames(0.01))
+
+        sender = AsyncDatagramSender("127.0.0.1", receiver.transport.get_extra_info("sockname")[1])
+        await sender.open()
+        packet = ssl_referee.SSL_Referee()
+        packet.packet_timestamp = 42
+        packet.stage = ssl_referee.SSL_Referee.NORMAL_FIRST_HALF
+        packet.command = ssl_referee.SSL_Referee.HALT
+        packet.command_counter = 1
+        packet.command_timestamp = 42
+        for team in (packet.yellow, packet.blue):
+            team.name = "team"
+            team.score = 0
+            team.red_cards = 0
+            team.yellow_cards = 0
+            team.timeouts = 0
+            team.timeout_time = 0
+            team.goalie = 0
+        sender._send_bytes(packet.SerializeToString())
+
+        self.assertTrue(await receiver.wait_for_frames(1))
+        self.assertEqual(receiver.get_latest_frame().packet_timestamp, 42)
+        sender.close()
+        receiver.close()
+        self.assertIsNone(receiver.transport)
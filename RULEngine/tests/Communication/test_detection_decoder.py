@@ -0,0 +1,181 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+import warnings
+
+import numpy as np
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.util.detection_decoder import DetectionArrays, decode_detection
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, vision_coalescing_key
+from RULEngine.Communication.util.wire_format import WireFormatError
+from RULEngine.Game.Game import Game
+from RULEngine.Util.image_transformer.camera_frame_store import BLUE, YELLOW
+from RULEngine.Util.image_transformer.kalman_image_transformer import KalmanImageTransformer
+from RULEngine.Util.image_transformer.singular_packet_image_transformer import SingularPacketImageTransformer
+from config.config_service import ConfigService
+
+
+def detection_packet(frame_number=12, camera_id=1):
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    detection = packet.detection
+    detection.frame_number = frame_number
+    detection.t_capture = 1500000000.25
+    detection.t_sent = 1500000000.5
+    detection.camera_id = camera_id
+
+    ball = detection.balls.add()
+    ball.confidence = 0.75
+    ball.area = 42
+    ball.x = 100.5
+    ball.y = -200.25
+    ball.z = 0
+    ball.pixel_x = 1
+    ball.pixel_y = 2
+
+    for team, robot_ids in ((detection.robots_blue, (0, 3)), (detection.robots_yellow, (5,))):
+        for robot_id in robot_ids:
+            robot = team.add()
+            robot.confidence = 0.5
+            robot.robot_id = robot_id
+            robot.x = robot_id * 100.0
+            robot.y = -robot_id * 50.0
+            robot.orientation = robot_id * 0.5
+            robot.pixel_x = 0
+            robot.pixel_y = 0
+            robot.height = 150
+    return packet
+
+
+def geometry_packet():
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    field = packet.geometry.field
+    for name in ("line_width", "field_length", "field_width", "boundary_width", "referee_width", "goal_width",
+                 "goal_depth", "goal_wall_width", "center_circle_radius", "defense_radius", "defense_stretch",
+                 "free_kick_from_defense_dist", "penalty_spot_from_field_line_dist",
+                 "penalty_line_from_spot_dist"):
+        setattr(field, name, 10)
+    return packet
+
+
+class TestDetectionDecoder(unittest.TestCase):
+
+    def test_decode_matches_protobuf(self):
+        out = DetectionArrays()
+        self.assertTrue(decode_detection(detection_packet().SerializeToString(), out))
+
+        self.assertEqual((out.camera_id, out.frame_number), (1, 12))
+        self.assertEqual(out.t_capture, 1500000000.25)
+        self.assertEqual(out.t_sent, 1500000000.5)
+        self.assertEqual(out.ball_count, 1)
+        self.assertEqual(out.balls[0].tolist(), [100.5, -200.25, 0.75])
+        self.assertEqual(out.blue_count, 2)
+        self.assertEqual(out.blues[1].tolist(), [3, 300, -150, 1.5, 0.5])
+        self.assertEqual(out.yellow_count, 1)
+        self.assertEqual(out.yellows[0].tolist(), [5, 500, -250, 2.5, 0.5])
+
+    def test_arrays_are_reused(self):
+        out = DetectionArrays()
+        decode_detection(detection_packet().SerializeToString(), out)
+        balls = out.balls
+        empty = ssl_wrapper.SSL_WrapperPacket()
+        empty.detection.frame_number = 13
+        empty.detection.t_capture = 0
+        empty.detection.t_sent = 0
+        empty.detection.camera_id = 0
+        decode_detection(empty.SerializeToString(), out)
+        self.assertIs(out.balls, balls)
+        self.assertEqual((out.ball_count, out.blue_count, out.yellow_count), (0, 0, 0))
+
+    def test_geometry_is_not_decoded(self):
+        self.assertFalse(decode_detection(geometry_packet().SerializeToString(), DetectionArrays()))
+
+    def test_truncated(self):
+        data = detection_packet().SerializeToString()
+        self.assertRaises(WireFormatError, decode_detection, data[:-3], DetectionArrays())
+
+
+class TestPopDetectionFrames(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_kalman_redirect.cfg")
+        self.buffer = RawPacketBuffer(ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+
+    def test_geometry_falls_back_to_protobuf(self):
+        self.buffer.append(detection_packet(12, 0).SerializeToString())
+        self.buffer.append(geometry_packet().SerializeToString())
+        self.buffer.append(detection_packet(13, 0).SerializeToString())
+
+        detections, other_packets = self.buffer.pop_detection_frames()
+        self.assertEqual([d.frame_number for d in detections], [13])
+        self.assertEqual(len(other_packets), 1)
+        self.assertTrue(other_packets[0].HasField("geometry"))
+
+    def test_transformer_gives_same_image(self):
+        packet = detection_packet(12, 0)
+        self.buffer.append(packet.SerializeToString())
+        detections, _ = self.buffer.pop_detection_frames()
+
+        fast = KalmanImageTransformer().update_detections(detections)
+        slow = KalmanImageTransformer().update([packet])
+        np.testing.assert_array_equal(fast.frame_number, slow.frame_number)
+        np.testing.assert_array_equal(fast.ball, slow.ball)
+        np.testing.assert_array_equal(fast.robots, slow.robots)
+        np.testing.assert_array_equal(fast.robot_valid, slow.robot_valid)
+
+    def test_singular_transformer_gives_same_image(self):
+        packet = detection_packet(12, 0)
+        self.buffer.append(packet.SerializeToString())
+        detections, _ = self.buffer.pop_detection_frames()
+
+        fast = SingularPacketImageTransformer().update_detections(detections)
+        slow = SingularPacketImageTransformer().update([packet])
+        np.testing.assert_array_equal(fast.robots, slow.robots)
+        np.testing.assert_array_equal(fast.robot_valid, slow.robot_valid)
+        np.testing.assert_array_equal(fast.ball, slow.ball)
+        np.testing.assert_array_equal(slow.players(YELLOW)[0], [5])
+
+    def test_singular_transformer_accepts_every_camera(self):
+        # configuration à une caméra: les images des caméras 1 à 3 sont fusionnées quand même
+        packets = [detection_packet(12, camera_id) for camera_id in (1, 2, 3)]
+        for packet in packets:
+            self.buffer.append(packet.SerializeToString())
+        detections, _ = self.buffer.pop_detection_frames()
+
+        fast = SingularPacketImageTransformer().update_detections(detections)
+        slow = SingularPacketImageTransformer().update(packets)
+        for merged in (fast, slow):
+            np.testing.assert_array_equal(merged.players(BLUE)[0], [0, 3])
+            np.testing.assert_array_equal(merged.players(YELLOW)[0], [5])
+            np.testing.assert_array_equal(merged.ball, [100.5, -200.25])
+
+    def test_kalman_snapshot_from_camera_1(self):
+        # configuration à une caméra: la caméra d'id 1 prend la seule place du magasin et de la banque
+        packet = detection_packet(12, 1)
+        self.buffer.append(packet.SerializeToString())
+        detections, _ = self.buffer.pop_detection_frames()
+
+        frames = (KalmanImageTransformer().update_detections(detections), KalmanImageTransformer().update([packet]))
+        for frame in frames:
+            snapshot = Game().kalman_snapshot(frame, 0.016, 1, 0)
+
+            self.assertEqual(frame.camera_id.tolist(), [1])
+            self.assertEqual([player_id for player_id, _, _ in snapshot.blue], [0, 3])
+            self.assertEqual([player_id for player_id, _, _ in snapshot.yellow], [5])
+            self.assertAlmostEqual(snapshot.blue[1][1].position.x, 300, delta=10)
+            self.assertAlmostEqual(snapshot.ball[0].x, 100.5, delta=10)
+            self.assertAlmostEqual(snapshot.ball[0].y, -200.25, delta=10)
+
+    def test_extra_camera_is_rejected_with_a_warning(self):
+        transformer = KalmanImageTransformer()
+        transformer.update([detection_packet(12, 2)])
+
+        with self.assertWarns(UserWarning):
+            transformer.update([detection_packet(12, 3), detection_packet(13, 2)])
+        self.assertEqual(transformer.last_camera_frame.updated_cameras, [0])
+        self.assertEqual(transformer.last_camera_frame.frame_number.tolist(), [13])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            transformer.update([detection_packet(13, 3)])
+        self.assertFalse(transformer.new_image_flag)
@@ -0,0 +1,122 @@
+# Under MIT License, see LICENSE.txt
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.receiver.log_replay import PacketLogReplay
+from RULEngine.Communication.util.packet_log import CHANNEL_REFEREE, CHANNEL_VISION, INDEX_SUFFIX, \
+    PacketLogError, PacketLogReader, PacketLogWriter
+
+
+def vision_packet(frame_number, camera_id=0):
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    packet.detection.frame_number = frame_number
+    packet.detection.t_capture = frame_number / 60
+    packet.detection.t_sent = frame_number / 60
+    packet.detection.camera_id = camera_id
+    return packet.SerializeToString()
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPacketLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "match.log")
+        writer = PacketLogWriter(self.path)
+        # 10 secondes de vision à 10 Hz et un paquet d'arbitre par seconde
+        for i in range(100):
+            writer.write(CHANNEL_VISION, [vision_packet(i)], 50.0 + i / 10)
+            if i % 10 == 0:
+                writer.write(CHANNEL_REFEREE, [b"referee"], 50.0 + i / 10)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_back_all_records(self):
+        reader = PacketLogReader(self.path)
+        records = list(reader.records())
+        self.assertEqual(len(records), 110)
+        self.assertEqual(records[0][:3], (CHANNEL_VISION, 50.0, vision_packet(0)))
+        self.assertEqual(records[1][:3], (CHANNEL_REFEREE, 50.0, b"referee"))
+        self.assertEqual(reader.start_time, 50.0)
+        self.assertEqual(len(reader.index_times), 10)
+        reader.close()
+
+    def test_seek(self):
+        reader = PacketLogReader(self.path)
+        channel, t_recv, data, _ = next(reader.records(reader.seek(53.25)))
+        self.assertEqual((channel, data), (CHANNEL_VISION, vision_packet(33)))
+        self.assertAlmostEqual(t_recv, 53.3)
+        self.assertEqual(list(reader.records(reader.seek(1000))), [])
+        reader.close()
+
+    def test_truncated_record_is_ignored(self):
+        with open(self.path, "ab") as log_file:
+            log_file.write(b"\x00\x01\x02")
+        reader = PacketLogReader(self.path)
+        self.assertEqual(len(list(reader.records())), 110)
+        reader.close()
+
+    def test_not_a_log(self):
+        with open(self.path, "wb") as log_file:
+            log_file.write(b"not a packet log")
+        self.assertRaises(PacketLogError, PacketLogReader, self.path)
+
+    def test_missing_index_falls_back_to_scan(self):
+        os.remove(self.path + INDEX_SUFFIX)
+        reader = PacketLogReader(self.path)
+        _, t_recv, _, _ = next(reader.records(reader.seek(55)))
+        self.assertAlmostEqual(t_recv, 55)
+        reader.close()
+
+    def test_replay_as_fast_as_possible(self):
+        replay = PacketLogReplay(self.path, speed=0, step=0.25)
+        vision = replay.vision_receiver()
+        referee = replay.referee_receiver()
+
+        self.assertEqual(vision.get_latest_frame().detection.frame_number, 0)
+        self.assertEqual(len(vision.pop_frames()), 1)
+        frames = vision.pop_frames()
+        self.assertEqual([f.detection.frame_number for f in frames], [2])
+        self.assertAlmostEqual(replay.last_advance, 0.25)
+        self.assertEqual(len(referee.packet_buffer.pop_raw_frames()), 1)
+        replay.close()
+
+    def test_replay_at_speed(self):
+        clock = FakeClock()
+        replay = PacketLogReplay(self.path, speed=2, start_time=52, clock=clock)
+        vision = replay.vision_receiver()
+
+        self.assertEqual(vision.get_latest_frame().detection.frame_number, 20)
+        clock.now += 1
+        self.assertEqual(vision.get_latest_frame().detection.frame_number, 40)
+        self.assertAlmostEqual(replay.time_until_next_record(), 0.05)
+        clock.now += 100
+        vision.pop_frames()
+        self.assertTrue(replay.finished)
+        replay.close()
+
+    def test_replay_keeps_recorded_receive_times(self):
+        clock = FakeClock()
+        clock.now = 1000.0
+        replay = PacketLogReplay(self.path, speed=2, start_time=52, clock=clock)
+        vision = replay.vision_receiver()
+        vision.get_latest_frame()
+        clock.now += 1
+        vision.pop_frames()
+
+        # frame 40 reçue 2 s de journal après le début du rejeu, à vitesse 2
+        self.assertAlmostEqual(vision.packet_buffer.receive_time(0, 40), 1001.0)
+        replay.close()
@@ -0,0 +1,88 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, vision_coalescing_key
+from RULEngine.Communication.util.wire_format import WireFormatError, peek_vision_header
+
+
+def detection_packet(camera_id, frame_number, with_geometry=False):
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    packet.detection.camera_id = camera_id
+    packet.detection.frame_number = frame_number
+    packet.detection.t_capture = 0.5
+    packet.detection.t_sent = 0.6
+    ball = packet.detection.balls.add()
+    ball.confidence = 0.9
+    ball.x = 100
+    ball.y = 200
+    ball.pixel_x = 0
+    ball.pixel_y = 0
+    if with_geometry:
+        packet.geometry.field.line_width = 10
+        packet.geometry.field.field_length = 9000
+        packet.geometry.field.field_width = 6000
+        packet.geometry.field.boundary_width = 250
+        packet.geometry.field.referee_width = 425
+        packet.geometry.field.goal_width = 1000
+        packet.geometry.field.goal_depth = 180
+        packet.geometry.field.goal_wall_width = 20
+        packet.geometry.field.center_circle_radius = 500
+        packet.geometry.field.defense_radius = 1000
+        packet.geometry.field.defense_stretch = 500
+        packet.geometry.field.free_kick_from_defense_dist = 200
+        packet.geometry.field.penalty_spot_from_field_line_dist = 1000
+        packet.geometry.field.penalty_line_from_spot_dist = 400
+    return packet.SerializeToString()
+
+
+class TestWireFormat(unittest.TestCase):
+
+    def test_peek_vision_header(self):
+        self.assertEqual(peek_vision_header(detection_packet(3, 1234567)), (3, 1234567, False))
+        self.assertEqual(peek_vision_header(detection_packet(0, 1, with_geometry=True)), (0, 1, True))
+        self.assertEqual(peek_vision_header(b''), (None, None, False))
+
+    def test_peek_truncated_packet(self):
+        self.assertRaises(WireFormatError, peek_vision_header, detection_packet(3, 1234567)[:-3])
+
+
+class TestRawPacketBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = RawPacketBuffer(ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+
+    def test_coalesce_to_latest_frame_per_camera(self):
+        for frame_number in range(10):
+            for camera_id in range(4):
+                self.buffer.append(detection_packet(camera_id, frame_number))
+        # paquet en retard
+        self.buffer.append(detection_packet(2, 5))
+
+        packets = self.buffer.pop_frames()
+        self.assertEqual(len(packets), 4)
+        self.assertEqual(sorted(p.detection.camera_id for p in packets), [0, 1, 2, 3])
+        self.assertTrue(all(p.detection.frame_number == 9 for p in packets))
+        self.assertEqual(self.buffer.pop_frames(), [])
+
+    def test_geometry_packets_are_kept(self):
+        self.buffer.append(detection_packet(0, 1, with_geometry=True))
+        self.buffer.append(detection_packet(0, 2))
+        packets = self.buffer.pop_frames()
+        self.assertEqual(len(packets), 2)
+        self.assertEqual(packets[0].detection.frame_number, 2)
+        self.assertTrue(packets[1].HasField("geometry"))
+
+    def test_invalid_packets_are_dropped(self):
+        self.buffer.append(b'\xff\xff\xff')
+        self.buffer.append(detection_packet(1, 1))
+        packets = self.buffer.pop_frames()
+        self.assertEqual(len(packets), 1)
+
+    def test_get_latest_frame_is_parsed_once(self):
+        self.assertIsNone(self.buffer.get_latest_frame())
+        self.buffer.append(detection_packet(1, 42))
+        latest = self.buffer.get_latest_frame()
+        self.assertEqual(latest.detection.frame_number, 42)
+        self.assertIs(self.buffer.get_latest_frame(), latest)
@@ -0,0 +1,63 @@
+# Under MIT License, see LICENSE.txt
+
+import threading
+import unittest
+
+from RULEngine.Communication.util.udp_receive_engine import UDPReceiveEngine
+from RULEngine.Communication.util.udp_socket import udp_socket
+
+
+class TestUDPReceiveEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = UDPReceiveEngine()
+        self.received = []
+        self.all_received = threading.Event()
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def _callback(self, datagrams):
+        self.received += datagrams
+        if len(self.received) >= 10:
+            self.all_received.set()
+
+    def test_receive_batches_on_one_thread(self):
+        threads = set()
+
+        def callback(datagrams):
+            threads.add(threading.current_thread())
+            self._callback(datagrams)
+
+        skt = self.engine.register("127.0.0.1", 0, callback)
+        sender = udp_socket("127.0.0.1", skt.getsockname()[1])
+        for i in range(10):
+            sender.send(bytes([i]))
+
+        self.assertTrue(self.all_received.wait(2))
+        self.assertEqual(self.received, [bytes([i]) for i in range(10)])
+        self.assertEqual(threads, {self.engine.receive_thread})
+        sender.close()
+
+    def test_faulty_callback_does_not_stop_reception(self):
+        def faulty_callback(datagrams):
+            raise ValueError
+
+        faulty = self.engine.register("127.0.0.1", 0, faulty_callback)
+        valid = self.engine.register("127.0.0.1", 0, self._callback)
+        faulty_sender = udp_socket("127.0.0.1", faulty.getsockname()[1])
+        valid_sender = udp_socket("127.0.0.1", valid.getsockname()[1])
+
+        faulty_sender.send(b'x')
+        for i in range(10):
+            valid_sender.send(b'y')
+
+        self.assertTrue(self.all_received.wait(2))
+        faulty_sender.close()
+        valid_sender.close()
+
+    def test_stop_closes_sockets(self):
+        skt = self.engine.register("127.0.0.1", 0, self._callback)
+        self.engine.stop()
+        self.assertIsNone(self.engine.receive_thread)
+        self.assertEqual(skt.fileno(), -1)
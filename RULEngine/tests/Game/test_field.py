@@ -0,0 +1,107 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+import numpy as np
+
+from config.config_service import ConfigService
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Game.Ball import Ball
+from RULEngine.Game.Field import Field, normal
+from RULEngine.Util.Position import Position
+
+
+def geometry_packet(field_length=6000, field_width=4000, defense_radius=500, defense_stretch=300):
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    field = packet.geometry.field
+    for name in ("line_width", "boundary_width", "referee_width", "goal_width", "goal_depth", "goal_wall_width",
+                 "center_circle_radius", "free_kick_from_defense_dist", "penalty_line_from_spot_dist"):
+        setattr(field, name, 10)
+    field.field_length = field_length
+    field.field_width = field_width
+    field.defense_radius = defense_radius
+    field.defense_stretch = defense_stretch
+    field.penalty_spot_from_field_line_dist = 750
+    return packet
+
+
+class TestField(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_standard.cfg")
+        self.field = Field(Ball())
+
+    def tearDown(self):
+        ConfigService().load_file("config/sim_kalman_redirect.cfg")
+
+    def test_is_inside_goal_area(self):
+        self.assertTrue(self.field.is_inside_goal_area(Position(4000, 1000), True))
+        self.assertFalse(self.field.is_inside_goal_area(Position(4000, 1000), False))
+        self.assertFalse(self.field.is_inside_goal_area(Position(3000, 0), True))
+        self.assertTrue(self.field.is_outside_goal_area(Position(-4000, 1300), False))
+
+    def test_geometry_is_compiled_once_per_dimensions(self):
+        const = self.field.constant
+        self.field.update_field_dimensions([geometry_packet()])
+        geometry = self.field.geometry
+
+        self.field.update_field_dimensions([geometry_packet(), ssl_wrapper.SSL_WrapperPacket()])
+        self.assertIs(self.field.geometry, geometry)
+
+        self.field.update_field_dimensions([geometry_packet(field_length=7000)])
+        self.assertIsNot(self.field.geometry, geometry)
+        self.assertEqual(self.field.geometry.x_right, 3500)
+        # le dictionnaire partagé (GameState.const) est mis à jour en place
+        self.assertIs(self.field.constant, const)
+        self.assertEqual(const["FIELD_X_RIGHT"], 3500)
+        self.assertEqual(const["FIELD_GOAL_YELLOW_MID_GOAL"], Position(3500, 0))
+        self.assertEqual(normal["FIELD_X_RIGHT"], 4500)
+
+    def test_packets_without_geometry_keep_the_geometry(self):
+        geometry = self.field.geometry
+        self.field.update_field_dimensions([ssl_wrapper.SSL_WrapperPacket()])
+        self.field.update_field_dimensions([])
+        self.assertIs(self.field.geometry, geometry)
+
+    def test_updated_goal_area(self):
+        self.field.update_field_dimensions([geometry_packet()])
+
+        self.assertTrue(self.field.is_inside_goal_area(Position(2800, 600), True))
+        self.assertFalse(self.field.is_inside_goal_area(Position(2400, 0), True))
+        self.assertEqual(self.field.geometry.penalty_spots[1], Position(2250, 0))
+        self.assertEqual(self.field.geometry.penalty_spots[0], Position(-2250, 0))
+
+    def test_vectorized_queries(self):
+        geometry = self.field.geometry
+        points = np.array([[0, 0], [4000, 1000], [3600, 1200], [5000, 0], [-4000, 0]])
+
+        np.testing.assert_array_equal(geometry.inside_field(points), [True, True, True, False, True])
+        np.testing.assert_array_equal(geometry.outside_field(points), [False, False, False, True, False])
+        np.testing.assert_array_equal(geometry.inside_goal_area(points, True), [False, True, True, False, False])
+        # les coins du rectangle englobant ne font pas partie de la zone de défense
+        np.testing.assert_array_equal(geometry.inside_defense_area(points, True), [False, True, False, False, False])
+        np.testing.assert_array_equal(geometry.inside_defense_area(points, False), [False, False, False, False, True])
+
+    def test_legal_distances_with_and_without_grid(self):
+        points = np.array([[0, 0], [4000, 0], [0, 3500]])
+        self.assertIsNone(self.field.geometry.distance_grid)
+        np.testing.assert_allclose(self.field.legal_distances(points), [3000, -500, -500])
+
+        ConfigService().config_dict["GAME"]["field_distance_grid"] = "true"
+        field = Field(Ball())
+        field.update_field_dimensions([geometry_packet()])
+
+        self.assertIsNotNone(field.geometry.distance_grid)
+        self.assertEqual(field.geometry.distance_grid.nx, (6000 + 1000) // 20 + 1)
+        np.testing.assert_array_equal(field.is_legal(points), [True, False, False])
+
+    def test_defense_boundary(self):
+        boundary = self.field.geometry.defense_boundaries[0]
+
+        np.testing.assert_allclose(boundary[0], [-4500, 1250], atol=1e-9)
+        np.testing.assert_allclose(boundary[-1], [-4500, -1250], atol=1e-9)
+        self.assertTrue(np.all(boundary[:, 0] <= -3500 + 1e-9))
+
+
+if __name__ == '__main__':
+    unittest.main()
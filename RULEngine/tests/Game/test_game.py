@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from config.config_service import ConfigService
+from RULEngine.Game.Game import ROBOT_TRACK_TIMEOUT, Game
+from RULEngine.Util.image_transformer.camera_frame_store import BLUE, YELLOW, CameraFrameStore, MergedFrame
+from RULEngine.Util.Position import Position
+
+
+class TestGameMergedUpdate(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_standard.cfg")
+        self.game = Game()
+        self.store = CameraFrameStore(1)
+        self.merged = MergedFrame()
+
+    def tearDown(self):
+        ConfigService().load_file("config/sim_kalman_redirect.cfg")
+
+    def test_update_from_merged_frame(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_robots(BLUE, 0, np.array([[3, 100, 200, 0.5, 1]]))
+        self.store.set_robots(YELLOW, 0, np.array([[1, -100, -200, -0.5, 1]]))
+        self.store.set_ball(0, 10, 20, 1)
+        self.merged.merge(self.store)
+
+        self.game.update(self.merged, 0.016)
+
+        self.assertEqual(set(self.game.blue_team.available_players), {3})
+        self.assertEqual(self.game.blue_team.players[3].pose.position, Position(100, 200))
+        self.assertAlmostEqual(self.game.blue_team.players[3].pose.orientation, 0.5)
+        self.assertEqual(set(self.game.yellow_team.available_players), {1})
+        self.assertEqual(self.game.ball.position, Position(10, 20))
+
+    def test_robot_leaves_after_timeout(self):
+        frame_number = 0
+        for blue in ([[3, 100, 200, 0.5, 1], [4, 0, 0, 0, 1]],) + ([[4, 0, 0, 0, 1]],) * 10:
+            frame_number += 1
+            self.store.begin_frame(0, frame_number, 0, 0)
+            self.store.set_robots(BLUE, 0, np.array(blue))
+            self.merged.merge(self.store)
+            self.game.update(self.merged, 0.016)
+
+        # absent depuis 10 images: encore en jeu, à sa dernière pose
+        self.assertEqual(set(self.game.blue_team.available_players), {3, 4})
+        self.assertEqual(self.game.blue_team.players[3].pose.position, Position(100, 200))
+
+        for _ in range(int(ROBOT_TRACK_TIMEOUT / 0.016)):
+            frame_number += 1
+            self.store.begin_frame(0, frame_number, 0, 0)
+            self.store.set_robots(BLUE, 0, np.array([[4, 0, 0, 0, 1]]))
+            self.merged.merge(self.store)
+            self.game.update(self.merged, 0.016)
+
+        self.assertEqual(set(self.game.blue_team.available_players), {4})
+        self.assertFalse(self.game.blue_team.players[3].in_play)
+
+    def test_ball_stays_when_not_seen(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_ball(0, 10, 20, 1)
+        self.merged.merge(self.store)
+        self.game.update(self.merged, 0.016)
+
+        self.store.begin_frame(0, 2, 0, 0)
+        self.merged.merge(self.store)
+        self.game.update(self.merged, 0.016)
+
+        self.assertEqual(self.game.ball.position, Position(10, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
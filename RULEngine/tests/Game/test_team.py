@@ -3,7 +3,7 @@ import unittest
 from config.config_service import ConfigService
 from RULEngine.Game.Player import Player
 from RULEngine.Game.Team import Team
-from RULEngine.Util.constant import PLAYER_PER_TEAM
+from RULEngine.Util.constant import MAX_ROBOT_ID
 from RULEngine.Util.Position import Position
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.team_color_service import TeamColor
@@ -21,7 +21,8 @@ class TestTeam(unittest.TestCase):
         self.no_player = Player(self.team, 0)
 
     def test_init(self):
-        self.assertEqual(PLAYER_PER_TEAM, len(self.team.players))
+        self.assertEqual({}, self.team.available_players)
+        self.assertEqual(2, len(self.team.players))
         self.assertEqual(0, self.team.score)
         self.assertEqual(TeamColor.YELLOW, self.team.team_color)
 
@@ -32,17 +33,35 @@ class TestTeam(unittest.TestCase):
         self.assertFalse(self.team.has_player(self.no_player))
 
     def test_update_player(self):
-        init_pose = self.first_player.pose
+        init_pose = Pose(self.first_player.pose)
         self.assertEqual(init_pose, self.team.players[0].pose)
         self.team.update_player(0, [Pose(Position(500, 500))])
         self.assertNotEqual(init_pose, self.team.players[0].pose)
         self.assertEqual(self.team.players[0].pose, self.first_player.pose)
 
+    def test_filter_is_created_on_first_use(self):
+        self.assertIsNone(self.second_player._kf)
+        self.team.update_player(1, [Pose(Position(500, 500))])
+        self.assertIsNotNone(self.second_player._kf)
+
     def test_invalid_id(self):
-        AN_INVALID_ID = PLAYER_PER_TEAM+1
+        AN_INVALID_ID = MAX_ROBOT_ID+1
         uut = self.team.update_player
         self.assertRaises(KeyError, uut, AN_INVALID_ID, Pose())
 
+    def test_update_player_enters_it(self):
+        self.team.update_player(MAX_ROBOT_ID, [Pose(Position(500, 500))])
+        self.assertIs(self.team.available_players[MAX_ROBOT_ID], self.team.players[MAX_ROBOT_ID])
+        self.assertTrue(self.team.players[MAX_ROBOT_ID].in_play)
+
+    def test_update_roster(self):
+        self.team.update_roster([0, 3])
+        entered = self.team.update_roster([3, 7])
+
+        self.assertEqual([7], entered)
+        self.assertEqual({3, 7}, set(self.team.available_players))
+        self.assertFalse(self.first_player.in_play)
+
     def test_is_team_yellow(self):
         self.assertTrue(self.team.is_team_yellow())
         self.assertFalse(self.team_blue.is_team_yellow())
@@ -239,6 +239,10 @@ class TestPose(unittest.TestCase):
         self.assertEqual(pose_array[2], 3)
         self.assertTrue(type(pose_array) is np.ndarray)
 
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Pose().velocity = Pose()
+
     def test_to_tuple(self):
         uut = Pose()
         #sanity check
@@ -183,3 +183,30 @@ class TestPosition(unittest.TestCase):
         self.assertFalse(pos11 == pos10)
         self.assertFalse(pos10 == pos11)
 
+    def test_numpy_interop(self):
+        pos = Position(3, -4)
+
+        self.assertTrue(type(np.abs(pos)) is Position)
+        self.assertTrue(type(np.array([1, 2]) + pos) is Position)
+        self.assertEqual(np.array([1, 2]) + pos, Position(4, -2))
+        self.assertEqual(np.linalg.norm(pos), 5)
+        self.assertEqual(np.dot(pos, Position(1, 1)), -1)
+        np.testing.assert_array_equal(np.array([pos, Position(1, 2)]), [[3, -4], [1, 2]])
+        np.testing.assert_array_equal(np.array([[0, 0], [1, 1]]) - pos, [[-3, 4], [-2, 5]])
+
+    def test_in_place_operations_are_shared(self):
+        pos = Position(1, 1)
+        alias = pos
+        alias += Position(1, 2)
+        alias *= 2
+        self.assertIs(alias, pos)
+        self.assertEqual(pos, Position(4, 6))
+
+    def test_division_by_zero_gives_inf(self):
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual((Position(1, 0) / 0).x, m.inf)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Position().w = 1
+
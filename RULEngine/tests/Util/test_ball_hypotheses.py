@@ -0,0 +1,67 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+import numpy as np
+
+from config.config_service import ConfigService
+from RULEngine.Util.kalman_filter.ball_hypotheses import BallHypotheses
+
+NCAMERAS = 2
+DT = 0.0166
+
+
+def detections(*balls):
+    """ Détections (caméras, balles, [x, y]) d'après des listes de balles par caméra. """
+    frame = np.full((NCAMERAS, 4, 2), np.nan)
+    for camera, positions in enumerate(balls):
+        for i, position in enumerate(positions):
+            frame[camera, i] = position
+    return frame
+
+
+class TestBallHypotheses(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_kalman_redirect_4_cam.cfg")
+        self.tracker = BallHypotheses(NCAMERAS, gating=True)
+
+    def test_spurious_detection_does_not_move_ball(self):
+        for frame in range(30):
+            ball = (20 * frame, 0)
+            parasite = [(3000, -2000)] if frame % 3 == 0 else []
+            state = self.tracker.filter(detections([ball] + parasite, [ball]), DT)
+
+        self.assertAlmostEqual(state[0], 20 * 30, delta=30)
+        self.assertAlmostEqual(state[1], 0, delta=5)
+
+    def test_ball_placed_elsewhere_takes_over(self):
+        for _ in range(30):
+            self.tracker.filter(detections([(0, 0)], []), DT)
+
+        for _ in range(10):
+            state = self.tracker.filter(detections([(2000, 1000)], []), DT)
+
+        np.testing.assert_allclose(state[:2], [2000, 1000], atol=5)
+
+    def test_without_gating_follows_last_detection(self):
+        tracker = BallHypotheses(NCAMERAS, gating=False)
+        for _ in range(20):
+            state = tracker.filter(detections([(3000, -2000), (100, 200)], []), DT)
+
+        self.assertEqual(tracker.size, 1)
+        np.testing.assert_allclose(state[:2], [100, 200], atol=5)
+
+    def test_asynchronous_fusion(self):
+        for frame in range(60):
+            camera = frame % 2
+            t = frame * 0.008
+            self.tracker.fuse(camera, detections([(1000 * t, 0)])[0], t)
+
+        state = self.tracker.estimate(0.5)
+        np.testing.assert_allclose(state[:2], [500, 0], atol=20)
+        self.assertAlmostEqual(state[2], 1000, delta=60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+import numpy as np
+
+from RULEngine.Util.image_transformer.camera_frame_store import BLUE, YELLOW, CameraFrameStore, MergedFrame
+
+
+class TestCameraFrameStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CameraFrameStore(2)
+
+    def test_empty_store_has_no_observation(self):
+        self.assertTrue(np.all(np.isnan(self.store.robot_observations(6))))
+        self.assertTrue(np.all(np.isnan(self.store.ball_observations())))
+
+    def test_robot_observations_layout(self):
+        self.store.begin_frame(1, 10, 0.5, 0)
+        self.store.set_robot(BLUE, 1, 2, 100, 200, 0.5, 0.9)
+        self.store.set_robot(YELLOW, 1, 0, -100, -200, -0.5, 0.8)
+
+        observations = self.store.robot_observations(6)
+
+        self.assertEqual(observations.shape, (12, 2, 3))
+        np.testing.assert_array_equal(observations[2, 1], [100, 200, 0.5])
+        np.testing.assert_array_equal(observations[6, 1], [-100, -200, -0.5])
+        self.assertTrue(np.all(np.isnan(observations[2, 0])))
+        self.assertEqual(np.count_nonzero(self.store.robot_valid), 2)
+
+    def test_new_frame_replaces_only_its_camera(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_ball(0, 1, 2, 1)
+        self.store.begin_frame(1, 1, 0, 0)
+        self.store.set_robots(BLUE, 1, np.array([[3, 10, 20, 0.1, 1]]))
+
+        self.store.begin_frame(1, 2, 0, 0)
+
+        np.testing.assert_array_equal(self.store.ball_observations()[0], [1, 2])
+        self.assertFalse(self.store.robot_valid[BLUE, 3, 1])
+        self.assertTrue(np.all(np.isnan(self.store.robots[BLUE, 3, 1])))
+        self.assertFalse(self.store.is_new_frame(1, 2))
+        self.assertTrue(self.store.is_new_frame(1, 3))
+
+    def test_keeps_every_ball_detection(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_ball(0, 1, 2, 0.9)
+        self.store.set_ball(0, 3, 4, 0.5)
+
+        self.assertEqual(self.store.ball_count[0], 2)
+        np.testing.assert_array_equal(self.store.ball_detections()[0, :2], [[1, 2], [3, 4]])
+        self.assertTrue(np.all(np.isnan(self.store.ball_detections()[0, 2:])))
+        np.testing.assert_array_equal(self.store.ball_observations()[0], [3, 4])
+
+        self.store.begin_frame(0, 2, 0, 0)
+        self.assertEqual(self.store.ball_count[0], 0)
+        self.assertTrue(np.all(np.isnan(self.store.ball_detections()[0])))
+
+    def test_robot_ids_out_of_range_are_ignored(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_robots(YELLOW, 0, np.array([[42, 10, 20, 0.1, 1], [1, 30, 40, 0.2, 1]]))
+
+        self.assertEqual(np.count_nonzero(self.store.robot_valid), 1)
+        np.testing.assert_array_equal(self.store.robots[YELLOW, 1, 0], [30, 40, 0.2])
+
+
+class TestMergedFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CameraFrameStore(2)
+        self.merged = MergedFrame()
+
+    def test_keeps_most_confident_detection_per_robot(self):
+        self.store.begin_frame(0, 1, 1.0, 0)
+        self.store.set_robots(BLUE, 0, np.array([[2, 10, 20, 0.1, 0.9], [4, 50, 60, 0.4, 0.3]]))
+        self.store.set_ball(0, 1, 2, 0.4)
+        self.store.begin_frame(1, 1, 1.5, 0)
+        self.store.set_robots(BLUE, 1, np.array([[2, 11, 21, 0.2, 0.5], [4, 51, 61, 0.5, 0.8]]))
+        self.store.set_ball(1, 3, 4, 0.9)
+        self.store.set_ball(1, 5, 6, 0.2)
+
+        self.merged.merge(self.store)
+
+        player_ids, poses = self.merged.players(BLUE)
+        np.testing.assert_array_equal(player_ids, [2, 4])
+        np.testing.assert_array_equal(poses, [[10, 20, 0.1], [51, 61, 0.5]])
+        self.assertEqual(self.merged.players(YELLOW)[0].size, 0)
+        self.assertTrue(self.merged.ball_valid)
+        np.testing.assert_array_equal(self.merged.ball, [3, 4])
+        self.assertEqual(self.merged.t_capture, 1.5)
+        self.assertEqual(self.merged.frame_number, 1)
+
+    def test_zero_confidence_is_ignored(self):
+        self.store.begin_frame(0, 1, 0, 0)
+        self.store.set_robot(YELLOW, 0, 1, 10, 20, 0, 0)
+        self.store.set_ball(0, 1, 2, 0)
+
+        self.merged.merge(self.store)
+
+        self.assertFalse(self.merged.robot_valid.any())
+        self.assertFalse(self.merged.ball_valid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+import numpy as np
+
+from RULEngine.Game.Field import normal
+from RULEngine.Util.field_geometry import FieldGeometry
+
+
+class TestFieldDistanceGrid(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.geometry = FieldGeometry(normal, distance_grid=True)
+        cls.grid = cls.geometry.distance_grid
+
+    def test_grid_is_optional(self):
+        self.assertIsNone(FieldGeometry(normal).distance_grid)
+
+    def test_analytic_distances(self):
+        points = np.array([[0, 0], [4000, 0], [5000, 0], [-3000, 2500]])
+
+        np.testing.assert_allclose(self.geometry.field_distances(points), [3000, 500, -500, 500])
+        # derrière la ligne de but, la moitié du disque compte comme zone de défense
+        np.testing.assert_allclose(self.geometry.defense_distances(points),
+                                   [3500, -500, -500, np.hypot(1500, 2250) - 1000])
+        np.testing.assert_allclose(self.geometry.legal_distances(points), [3000, -500, -500, 500])
+
+    def test_interpolation_matches_analytic_distances(self):
+        rng = np.random.RandomState(0)
+        points = rng.uniform((-5000, -3500), (5000, 3500), (2000, 2))
+
+        # l'erreur de l'interpolation reste sous la taille d'une case
+        np.testing.assert_allclose(self.grid.field_distances(points), self.geometry.field_distances(points),
+                                   atol=self.grid.resolution)
+        np.testing.assert_allclose(self.grid.defense_distances(points), self.geometry.defense_distances(points),
+                                   atol=self.grid.resolution)
+        np.testing.assert_allclose(self.grid.distances(points), self.geometry.legal_distances(points),
+                                   atol=self.grid.resolution)
+
+    def test_classification(self):
+        points = np.array([[0, 0], [4000, 0], [-4200, 100], [5000, 0], [0, 3300], [8000, 8000]])
+
+        np.testing.assert_array_equal(self.grid.outside_field(points), [False, False, False, True, True, True])
+        np.testing.assert_array_equal(self.grid.inside_defense_area(points), [False, True, True, True, False, False])
+        np.testing.assert_array_equal(self.grid.is_legal(points), [True, False, False, False, False, False])
+        np.testing.assert_array_equal(self.grid.is_legal(points, margin=3100), [False] * 6)
+
+    def test_gradient_points_inward(self):
+        gradients = self.grid.gradients(np.array([[0, 2900], [-2000, -2900], [3800, 0], [0, 9000]]))
+
+        np.testing.assert_allclose(gradients, [[0, -1], [0, 1], [-1, 0], [0, -1]], atol=1e-6)
+
+    def test_nearest_legal_points(self):
+        points = np.array([[0, 0], [4000, 0], [5000, 2000], [-4500, 0], [0, 9000]])
+
+        legal = self.grid.nearest_legal_points(points, margin=100)
+
+        np.testing.assert_array_equal(legal[0], [0, 0])
+        self.assertTrue(np.all(self.geometry.legal_distances(legal) > 100 - self.grid.resolution))
+        np.testing.assert_allclose(legal[1], [3400, 0], atol=self.grid.resolution)
+
+
+if __name__ == '__main__':
+    unittest.main()
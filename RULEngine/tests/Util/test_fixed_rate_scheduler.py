@@ -0,0 +1,65 @@
+# Under MIT License, see LICENSE.txt
+
+import threading
+import unittest
+
+from RULEngine.Util.fixed_rate_scheduler import FixedRateScheduler
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFixedRateScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = FixedRateScheduler(0.05, clock=self.clock)
+        self.scheduler.start()
+
+    def test_time_until_next_tick(self):
+        self.assertAlmostEqual(self.scheduler.time_until_next_tick(), 0.05)
+        self.clock.now += 0.02
+        self.assertAlmostEqual(self.scheduler.time_until_next_tick(), 0.03)
+        self.clock.now += 1
+        self.assertEqual(self.scheduler.time_until_next_tick(), 0)
+
+    def test_deadlines_do_not_drift(self):
+        for _ in range(10):
+            self.clock.now = self.scheduler.next_deadline + 0.004
+            self.scheduler.tick_started()
+            self.clock.now += 0.01
+            self.scheduler.tick_finished()
+        self.assertAlmostEqual(self.scheduler.next_deadline, 100.0 + 11 * 0.05)
+        self.assertEqual(self.scheduler.overrun_count, 0)
+        self.assertAlmostEqual(self.scheduler.last_jitter, 0.004)
+        self.assertAlmostEqual(self.scheduler.mean_jitter, 0.004)
+        self.assertAlmostEqual(self.scheduler.last_tick_period, 0.05)
+
+    def test_overrun_skips_missed_periods(self):
+        self.clock.now = self.scheduler.next_deadline
+        self.scheduler.tick_started()
+        self.clock.now += 0.12
+        self.scheduler.tick_finished()
+        self.assertEqual(self.scheduler.overrun_count, 1)
+        self.assertEqual(self.scheduler.missed_periods, 2)
+        self.assertGreater(self.scheduler.next_deadline, self.clock.now)
+        self.assertAlmostEqual(self.scheduler.next_deadline, 100.0 + 4 * 0.05)
+
+    def test_run_stops_on_event(self):
+        scheduler = FixedRateScheduler(0.001)
+        stop = threading.Event()
+        ticks = []
+
+        def task():
+            ticks.append(1)
+            if len(ticks) == 3:
+                stop.set()
+
+        scheduler.run(task, stop)
+        self.assertEqual(len(ticks), 3)
+        self.assertEqual(scheduler.tick_count, 3)
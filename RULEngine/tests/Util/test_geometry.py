@@ -60,6 +60,15 @@ class TestGeometry(unittest.TestCase):
         close_point = RULEngine.Util.geometry.get_closest_point_on_line(self.positionNE, self.position, self.positionN)
         self.assertEqual(close_point, self.positionN)
 
+    def test_remove_duplicates(self):
+        points = [self.position, self.positionN, RULEngine.Util.Position.Position(2, 1), self.positionS]
+        speeds = [0, 1, 2, 3]
+
+        kept_points, kept_speeds = RULEngine.Util.geometry.remove_duplicates(points, speeds, 5)
+
+        self.assertEqual(kept_points, [self.position, self.positionN, self.positionS])
+        self.assertEqual(kept_speeds, [0, 1, 3])
+
     # def test_get_required_kick_force(self): # simple calculation
 
 if __name__ == '__main__':
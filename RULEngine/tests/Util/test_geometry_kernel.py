@@ -0,0 +1,71 @@
+# Under MIT License, see LICENSE.txt
+
+import math as m
+import unittest
+import warnings
+
+import numpy as np
+
+from RULEngine.Util.Position import Position
+from RULEngine.Util.geometry_kernel import as_points, closest_points_on_lines, nearest_indexes, pairwise_distances, \
+    point_line_distances, point_segment_distances, segments_intersect_circles, wrap_to_pi
+
+
+class TestGeometryKernel(unittest.TestCase):
+
+    def test_as_points_from_positions(self):
+        points = as_points([Position(1, 2), Position(3, 4)])
+
+        np.testing.assert_array_equal(points, [[1, 2], [3, 4]])
+        self.assertEqual(as_points([]).shape, (0, 2))
+
+    def test_pairwise_distances(self):
+        distances = pairwise_distances([Position(0, 0), Position(3, 0)], [[0, 4], [3, 0], [0, 0]])
+
+        self.assertEqual(distances.shape, (2, 3))
+        np.testing.assert_allclose(distances, [[4, 3, 0], [5, 0, 3]])
+
+    def test_line_and_segment_distances(self):
+        points = np.array([[5, 3], [-4, 3], [14, 0]])
+
+        np.testing.assert_allclose(point_line_distances(points, [0, 0], [10, 0]), [3, 3, 0])
+        np.testing.assert_allclose(point_segment_distances(points, [0, 0], [10, 0]), [3, 5, 4])
+
+    def test_distances_to_many_segments(self):
+        starts = np.array([[0, 0], [0, 10]])
+        ends = np.array([[10, 0], [10, 10]])
+
+        distances = point_segment_distances(np.array([5, 4]), starts, ends)
+
+        np.testing.assert_allclose(distances, [4, 6])
+
+    def test_degenerate_line_is_its_start(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            closest = closest_points_on_lines(np.array([[3, 4]]), [1, 1], [1, 1])
+            distances = point_segment_distances(np.array([[4, 5]]), [1, 1], [1, 1])
+
+        np.testing.assert_array_equal(closest, [[1, 1]])
+        np.testing.assert_allclose(distances, [5])
+
+    def test_segments_intersect_circles(self):
+        centers = np.array([[5, 2], [5, 4], [12, 0]])
+
+        touched = segments_intersect_circles([0, 0], [10, 0], centers, [3, 3, 2.5])
+
+        np.testing.assert_array_equal(touched, [True, False, True])
+
+    def test_wrap_to_pi(self):
+        angles = wrap_to_pi(np.array([0, 3 * m.pi / 2, -3 * m.pi / 2, 4 * m.pi]))
+
+        np.testing.assert_allclose(angles, [0, -m.pi / 2, m.pi / 2, 0], atol=1e-12)
+        self.assertAlmostEqual(wrap_to_pi(2 * m.pi + 0.5), 0.5)
+
+    def test_nearest_indexes_keeps_ties_in_order(self):
+        points = [Position(10, 0), Position(0, 5), Position(-5, 0), Position(0, -10)]
+
+        np.testing.assert_array_equal(nearest_indexes(Position(), points, 3), [1, 2, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+import numpy as np
+
+from config.config_service import ConfigService
+from RULEngine.Util.Pose import Pose
+from RULEngine.Util.Position import Position
+from RULEngine.Util.kalman_filter.ball_kalman_filter import BallKalmanFilter
+from RULEngine.Util.kalman_filter.enemy_kalman_filter import EnemyKalmanFilter
+from RULEngine.Util.kalman_filter.friend_kalman_filter import FriendKalmanFilter
+from RULEngine.Util.kalman_filter.kalman_filter_bank import ENEMY_PROCESS_VARIANCES, FRIEND_PROCESS_VARIANCES, \
+    GATE_MAX_REJECTIONS, KalmanFilterBank, observations_from_poses
+
+NCAMERAS = 4
+FRAMES = 30
+
+
+def random_poses(rng, ncameras):
+    poses = []
+    for _ in range(ncameras):
+        if rng.rand() < 0.4:
+            poses.append(None)
+        else:
+            poses.append(Pose(Position(rng.uniform(-4000, 4000), rng.uniform(-3000, 3000)), rng.uniform(-3, 3)))
+    return poses
+
+
+class TestKalmanFilterBank(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_kalman_redirect_4_cam.cfg")
+        self.rng = np.random.RandomState(11)
+
+    def test_robots_match_single_filters(self):
+        bank = KalmanFilterBank.for_robots([FRIEND_PROCESS_VARIANCES, ENEMY_PROCESS_VARIANCES], NCAMERAS)
+        friend = FriendKalmanFilter()
+        enemy = EnemyKalmanFilter()
+        tracks = np.array([0, 1])
+        for _ in range(FRAMES):
+            dt = self.rng.uniform(0.01, 0.03)
+            friend_poses = random_poses(self.rng, NCAMERAS)
+            enemy_poses = random_poses(self.rng, NCAMERAS)
+            observations = np.array([observations_from_poses(friend_poses, 3),
+                                     observations_from_poses(enemy_poses, 3)])
+
+            states = bank.filter(tracks, observations, dt)
+
+            np.testing.assert_allclose(states[0], friend.filter(friend_poses, [0, 0, 0], dt).astype(float),
+                                       rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(states[1], enemy.filter(enemy_poses, dt).astype(float), rtol=1e-6, atol=1e-6)
+
+    def test_ball_view_matches_single_filter(self):
+        view = KalmanFilterBank.for_ball(NCAMERAS).view(0)
+        ball = BallKalmanFilter()
+        for _ in range(FRAMES):
+            dt = self.rng.uniform(0.01, 0.03)
+            positions = [None if self.rng.rand() < 0.4 else Position(self.rng.uniform(-4000, 4000),
+                                                                     self.rng.uniform(-3000, 3000))
+                         for _ in range(NCAMERAS)]
+
+            np.testing.assert_allclose(view.filter(positions, dt), ball.filter(positions, dt).astype(float),
+                                       rtol=1e-6, atol=1e-6)
+
+    def test_sequential_update_matches_batch_update(self):
+        variances = [FRIEND_PROCESS_VARIANCES, ENEMY_PROCESS_VARIANCES, ENEMY_PROCESS_VARIANCES]
+        batch = KalmanFilterBank.for_robots(variances, NCAMERAS, sequential=False)
+        sequential = KalmanFilterBank.for_robots(variances, NCAMERAS, sequential=True)
+        tracks = np.array([0, 1, 2])
+        for frame in range(FRAMES):
+            dt = self.rng.uniform(0.01, 0.03)
+            # caméras cohérentes entre elles: l'angle ne s'enroule pas différemment d'une caméra à l'autre
+            truth = np.array([[100 * frame, -50 * frame, 0.02 * frame]] * len(tracks))
+            observations = truth[:, np.newaxis, :] + self.rng.normal(0, [5, 5, 0.01], (len(tracks), NCAMERAS, 3))
+            observations[self.rng.rand(len(tracks), NCAMERAS) < 0.4] = np.nan
+
+            np.testing.assert_allclose(sequential.filter(tracks, observations, dt),
+                                       batch.filter(tracks, observations, dt), rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(sequential.P, batch.P, rtol=1e-6, atol=1e-6)
+
+    def test_steady_state_gain_follows_full_propagation(self):
+        full = KalmanFilterBank.for_robots([FRIEND_PROCESS_VARIANCES] * 2, NCAMERAS, steady_state_gain=False)
+        steady = KalmanFilterBank.for_robots([FRIEND_PROCESS_VARIANCES] * 2, NCAMERAS, steady_state_gain=True)
+        tracks = np.array([0, 1])
+        for frame in range(400):
+            truth = np.array([[10 * frame, -5 * frame, 0.002 * frame]] * len(tracks))
+            observations = truth[:, np.newaxis, :] + self.rng.normal(0, [5, 5, 0.01], (len(tracks), NCAMERAS, 3))
+            observations[:, 2:] = np.nan
+            if frame >= 300:
+                # la piste 1 n'est plus vue que par une caméra
+                observations[1, 1] = np.nan
+
+            np.testing.assert_allclose(steady.filter(tracks, observations, 0.0166),
+                                       full.filter(tracks, observations, 0.0166), atol=0.5)
+            if frame == 300:
+                self.assertFalse(self._uses_steady_state(steady, 1))
+
+        self.assertTrue(self._uses_steady_state(steady, 0))
+        self.assertTrue(self._uses_steady_state(steady, 1))
+
+    @staticmethod
+    def _uses_steady_state(bank, track):
+        return any(np.array_equal(bank.P[track], covariance) for _, covariance in bank._steady_states.values())
+
+    def test_asynchronous_fusion_tracks_moving_target(self):
+        bank = KalmanFilterBank.for_robots([ENEMY_PROCESS_VARIANCES], NCAMERAS)
+        velocity = np.array([1000, -500])
+        tracks = np.array([0])
+        for frame in range(200):
+            # deux caméras décalées d'une demi-image
+            camera = frame % 2
+            t = frame * 0.008
+            observations = np.full((1, NCAMERAS, 3), np.nan)
+            observations[0, camera] = tuple(velocity * t) + (0.1,)
+            bank.fuse(tracks, observations, t)
+
+        later = 199 * 0.008 + 0.05
+        state = bank.estimate(tracks, later)[0]
+
+        np.testing.assert_allclose(state[:2], velocity * later, atol=5)
+        np.testing.assert_allclose(state[2:4], velocity, atol=20)
+        self.assertAlmostEqual(bank.t[0], 199 * 0.008)
+
+    def test_late_frame_does_not_move_time_backward(self):
+        bank = KalmanFilterBank.for_robots([ENEMY_PROCESS_VARIANCES], NCAMERAS)
+        observations = np.full((1, NCAMERAS, 3), np.nan)
+        observations[0, 0] = 100, 200, 0
+        bank.fuse(np.array([0]), observations, 1.0)
+        bank.fuse(np.array([0]), observations, 0.5)
+
+        self.assertEqual(bank.t[0], 1.0)
+        np.testing.assert_array_equal(bank.estimate(np.array([0]), 1.0), bank.x[:1])
+
+    def test_unseen_track_is_only_predicted(self):
+        bank = KalmanFilterBank.for_robots([ENEMY_PROCESS_VARIANCES] * 2, NCAMERAS)
+        observations = np.full((2, NCAMERAS, 3), np.nan)
+        observations[0, 0] = 100, 200, 0.5
+        bank.filter(np.array([0, 1]), observations, 0.02)
+        covariance = bank.P[1].copy()
+
+        states = bank.filter(np.array([1]), np.full((1, NCAMERAS, 3), np.nan), 0.02)
+
+        np.testing.assert_array_equal(states[0], [9999, 9999, 0, 0, 0, 0])
+        self.assertTrue(np.all(np.diag(bank.P[1]) >= np.diag(covariance)))
+
+    def test_gating_rejects_outlier(self):
+        bank = KalmanFilterBank.for_robots([ENEMY_PROCESS_VARIANCES], NCAMERAS, gating=True)
+        tracks = np.array([0])
+        for frame in range(50):
+            observations = np.full((1, NCAMERAS, 3), np.nan)
+            observations[0, :2] = 10 * frame, 0, 0
+            bank.filter(tracks, observations, 0.0166)
+
+        observations = np.full((1, NCAMERAS, 3), np.nan)
+        observations[0, 0] = 500, 0, 0
+        observations[0, 1] = 3000, 3000, 0
+        state = bank.filter(tracks, observations, 0.0166)[0]
+
+        self.assertAlmostEqual(state[0], 510, delta=20)
+        self.assertAlmostEqual(state[1], 0, delta=5)
+
+    def test_gating_resets_lost_track(self):
+        bank = KalmanFilterBank.for_robots([ENEMY_PROCESS_VARIANCES], NCAMERAS, gating=True)
+        tracks = np.array([0])
+        observations = np.full((1, NCAMERAS, 3), np.nan)
+        observations[0, 0] = 0, 0, 0
+        for _ in range(50):
+            bank.filter(tracks, observations, 0.0166)
+
+        observations[0, 0] = 2000, 1000, 0
+        for _ in range(GATE_MAX_REJECTIONS):
+            state = bank.filter(tracks, observations, 0.0166)[0]
+            self.assertAlmostEqual(state[0], 0, delta=5)
+        for _ in range(3):
+            state = bank.filter(tracks, observations, 0.0166)[0]
+
+        np.testing.assert_allclose(state[:2], [2000, 1000], atol=20)
+
+    def test_squared_mahalanobis_marks_missing_observations(self):
+        bank = KalmanFilterBank.for_ball(NCAMERAS, size=2)
+        observations = np.array([[0, 0], [np.nan, np.nan], [3, 4]])
+
+        distances = bank.squared_mahalanobis(np.zeros((2, 4)), np.tile(np.eye(4), (2, 1, 1)), observations)
+
+        self.assertEqual(distances.shape, (2, 3))
+        np.testing.assert_allclose(distances[:, 0], 0)
+        self.assertTrue(np.all(np.isnan(distances[:, 1])))
+        np.testing.assert_allclose(distances[:, 2], 25 / 2)
+
+    def test_view_writes_into_bank(self):
+        bank = KalmanFilterBank.for_robots([FRIEND_PROCESS_VARIANCES] * 3, NCAMERAS)
+        view = bank.view(2)
+
+        view.filter([Pose(Position(100, 200), 1)], 0.02)
+
+        np.testing.assert_array_equal(view.x, bank.x[2])
+        self.assertAlmostEqual(bank.x[2][0], 100, delta=20)
+        np.testing.assert_array_equal(bank.x[0], [9999, 9999, 0, 0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, vision_coalescing_key
+from RULEngine.Util.latency_tracer import ClockOffsetEstimator, LatencyTracer
+from RULEngine.Util.stage_timer import StageTimers
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def vision_packet(frame_number, t_capture, t_sent):
+    packet = ssl_wrapper.SSL_WrapperPacket()
+    packet.detection.frame_number = frame_number
+    packet.detection.t_capture = t_capture
+    packet.detection.t_sent = t_sent
+    packet.detection.camera_id = 0
+    return packet.SerializeToString()
+
+
+class TestClockOffsetEstimator(unittest.TestCase):
+
+    def test_sliding_minimum(self):
+        estimator = ClockOffsetEstimator(window=3)
+        self.assertIsNone(estimator.offset)
+        self.assertEqual(estimator.update(0, 5), 5)
+        self.assertEqual(estimator.update(1, 9), 5)
+        self.assertEqual(estimator.update(2, 6), 4)
+        self.assertEqual(estimator.update(3, 10), 4)
+        self.assertEqual(estimator.update(4, 12), 4)
+        # le minimum à 4 sort de la fenêtre
+        self.assertEqual(estimator.update(5, 13), 7)
+        self.assertEqual(estimator.to_local(10), 17)
+
+
+class TestLatencyTracer(unittest.TestCase):
+
+    def setUp(self):
+        StageTimers().reset()
+        self.clock = FakeClock()
+        self.tracer = LatencyTracer(clock=self.clock)
+        self.buffer = RawPacketBuffer(ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+
+    def tearDown(self):
+        StageTimers().reset()
+
+    def test_breakdown(self):
+        # horloge de la vision en avance de 1000 s, délai réseau minimal 1 ms
+        self.buffer.append(vision_packet(1, 1000.0, 1000.002), t_recv=0.003)
+        self.clock.now = 0.005
+        self.tracer.frames_popped(self.buffer.pop_frames(), self.buffer)
+        self.clock.now = 0.006
+        self.tracer.frames_filtered()
+        self.clock.now = 0.016
+        self.tracer.ai_done()
+        self.clock.now = 0.017
+        self.tracer.commands_sent()
+
+        breakdown = self.tracer.last_breakdown
+        self.assertAlmostEqual(breakdown["vision"], 0.002)
+        self.assertAlmostEqual(breakdown["network"], 0)
+        self.assertAlmostEqual(breakdown["queueing"], 0.002)
+        self.assertAlmostEqual(breakdown["filtering"], 0.001)
+        self.assertAlmostEqual(breakdown["ai"], 0.01)
+        self.assertAlmostEqual(breakdown["send"], 0.001)
+        self.assertAlmostEqual(breakdown["total"], 0.017 - (1000.0 - 999.999))
+        self.assertEqual(StageTimers().get_stage("latency.total").count, 1)
+
+    def test_frames_wait_for_next_ai_tick(self):
+        self.buffer.append(vision_packet(1, 10.0, 10.001), t_recv=0.0)
+        self.tracer.ai_done()
+        self.tracer.frames_popped(self.buffer.pop_frames(), self.buffer)
+        self.tracer.frames_filtered()
+        self.tracer.commands_sent()
+        self.assertIsNone(self.tracer.last_breakdown)
+
+        self.tracer.ai_done()
+        self.tracer.commands_sent()
+        self.assertIsNotNone(self.tracer.last_breakdown)
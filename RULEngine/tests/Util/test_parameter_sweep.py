@@ -0,0 +1,113 @@
+# Under MIT License, see LICENSE.txt
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.util.packet_log import CHANNEL_VISION, PacketLogWriter
+from RULEngine.Util.kalman_filter.parameter_sweep import BALL_MODEL, BALL_OBSERVATION_GROUPS, BALL_PROCESS_GROUPS, \
+    DetectionStream, best_parameters, parameter_grid, read_detection_streams, sweep
+
+MEASUREMENT_NOISE = 10  # mm
+
+
+def noisy_ball_streams(rng, count=2, length=400):
+    streams = []
+    for i in range(count):
+        times = np.cumsum(rng.uniform(0.01, 0.02, length))
+        truth = np.stack([1000 * np.sin(times + i), 800 * np.cos(0.7 * times)], axis=1)
+        streams.append(DetectionStream(str(i), times, truth + rng.normal(0, MEASUREMENT_NOISE, truth.shape)))
+    return streams
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.RandomState(3)
+
+    def test_parameter_grid_ties_components(self):
+        process_variances, observation_variances = parameter_grid(BALL_PROCESS_GROUPS, BALL_OBSERVATION_GROUPS,
+                                                                  (0, 1), 4, 2)
+
+        self.assertEqual(process_variances.shape, (8, 4))
+        self.assertEqual(observation_variances.shape, (8, 2))
+        np.testing.assert_array_equal(process_variances[:, 0], process_variances[:, 1])
+        np.testing.assert_array_equal(observation_variances[:, 0], observation_variances[:, 1])
+        self.assertEqual(len({tuple(row) for row in np.hstack((process_variances, observation_variances))}), 8)
+
+    def test_sweep_finds_measurement_noise(self):
+        process_variances, observation_variances = parameter_grid(BALL_PROCESS_GROUPS, BALL_OBSERVATION_GROUPS,
+                                                                  range(-1, 5), 4, 2)
+
+        result = sweep(noisy_ball_streams(self.rng), process_variances, observation_variances, BALL_MODEL, 0.0166)
+
+        best, _, observation = best_parameters(result, process_variances, observation_variances, 1)[0]
+        np.testing.assert_array_equal(observation, [MEASUREMENT_NOISE ** 2] * 2)
+        # filtre cohérent: NIS moyenne proche du nombre de composantes observées
+        self.assertAlmostEqual(result.mean_nis[best], 2, delta=0.3)
+        self.assertLess(result.rms_innovation[best], 2 * MEASUREMENT_NOISE)
+
+    def test_sets_are_independent(self):
+        streams = noisy_ball_streams(self.rng)
+        process_variances, observation_variances = parameter_grid(BALL_PROCESS_GROUPS, BALL_OBSERVATION_GROUPS,
+                                                                  (0, 2), 4, 2)
+
+        batch = sweep(streams, process_variances, observation_variances, BALL_MODEL, 0.0166)
+        single = sweep(streams, process_variances[3:4], observation_variances[3:4], BALL_MODEL, 0.0166)
+
+        for batch_values, single_values in zip(batch, single):
+            self.assertAlmostEqual(batch_values[3], single_values[0])
+
+
+class TestReadDetectionStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "match.log")
+        writer = PacketLogWriter(self.path)
+        for frame_number in range(40):
+            packet = ssl_wrapper.SSL_WrapperPacket()
+            detection = packet.detection
+            detection.frame_number = frame_number
+            detection.t_capture = frame_number / 60
+            detection.t_sent = frame_number / 60
+            detection.camera_id = frame_number % 2
+            for confidence, x in ((0.2, -3000), (0.9, 10 * frame_number)):
+                ball = detection.balls.add()
+                ball.confidence = confidence
+                ball.x = x
+                ball.y = 0
+                ball.pixel_x = ball.pixel_y = 0
+            if frame_number < 30:
+                robot = detection.robots_yellow.add()
+                robot.confidence = 1
+                robot.robot_id = 3
+                robot.x = robot.y = 0
+                robot.orientation = 0.5
+                robot.pixel_x = robot.pixel_y = 0
+            writer.write(CHANNEL_VISION, [packet.SerializeToString()], frame_number / 60)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ball_stream_keeps_most_confident_ball(self):
+        stream, = read_detection_streams(self.path, "ball")
+
+        self.assertEqual(len(stream.times), 40)
+        np.testing.assert_allclose(stream.observations[:, 0], 10 * np.arange(40))
+
+    def test_robot_streams(self):
+        stream, = read_detection_streams(self.path, "robots")
+
+        self.assertEqual(stream.name, "yellow 3")
+        self.assertEqual(stream.observations.shape, (30, 3))
+        self.assertTrue(read_detection_streams(self.path, "robots", min_length=31) == [])
+
+
+if __name__ == '__main__':
+    unittest.main()
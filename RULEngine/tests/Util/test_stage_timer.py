@@ -0,0 +1,71 @@
+# Under MIT License, see LICENSE.txt
+
+import time
+import unittest
+
+from RULEngine.Util.stage_timer import HISTOGRAM_EDGES, StageHistogram, StageTimers
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStageHistogram(unittest.TestCase):
+
+    def test_ring_buffer_keeps_last_samples(self):
+        histogram = StageHistogram(capacity=4)
+        for duration in (0.001, 0.002, 0.003, 0.004, 0.005, 0.006):
+            histogram.record(duration)
+        self.assertEqual(histogram.count, 6)
+        self.assertAlmostEqual(histogram.last, 0.006)
+        self.assertEqual(sorted(histogram.recent_samples()), [0.003, 0.004, 0.005, 0.006])
+        self.assertAlmostEqual(histogram.maximum, 0.006)
+        self.assertAlmostEqual(histogram.mean, 0.0035)
+
+    def test_histogram_bins(self):
+        histogram = StageHistogram()
+        histogram.record(0.00005)
+        histogram.record(0.003)
+        histogram.record(1.0)
+        self.assertEqual(sum(histogram.bins), 3)
+        self.assertEqual(histogram.bins[0], 1)
+        self.assertEqual(histogram.bins[len(HISTOGRAM_EDGES)], 1)
+
+    def test_empty_summary(self):
+        summary = StageHistogram().summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertEqual(summary["p99"], 0.0)
+
+
+class TestStageTimers(unittest.TestCase):
+
+    def setUp(self):
+        self.timers = StageTimers()
+        self.timers.reset()
+        self.clock = FakeClock()
+        self.timers.clock = self.clock
+
+    def tearDown(self):
+        self.timers.reset()
+        self.timers.clock = time.perf_counter
+
+    def test_lap(self):
+        t = self.timers.now()
+        self.clock.now += 0.002
+        t = self.timers.lap("first", t)
+        self.clock.now += 0.005
+        self.timers.lap("second", t)
+
+        summary = self.timers.summary()
+        self.assertAlmostEqual(summary["first"]["last"], 2)
+        self.assertAlmostEqual(summary["second"]["p50"], 5)
+        self.assertEqual(summary["second"]["count"], 1)
+
+    def test_reset_capacity(self):
+        self.timers.reset(capacity=10)
+        self.timers.record("stage", 0.001)
+        self.assertEqual(self.timers.get_stage("stage").capacity, 10)
@@ -0,0 +1,132 @@
+# Under MIT License, see LICENSE.txt
+
+import math
+import unittest
+
+from config.config_service import ConfigService
+from RULEngine.Game.Game import ROBOT_TRACK_TIMEOUT, Game
+from RULEngine.Util.image_transformer.camera_frame_store import BLUE, CameraFrameStore
+from RULEngine.Util.Pose import Pose
+from RULEngine.Util.Position import Position
+from RULEngine.Util.world_snapshot import SnapshotDoubleBuffer, WorldSnapshot
+
+
+def camera_frame(ball, blue_poses):
+    frame = CameraFrameStore(1)
+    frame.begin_frame(0, 1, 0, 0)
+    frame.set_ball(0, ball.x, ball.y, 1)
+    for player_id, pose in blue_poses.items():
+        frame.set_robot(BLUE, 0, player_id, pose.position.x, pose.position.y, pose.orientation, 1)
+    return frame
+
+
+class TestSnapshotDoubleBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = SnapshotDoubleBuffer()
+
+    def test_empty(self):
+        self.assertIsNone(self.buffer.latest())
+        self.assertEqual(self.buffer.next_sequence(), 1)
+
+    def test_latest_is_last_published(self):
+        first = WorldSnapshot(self.buffer.next_sequence(), 0, 0.01, None, (), ())
+        self.buffer.publish(first)
+        second = WorldSnapshot(self.buffer.next_sequence(), 1, 0.01, None, (), ())
+        self.buffer.publish(second)
+        self.assertIs(self.buffer.latest(), second)
+        self.assertEqual(self.buffer.sequence, 2)
+        self.assertEqual(self.buffer.next_sequence(), 3)
+
+
+class TestGameSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_kalman_redirect.cfg")
+        self.game = Game()
+
+    def test_snapshot_does_not_touch_published_state(self):
+        initial_pose = self.game.blue_team.players[0].pose
+        frame = camera_frame(Position(100, 200), {0: Pose(Position(500, 500), 0.5)})
+        snapshot = self.game.kalman_snapshot(frame, 0.016, 1, 0)
+
+        self.assertIs(self.game.blue_team.players[0].pose, initial_pose)
+        self.assertEqual(len(snapshot.blue), 1)
+        self.assertEqual(snapshot.yellow, ())
+        self.assertNotEqual(snapshot.blue[0][1], initial_pose)
+
+    def test_apply_snapshot(self):
+        frame = camera_frame(Position(100, 200), {0: Pose(Position(500, 500), 0.5)})
+        snapshot = self.game.kalman_snapshot(frame, 0.016, 1, 0)
+        published_pose = self.game.blue_team.players[0].pose
+        published_ball = self.game.ball.position
+        self.game.apply_snapshot(snapshot, 0.05)
+
+        # l'état publié est réécrit en place, l'instantané reste indépendant
+        self.assertIs(self.game.blue_team.players[0].pose, published_pose)
+        self.assertIsNot(published_pose, snapshot.blue[0][1])
+        self.assertEqual(published_pose, snapshot.blue[0][1])
+        self.assertEqual(self.game.blue_team.players[0].velocity, snapshot.blue[0][2])
+        self.assertIs(self.game.ball.position, published_ball)
+        self.assertEqual(published_ball, snapshot.ball[0])
+        self.assertEqual(self.game.delta_t, 0.05)
+
+    def test_kalman_update_writes_in_place(self):
+        frame = camera_frame(Position(100, 200), {0: Pose(Position(500, 500), 0.5)})
+        self.game.kalman_update_players(frame, 0.016)
+        player = self.game.blue_team.players[0]
+        pose, velocity, ball_position = player.pose, player.velocity, self.game.ball.position
+
+        self.game.kalman_update_players(frame, 0.016)
+        self.game.kalman_update_ball(frame, 0.016)
+
+        self.assertIs(player.pose, pose)
+        self.assertIs(player.velocity, velocity)
+        self.assertIs(self.game.ball.position, ball_position)
+        self.assertAlmostEqual(pose.position.x, 500, delta=20)
+        self.assertAlmostEqual(ball_position.x, 100, delta=1)
+
+    def test_asynchronous_fusion_estimate(self):
+        frame = camera_frame(Position(100, 200), {0: Pose(Position(500, 500), 0.5)})
+        self.game.fuse_camera_frames(frame, lambda t_capture: 10.0)
+        snapshot = self.game.kalman_estimate_snapshot(1, 10.0, 0.016)
+
+        self.assertAlmostEqual(snapshot.blue[0][1].position.x, 500, delta=20)
+        self.assertAlmostEqual(snapshot.ball[0].x, 100, delta=1)
+        self.assertEqual(snapshot.timestamp, 10.0)
+
+    def test_roster_follows_vision(self):
+        frame = camera_frame(Position(0, 0), {0: Pose(Position(500, 500), 0), 13: Pose(Position(-500, 0), 0)})
+        self.game.kalman_update_players(frame, 0.016)
+        self.assertEqual({0, 13}, set(self.game.blue_team.available_players))
+
+        frame = camera_frame(Position(0, 0), {13: Pose(Position(-500, 0), 0)})
+        for _ in range(int(ROBOT_TRACK_TIMEOUT / 0.016)):
+            self.game.kalman_update_players(frame, 0.016)
+        self.assertEqual({0, 13}, set(self.game.blue_team.available_players))
+
+        self.game.kalman_update_players(frame, 0.016)
+        self.assertEqual({13}, set(self.game.blue_team.available_players))
+        self.assertFalse(self.game.blue_team.players[0].in_play)
+        self.assertAlmostEqual(self.game.blue_team.players[13].pose.position.x, -500, delta=20)
+
+    def test_extrapolate_snapshot(self):
+        snapshot = WorldSnapshot(1, 2.0, 0.016, (Position(0, 0), Position(100, 0)),
+                                 ((0, Pose(Position(10, 20), 0), Pose(Position(0, -100), 1)),), ())
+
+        extrapolated = self.game.extrapolate_snapshot(snapshot, 2.5)
+
+        self.assertEqual(extrapolated.timestamp, 2.5)
+        self.assertEqual(extrapolated.ball[0], Position(50, 0))
+        self.assertEqual(extrapolated.blue[0][1].position, Position(10, -30))
+        self.assertAlmostEqual(extrapolated.blue[0][1].orientation, 0.5)
+
+    def test_extrapolated_orientation_is_wrapped(self):
+        snapshot = WorldSnapshot(1, 2.0, 0.016, (Position(0, 0), Position(0, 0)),
+                                 ((0, Pose(Position(0, 0), 3), Pose(Position(0, 0), 1)),),
+                                 ((1, Pose(Position(0, 0), -3), Pose(Position(0, 0), -1)),))
+
+        extrapolated = self.game.extrapolate_snapshot(snapshot, 2.5)
+
+        self.assertAlmostEqual(extrapolated.blue[0][1].orientation, 3.5 - 2 * math.pi)
+        self.assertAlmostEqual(extrapolated.yellow[0][1].orientation, 2 * math.pi - 3.5)
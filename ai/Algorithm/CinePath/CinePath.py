@@ -6,7 +6,7 @@ from RULEngine.Util.Position import Position
 class CinePath:
     def __init__(self, world_state):
         self.game = world_state.game_state
-        self.__path = [[] for _ in range(6)]
+        self.__path = {}
         self.__ratio = 1.0
         self.__max_t = 2.0
         self.__max_speed = 500.0
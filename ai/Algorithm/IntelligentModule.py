@@ -56,11 +56,8 @@ class Pathfinder(IntelligentModule, metaclass=ABCMeta):
     def __init__(self, worldstate):
         super().__init__(worldstate)
 
-        # TODO see if we can remove this part!
+        # chemins par id des robots en jeu, remplis par update
         self.paths = {}
-        # TODO insert constant for max numbers of robots below instead of 11!
-        for i in range(11):
-            self.paths[i] = []
 
     def str(self):
         """
@@ -41,8 +41,6 @@ class PathfinderRRT(Pathfinder):
         """
         super().__init__(p_worldstate)
         self.paths = {}
-        for i in range(6):
-            self.paths[i] = []
 
         # self.last_timestamp = self.ws.game_state.get_timestamp()
 
@@ -68,7 +66,7 @@ class PathfinderRRT(Pathfinder):
         """
             Retourne la trajectoire du robot.
 
-            :param pid: Identifiant du robot, 0 à 5.
+            :param pid: Identifiant du robot.
             :return: Une liste de Pose, [Pose]
         """
 
@@ -81,25 +79,22 @@ class PathfinderRRT(Pathfinder):
         """
             Cette méthode calcul la trajectoire pour un robot.
 
-            :param pid: L'identifiant du robot, 0 à 5.
+            :param pid: L'identifiant du robot.
             :return: None
         """
 
         # TODO mettre les buts dans les obstacles
-        list_of_pid = list(range(6))
-        list_of_other_team_pid = list(range(6))
-        list_of_pid.remove(pid)
         obstacleList = []
-        for other_pid in list_of_pid:
-
-            # TODO info manager changer get_player_position
-            position = self.ws.game_state.get_player_pose(other_pid).position
+        for player in self.ws.game_state.my_team.available_players.values():
+            if player.id == pid:
+                continue
+            position = player.pose.position
             obstacleList.append([position.x, position.y, OBSTACLE_DEAD_ZONE])
 
         initial_position_of_main_player = self.ws.game_state.get_player_pose(pid).position
 
-        for pid in list_of_other_team_pid:
-            position = self.ws.game_state.get_player_pose(pid,False).position
+        for player in self.ws.game_state.other_team.available_players.values():
+            position = player.pose.position
             obstacleList.append([position.x, position.y, OBSTACLE_DEAD_ZONE])
 
         target_position_of_player = target.position
@@ -0,0 +1,159 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Prédiction de la trajectoire de la balle. La trajectoire est calculée une
+    fois par frame à partir de la position et de la vitesse filtrées de la
+    balle (filtre de Kalman), puis partagée par toutes les tactiques qui
+    l'interrogent.
+
+    Modèle: la balle roule en ligne droite et ralentit à décélération
+    constante (frottement de roulement) jusqu'à l'arrêt. Les rebonds ne sont
+    pas modélisés.
+"""
+import math
+
+import numpy as np
+
+from RULEngine.Util.Position import Position
+from ai.Algorithm.IntelligentModule import IntelligentModule
+
+__author__ = 'RoboCupULaval'
+
+# nom du module dans le ModuleState
+BALL_TRAJECTORY_MODULE = "BallTrajectory"
+
+BALL_ROLLING_DECELERATION = 400  # mm/s^2
+TRAJECTORY_HORIZON = 3  # s
+TRAJECTORY_STEP = 0.01  # s
+BALL_STOPPED_SPEED = 1  # mm/s
+
+
+class BallTrajectory(IntelligentModule):
+    """
+        Trajectoire de la balle échantillonnée sur un horizon fixe:
+            times: (N,) temps depuis maintenant (s)
+            travelled: (N,) distance parcourue (mm), croissante
+            positions: (N, 2) positions (mm)
+    """
+
+    def __init__(self, world_state, horizon=TRAJECTORY_HORIZON, step=TRAJECTORY_STEP,
+                 deceleration=BALL_ROLLING_DECELERATION):
+        super().__init__(world_state)
+        self.step = step
+        self.deceleration = deceleration
+        self.times = np.arange(0, horizon + step / 2, step)
+        self.travelled = np.zeros(len(self.times))
+        self.positions = np.zeros((len(self.times), 2))
+        self.origin = np.zeros(2)
+        self.direction = np.zeros(2)
+        self.speed = 0
+        self.stop_time = 0
+        self._ball_state = None
+        self._defense_area_entries = {}
+
+    def update(self):
+        self._refresh()
+
+    def str(self):
+        return "BallTrajectory: origine {}, vitesse {} mm/s, arrêt dans {} s".format(self.origin, self.speed,
+                                                                                     self.stop_time)
+
+    def _refresh(self):
+        """ Recalcule la trajectoire si l'état filtré de la balle a changé depuis le dernier calcul. """
+        game_state = self.ws.game_state
+        position = game_state.get_ball_position()
+        velocity = game_state.get_ball_velocity()
+        ball_state = (position.x, position.y, velocity.x, velocity.y)
+        if ball_state != self._ball_state:
+            self.rollout(*ball_state)
+            self._ball_state = ball_state
+
+    def rollout(self, x, y, vx, vy):
+        """ Calcule la trajectoire d'une balle en (x, y) avec la vitesse (vx, vy). """
+        self.origin = np.array([x, y], dtype=float)
+        self.speed = math.hypot(vx, vy)
+        if self.speed < BALL_STOPPED_SPEED:
+            self.speed = 0
+            self.direction = np.zeros(2)
+            self.stop_time = 0
+        else:
+            self.direction = np.array([vx, vy]) / self.speed
+            self.stop_time = self.speed / self.deceleration
+
+        t = np.minimum(self.times, self.stop_time)
+        self.travelled = self.speed * t - self.deceleration * t ** 2 / 2
+        self.positions = self.origin + self.travelled[:, np.newaxis] * self.direction
+        self._defense_area_entries = {}
+
+    def position_at(self, t: float) -> Position:
+        """ Position de la balle dans t secondes, en O(1). Après l'horizon, la dernière position prédite. """
+        self._refresh()
+        index = t / self.step
+        if index >= len(self.times) - 1:
+            return Position(*self.positions[-1])
+        if index <= 0:
+            return Position(*self.origin)
+        i = int(index)
+        fraction = index - i
+        x, y = self.positions[i] + (self.positions[i + 1] - self.positions[i]) * fraction
+        return Position(x, y)
+
+    def velocity_at(self, t: float) -> Position:
+        self._refresh()
+        speed = max(self.speed - self.deceleration * t, 0)
+        return Position(*(self.direction * speed))
+
+    def time_to_travel(self, distance: float):
+        """ Temps pour que la balle parcoure distance (mm), en O(log n). None si elle n'y arrive pas dans l'horizon. """
+        self._refresh()
+        if distance <= 0:
+            return 0.0
+        i = int(np.searchsorted(self.travelled, distance))
+        if i >= len(self.times) or self.travelled[i] < distance:
+            return None
+        # interpolation dans l'intervalle [i - 1, i]
+        covered = self.travelled[i] - self.travelled[i - 1]
+        return float(self.times[i - 1] + self.step * (distance - self.travelled[i - 1]) / covered)
+
+    def time_to_reach_x(self, x: float):
+        """ Temps pour que la balle atteigne la ligne verticale x. None si elle ne l'atteint pas. """
+        self._refresh()
+        if self.direction[0] == 0:
+            return 0.0 if self.origin[0] == x else None
+        distance = (x - self.origin[0]) / self.direction[0]
+        if distance < 0:
+            return None
+        return self.time_to_travel(distance)
+
+    def time_to_enter_defense_area(self, field, is_yellow: bool):
+        """
+            Temps pour que la balle entre dans la zone de défense (voir
+            Field.is_inside_goal_area). 0 si elle y est déjà, None si elle n'y
+            entre pas dans l'horizon. Calculé une fois par trajectoire et par
+            zone.
+        """
+        self._refresh()
+        try:
+            return self._defense_area_entries[is_yellow]
+        except KeyError:
+            pass
+        inside = field.geometry.inside_goal_area(self.positions, is_yellow)
+        entry = None
+        if inside.any():
+            entry = float(self.times[np.argmax(inside)])
+        self._defense_area_entries[is_yellow] = entry
+        return entry
+
+    def first_reachable(self, position: Position, speed: float):
+        """
+            Premier point de la trajectoire qu'un robot en position, allant en
+            ligne droite à speed (mm/s), atteint avant la balle.
+
+            :return: (temps, Position) ou None si aucun point n'est atteignable dans l'horizon
+        """
+        self._refresh()
+        distances = np.hypot(self.positions[:, 0] - position.x, self.positions[:, 1] - position.y)
+        reachable = distances <= self.times * speed
+        if not reachable.any():
+            return None
+        i = int(np.argmax(reachable))
+        return float(self.times[i]), Position(*self.positions[i])
@@ -7,6 +7,7 @@ from RULEngine.Util import Position
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.constant import PLAYER_PER_TEAM, TeamColor, ROBOT_RADIUS
 from RULEngine.Util.geometry import *
+from RULEngine.Util.geometry_kernel import as_point, as_points, distances
 from RULEngine.Util.team_color_service import TeamColorService
 from ai.states.game_state import GameState
 from typing import Union
@@ -28,17 +29,17 @@ def player_with_ball(min_dist_from_ball = 1.2*ROBOT_RADIUS):
 def closest_players_to_point(point: Position, our_team = None):
     # Retourne une liste de tuples (player, distance) en ordre croissant de distance,
     # our_team pour obtenir une liste contenant une équipe en particulier
-    list_player = []
+    players = []
     if our_team or our_team == None:
-        for i in GameState().my_team.available_players.values():
-            # les players friends
-            player_distance = get_distance(i.pose.position, point)
-            list_player.append(PlayerPosition(i, player_distance))
+        # les players friends
+        players += GameState().my_team.available_players.values()
     if not our_team or our_team == None:
-        for i in GameState().other_team.available_players.values():
-            # les players ennemis
-            player_distance = get_distance(i.pose.position, point)
-            list_player.append(PlayerPosition(i, player_distance))
+        # les players ennemis
+        players += GameState().other_team.available_players.values()
+    if not players:
+        return []
+    players_distance = distances(as_points([i.pose.position for i in players]), as_point(point)).tolist()
+    list_player = [PlayerPosition(i, player_distance) for i, player_distance in zip(players, players_distance)]
     list_player = sorted(list_player, key=lambda x: x.distance)
     return list_player
 
@@ -118,29 +119,39 @@ def best_passing_option(passing_player):
 def line_of_sight_clearance(player, target: Position):
     # Retourne un score en fonction du dégagement de la trajectoire (plus c'est dégagé plus le score est petit)
     score = np.linalg.norm(player.pose.position - target)
-    for j in GameState().my_team.available_players.values():
-        # Obstacle : les players friends
-        if not (j.id == player.id or j.pose.position == target):
-            score *= trajectory_score(player.pose.position, target, j.pose.position)
-    for j in GameState().other_team.available_players.values():
-        # Obstacle : les players ennemis
-        score *= trajectory_score(player.pose.position, target, j.pose.position)
+    obstacles = [j.pose.position for j in GameState().my_team.available_players.values()
+                 if not (j.id == player.id or j.pose.position == target)]
+    obstacles += [j.pose.position for j in GameState().other_team.available_players.values()]
+    if not obstacles:
+        return score
+    # les scores de tous les obstacles en un appel, multipliés dans l'ordre des joueurs
+    for obstacle_score in trajectory_scores(player.pose.position, target, obstacles).tolist():
+        score *= obstacle_score
     return score
 
 
 def trajectory_score(pointA : Position, pointB: Position, obstacle: Position):
     # Retourne un score en fonction de la distance de l'obstacle par rapport à la trajectoire AB
-    proportion_max = 15 # Proportion du triangle rectancle derrière les robots obstacles
-    AB = pointB - pointA
-    AO = obstacle - pointA
-    normAC = np.dot(AB, AO) / np.linalg.norm(AB)
-    normOC = np.sqrt(np.linalg.norm(AO) ** 2 - (normAC) ** 2)
-    if (normAC < 0) or (normAC > 1.1 * np.linalg.norm(AB)):
-        return 1
-    else:
-        return max(1, min(normAC / normOC, proportion_max))
+    return trajectory_scores(pointA, pointB, [obstacle])[0]
 
 
+def trajectory_scores(pointA: Position, pointB: Position, obstacles) -> np.ndarray:
+    # trajectory_score de chaque obstacle, calculé en lot
+    proportion_max = 15 # Proportion du triangle rectancle derrière les robots obstacles
+    A = as_point(pointA)
+    AB = as_point(pointB) - A
+    AO = as_points(obstacles) - A
+    normAB = np.sqrt(AB[0] * AB[0] + AB[1] * AB[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normAC = (AO[:, 0] * AB[0] + AO[:, 1] * AB[1]) / normAB
+        # la norme au carré, arrondie comme np.linalg.norm(AO) ** 2: un obstacle aligné garde normOC nul
+        normOC = np.sqrt(np.sqrt(AO[:, 0] * AO[:, 0] + AO[:, 1] * AO[:, 1]) ** 2 - normAC ** 2)
+        ratio = normAC / normOC
+    # max(1, min(ratio, proportion_max)) de Python: un ratio NaN donne 1
+    ratio = np.where(ratio > proportion_max, proportion_max, ratio)
+    scores = np.where(ratio > 1, ratio, 1.0)
+    return np.where((normAC < 0) | (normAC > 1.1 * normAB), 1.0, scores)
+
 
 def is_player_facing_target(player, target_position: Position, tolerated_angle: float) -> bool:
     """
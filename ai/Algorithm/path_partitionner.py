@@ -4,6 +4,7 @@ from RULEngine.Game.OurPlayer import OurPlayer
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.Position import Position
 from RULEngine.Util.geometry import get_distance, conv_position_2_list, remove_duplicates
+from RULEngine.Util.geometry_kernel import as_point, as_points, distances
 from ai.Algorithm.IntelligentModule import Pathfinder
 from ai.states.world_state import WorldState
 import numpy as np
@@ -70,7 +71,7 @@ class Path:
         return length
 
     def quick_update_path(self, player):
-        self.points[0] = player.pose.position
+        self.points[0] = Position(player.pose.position)
         return self.generate_path_from_points(self.points, self.speeds, 80)
 
 
@@ -139,7 +140,7 @@ class PathPartitionner(Pathfinder):
             self.path = self.remove_redundant_points()
 
         else:
-            self.path = Path(self.player.pose.position, pose_target.position)
+            self.path = Path(Position(self.player.pose.position), pose_target.position)
             if self.path.get_path_length() < 1:
                 """
                 hack shady pour eviter une erreur shady (trop fatiguer pour dealer ak ste shit la)
@@ -177,7 +178,7 @@ class PathPartitionner(Pathfinder):
             self.players_obstacles.append(player)
             i += 1
 
-        self.path = Path(self.player.pose.position, pose_target.position)
+        self.path = Path(Position(self.player.pose.position), pose_target.position)
 
         return self.fastpathplanner(self.path)
 
@@ -186,31 +187,39 @@ class PathPartitionner(Pathfinder):
             obstacles = self.pose_obstacle
         if tolerance is None:
             tolerance = self.gap_proxy
-        for idx, points in enumerate(path.points[:-1]):
-            pose_start = path.points[idx]
-            pose_target = path.points[idx + 1]
-            direction = (pose_target - pose_start)
-            if np.linalg.norm(direction) < 0.00001:
-                return False
-            else:
-                direction = direction / np.linalg.norm(direction)
-            distance_sub_path = np.linalg.norm(pose_start - pose_target)
-            if distance_sub_path > 0.01:
-                for pose_obs in obstacles:
-                    vec_robot_2_obs = pose_obs - pose_start
-                    dist_from_path = np.linalg.norm(np.cross(direction, vec_robot_2_obs))
-                    projection_obs_on_direction = \
-                        np.dot(direction, vec_robot_2_obs / np.linalg.norm(vec_robot_2_obs))
-                    if projection_obs_on_direction < 0.00001 or projection_obs_on_direction > 1:
-                        #le vecteur entre l'obstacle et la ligne n'est pas perpendiculaire
-                        dist_from_path_temp = np.linalg.norm(pose_start - pose_obs)
-                        if dist_from_path_temp > np.linalg.norm(pose_target - pose_obs):
-                            dist_from_path = np.linalg.norm(pose_target - pose_obs)
-                        else:
-                            dist_from_path = dist_from_path_temp
-                    if tolerance > dist_from_path:
-                        return True
-        return False
+        return bool(np.any(self.colliding_obstacles(path, obstacles, tolerance)))
+
+    @staticmethod
+    def colliding_obstacles(path, obstacles, tolerance):
+        """
+            Masque des obstacles trop près d'un des segments du chemin: tous
+            les segments contre tous les obstacles en un seul calcul. Les
+            segments qui suivent un segment dégénéré ne sont pas vérifiés.
+        """
+        points = as_points(path.points)
+        obstacles = as_points(obstacles)
+        pose_starts, pose_targets = points[:-1], points[1:]
+        lengths = distances(pose_targets, pose_starts)
+        degenerate = np.flatnonzero(lengths < 0.00001)
+        if degenerate.size:
+            pose_starts, pose_targets, lengths = \
+                pose_starts[:degenerate[0]], pose_targets[:degenerate[0]], lengths[:degenerate[0]]
+        long_enough = lengths > 0.01
+        pose_starts, pose_targets, lengths = pose_starts[long_enough], pose_targets[long_enough], lengths[long_enough]
+
+        # (segments, obstacles)
+        directions = ((pose_targets - pose_starts) / lengths[:, np.newaxis])[:, np.newaxis]
+        vec_robot_2_obs = obstacles[np.newaxis] - pose_starts[:, np.newaxis]
+        dist_start_2_obs = np.hypot(vec_robot_2_obs[..., 0], vec_robot_2_obs[..., 1])
+        dist_from_path = np.abs(directions[..., 0] * vec_robot_2_obs[..., 1] -
+                                directions[..., 1] * vec_robot_2_obs[..., 0])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            projection_obs_on_direction = np.einsum('...i,...i', directions, vec_robot_2_obs) / dist_start_2_obs
+        # le vecteur entre l'obstacle et la ligne n'est pas perpendiculaire: distance à l'extrémité la plus proche
+        dist_to_ends = np.minimum(dist_start_2_obs, distances(pose_targets[:, np.newaxis], obstacles[np.newaxis]))
+        dist_from_path = np.where((projection_obs_on_direction < 0.00001) | (projection_obs_on_direction > 1),
+                                  dist_to_ends, dist_from_path)
+        return np.any(tolerance > dist_from_path, axis=0)
 
     def find_closest_obstacle(self, point, path):
 
@@ -222,27 +231,25 @@ class PathPartitionner(Pathfinder):
             return [closest_obs, dist_point_obs, closest_player]
         if point == path.start:
             return [closest_obs, dist_point_obs, closest_player]
-        pose_start = path.start
-        direction = (point - pose_start) / np.linalg.norm(point - pose_start)
-
-        for idx, pose_obs in enumerate(self.pose_obstacle):
-            vec_robot_2_obs_temp = pose_obs - pose_start
-            dist_from_path_temp = np.linalg.norm(np.cross(direction, vec_robot_2_obs_temp))
-            if self.gap_proxy > dist_from_path_temp and self.is_path_collide(path, [pose_obs]):
-                obstacle_pos = Position(pose_obs)
-                dist = (path.start - obstacle_pos).norm()
-                if dist < dist_point_obs:
-                    dist_point_obs = dist
-                    closest_obs = obstacle_pos
-                    closest_player = self.players_obstacles[idx]
+        pose_start = as_point(path.start)
+        direction = (as_point(point) - pose_start) / np.linalg.norm(point - path.start)
+
+        obstacles = as_points(self.pose_obstacle)
+        vec_robot_2_obs = obstacles - pose_start
+        dist_from_path = np.abs(direction[0] * vec_robot_2_obs[:, 1] - direction[1] * vec_robot_2_obs[:, 0])
+        candidates = np.flatnonzero((self.gap_proxy > dist_from_path) &
+                                    self.colliding_obstacles(path, obstacles, self.gap_proxy))
+        if candidates.size:
+            dist_start_2_obs = distances(obstacles[candidates], pose_start)
+            closest = int(np.argmin(dist_start_2_obs))
+            idx = int(candidates[closest])
+            dist_point_obs = float(dist_start_2_obs[closest])
+            closest_obs = Position(obstacles[idx])
+            closest_player = self.players_obstacles[idx]
         return [closest_obs, dist_point_obs, closest_player]
 
     def verify_sub_target(self, sub_target):
-        for pose_obs in self.pose_obstacle:
-            dist_sub_2_obs = (Position(pose_obs) - sub_target).norm()
-            if dist_sub_2_obs < self.gap_proxy:
-                return True
-        return False
+        return bool(np.any(distances(as_points(self.pose_obstacle), as_point(sub_target)) < self.gap_proxy))
 
     def search_point(self, path, avoid_dir=None):
 
@@ -8,7 +8,9 @@ from RULEngine.Util.Position import Position
 from RULEngine.Util.constant import PLAYER_PER_TEAM
 from RULEngine.Util.area import stayInsideCircle, stayOutsideCircle
 from RULEngine.Util.geometry import get_angle, get_closest_point_on_line
+from ai.Algorithm.ball_trajectory import BALL_TRAJECTORY_MODULE
 from ai.STA.Action.Action import Action
+from ai.states.module_state import ModuleState
 from ai.Util.ai_command import AICommand, AICommandType
 from ai.states.game_state import GameState
 
@@ -18,7 +20,8 @@ __author__ = 'Robocup ULaval'
 class ProtectGoal(Action):
     """
     Action ProtectGoal: Action de base pour le gardien de but. Déplace le gardien entre la balle et le centre du but, à
-    une certaine distance de celui-ci, tout en restant dans la zone du gardien.
+    une certaine distance de celui-ci, tout en restant dans la zone du gardien. Si la trajectoire prédite de la balle
+    franchit la ligne de but devant la zone du gardien, il se place entre la balle et ce point plutôt que le centre.
     Méthodes:
         exec(self): Retourne la pose où se rendre.
     Attributs (en plus de ceux de Action):
@@ -55,9 +58,12 @@ class ProtectGoal(Action):
         ball_position = self.game_state.get_ball_position()
         goal_x = self.game_state.const["FIELD_X_RIGHT"] if self.is_right_goal else self.game_state.const["FIELD_X_LEFT"]
         goal_position = Position(goal_x, 0)
+        shot_target = self._shot_target(goal_x)
+        if shot_target is None:
+            shot_target = goal_position
 
-        # Calcul de la position d'interception entre la balle et le centre du but
-        destination_position = get_closest_point_on_line(goalkeeper_position, goal_position, ball_position)
+        # Calcul de la position d'interception entre la balle et le point visé du but
+        destination_position = get_closest_point_on_line(goalkeeper_position, shot_target, ball_position)
 
         # Vérification que destination_position respecte la distance minimale
         destination_position = stayOutsideCircle(destination_position, goal_position, self.minimum_distance)
@@ -78,3 +84,16 @@ class ProtectGoal(Action):
                          pose_goal=destination_pose,
                          pathfinder_on=True)
 
+    def _shot_target(self, goal_x):
+        """
+        Point où la trajectoire prédite de la balle franchit la ligne de but, s'il est devant la zone du gardien.
+        :return: La Position du point, ou None si la balle ne se dirige pas vers le but.
+        """
+        trajectory = ModuleState().acquire_module(BALL_TRAJECTORY_MODULE)
+        time_to_goal = trajectory.time_to_reach_x(goal_x)
+        if not time_to_goal:
+            return None
+        crossing = trajectory.position_at(time_to_goal)
+        if not self.game_state.const["FIELD_GOAL_Y_BOTTOM"] <= crossing.y <= self.game_state.const["FIELD_GOAL_Y_TOP"]:
+            return None
+        return crossing
@@ -22,9 +22,10 @@ from . Strategy import Strategy
 class SimpleDefense(Strategy):
     def __init__(self, game_state: GameState):
         super().__init__(game_state)
-        robot1 = self.game_state.my_team.available_players[5]
-        robot2 = self.game_state.my_team.available_players[3]
-        robot3 = self.game_state.my_team.available_players[4]
+        players = self.pick_players(5, 3, 4)
+        if players is None:
+            return
+        robot1, robot2, robot3 = players
         goal1 = Pose(Position(-1636, 0))
         goal2 = Pose(Position(1636, 0))
         self.add_tactic(robot1.id, GoalKeeper(self.game_state, robot1))
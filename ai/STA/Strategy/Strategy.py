@@ -1,11 +1,13 @@
 # Under MIT license, see LICENSE.txt
 
 from abc import ABCMeta
-from typing import List, Tuple, Callable, Dict
+from typing import List, Tuple, Callable, Dict, Optional
 
-from RULEngine.Util.constant import PLAYER_PER_TEAM
+from RULEngine.Game.OurPlayer import OurPlayer
+from RULEngine.Util.constant import MAX_ROBOT_ID
 from ai.Algorithm.Graph.Graph import Graph
 from ai.Algorithm.Graph.Node import Node
+from ai.STA.Tactic.Stop import Stop
 from ai.STA.Tactic.Tactic import Tactic
 from ai.Util.ai_command import AICommand
 from ai.states.game_state import GameState
@@ -23,9 +25,23 @@ class Strategy(metaclass=ABCMeta):
         assert isinstance(p_game_state, GameState)
         self.game_state = p_game_state
         self.graphs = []
-        for i in range(PLAYER_PER_TEAM):
+        for i in range(MAX_ROBOT_ID + 1):
             self.graphs.append(Graph())
 
+    def pick_players(self, *player_ids: int) -> Optional[List[OurPlayer]]:
+        """
+        Choisit les joueurs des rôles de la stratégie parmi les joueurs en jeu.
+        :param player_ids: Les ids préférés, un par rôle. Un robot absent est remplacé par un joueur en jeu sans rôle.
+        :return: Les joueurs dans l'ordre des rôles, ou None s'il n'y a pas assez de joueurs en jeu: les robots
+        reçoivent alors la tactique Stop.
+        """
+        available = self.game_state.my_team.available_players
+        spares = iter([player for player_id, player in sorted(available.items()) if player_id not in player_ids])
+        players = [available[player_id] if player_id in available else next(spares, None) for player_id in player_ids]
+        if any(player is None for player in players):
+            return None
+        return players
+
     def add_tactic(self, robot_id: int, tactic: Tactic) -> None:
         """
         Ajoute une tactique au graph des tactiques d'un robot.
@@ -74,6 +90,9 @@ class Strategy(metaclass=ABCMeta):
         """
         commands = {}
         for player in self.game_state.my_team.available_players.values():
+            if not self.graphs[player.id].nodes:
+                # robot entré en jeu après la création de la stratégie
+                self.add_tactic(player.id, Stop(self.game_state, player))
             commands[player.id] = self.graphs[player.id].exec()
             player.ai_command = commands[player.id]
         return commands
@@ -18,9 +18,10 @@ class BambaFollow(Strategy):
     def __init__(self, p_game_state):
         super().__init__(p_game_state)
 
-        robot1 = self.game_state.my_team.available_players[4]
-        robot2 = self.game_state.my_team.available_players[2]
-        robot3 = self.game_state.my_team.available_players[3]
+        players = self.pick_players(4, 2, 3)
+        if players is None:
+            return
+        robot1, robot2, robot3 = players
         self.add_tactic(robot1.id, DemoFollowBall(self.game_state, robot1))
         self.add_tactic(robot2.id, DemoFollowRobot(self.game_state, robot2, args=[robot1.id]))
         self.add_tactic(robot3.id, DemoFollowRobot(self.game_state, robot3, args=[robot2.id]))
@@ -4,7 +4,6 @@ from functools import partial
 
 from RULEngine.Util.Pose import Position, Pose
 from ai.STA.Strategy.Strategy import Strategy
-from RULEngine.Util.constant import PLAYER_PER_TEAM
 from ai.STA.Tactic.GoToPositionNoPathfinder import GoToPositionNoPathfinder
 from ai.STA.Tactic.goToPositionPathfinder import GoToPositionPathfinder
 from ai.STA.Tactic.Stop import Stop
@@ -17,9 +16,10 @@ class IndianaJones(Strategy):
         super().__init__(p_game_state)
         # ID Robot Indiana Jones : 0
         # ID Robot obstacles mouvants : 1 et 2
-        indiana = self.game_state.my_team.available_players[4]
-        obs_right = self.game_state.my_team.available_players[5]
-        obs_left = self.game_state.my_team.available_players[3]
+        players = self.pick_players(4, 5, 3)
+        if players is None:
+            return
+        indiana, obs_right, obs_left = players
 
         # Positions objectifs d'Indiana Jones
         goal_left = (Pose(Position(self.game_state.const["FIELD_GOAL_YELLOW_X_LEFT"], 0), 0))
@@ -50,9 +50,9 @@ class IndianaJones(Strategy):
         self.add_condition(obs_right.id, 0, 1, partial(self.condition, obs_right))
         self.add_condition(obs_right.id, 1, 0, partial(self.condition, obs_right))
 
-        for i in range(PLAYER_PER_TEAM):
-            if not (i == obs_right.id or i == obs_left.id or i == indiana.id):
-                self.add_tactic(i, Stop(self.game_state, i))
+        for player in self.game_state.my_team.available_players.values():
+            if not (player.id == obs_right.id or player.id == obs_left.id or player.id == indiana.id):
+                self.add_tactic(player.id, Stop(self.game_state, player))
 
         # print("{} -- {} \n {} -- {}".format(y_down, y_top, x_right, x_left))
 
@@ -45,7 +45,7 @@ class GoGetBall(Tactic):
         Tactic.__init__(self, game_state, player, target, args)
         self.current_state = self.get_behind_ball
         self.next_state = self.get_behind_ball
-        self.last_ball_position = self.game_state.get_ball_position()
+        self.last_ball_position = Position(self.game_state.get_ball_position())
         self.last_angle = 0
         self.last_time = time.time()
 
@@ -76,7 +76,7 @@ class GoGetBall(Tactic):
     def start_dribbler(self):
         now = time.time()
         if now - self.last_time > COMMAND_DELAY:
-            self.last_ball_position = self.game_state.get_ball_position()
+            self.last_ball_position = Position(self.game_state.get_ball_position())
             self.last_angle = self.player.pose.orientation
             self.next_state = self.grab_ball
         return AllStar(self.game_state, self.player, **{"dribbler_on": 2})
@@ -43,7 +43,7 @@ class Bump(Tactic):
         self.debug_interface = DebugInterface()
         self.move_action = self._generate_move_to()
         self.move_action.status_flag = Flags.SUCCESS
-        self.last_ball_position = self.game_state.get_ball_position()
+        self.last_ball_position = Position(self.game_state.get_ball_position())
         self.charge_time = 0
         self.last_time = time.time()
 
@@ -64,7 +64,7 @@ class Bump(Tactic):
 
         if self._is_player_opposing_ball_and_target():
             self.next_state = self.push_ball
-            self.last_ball_position = self.game_state.get_ball_position()
+            self.last_ball_position = Position(self.game_state.get_ball_position())
         else:
             # self.debug.add_log(4, "Distance from ball: {}".format(dist))
             self.next_state = self.get_behind_ball
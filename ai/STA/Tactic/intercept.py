@@ -6,12 +6,14 @@ from RULEngine.Game.OurPlayer import OurPlayer
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.Position import Position
 from RULEngine.Util.constant import BALL_RADIUS, ROBOT_RADIUS
+from ai.Algorithm.ball_trajectory import BALL_TRAJECTORY_MODULE
 from ai.STA.Action.Idle import Idle
 from ai.STA.Action.grab import Grab
 from ai.STA.Tactic.Tactic import Tactic
 from ai.STA.Tactic.tactic_constants import Flags
 from ai.STA.Action.GoBehind import GoBehind
 from ai.states.game_state import GameState
+from ai.states.module_state import ModuleState
 
 __author__ = 'RoboCupULaval'
 
@@ -39,56 +41,23 @@ class Intercept(Tactic):
         self.current_state = self.go_between_ball_and_target
         self.next_state = self.go_between_ball_and_target
 
-    # def go_intercept_ball(self):
-    #
-    #     ball_np = self.game_state.get_ball_position().conv_2_np()
-    #     vect_ball_2_robot = self.player_position - ball_np
-    #     ball_velocity = self.game_state.get_ball_velocity().conv_2_np()
-    #     angle_robot_ball_speed = np.arctan2(-ball_velocity[0], -ball_velocity[1]) - np.arctan2(vect_ball_2_robot[0],
-    #                                                                                          vect_ball_2_robot[1])
-    #     terme_1 = 2 * self.player.max_acc * np.linalg.norm(vect_ball_2_robot) ** 2
-    #     terme_2 = 4 * self.player.max_acc * np.linalg.norm(vect_ball_2_robot) ** 2 * np.linalg.norm(
-    #         ball_velocity) ** 2 * \
-    #               np.sin(angle_robot_ball_speed) ** 2
-    #     terme_3 = 4 * self.player.max_acc * np.linalg.norm(vect_ball_2_robot) * np.linalg.norm(ball_velocity) * \
-    #               np.linalg.norm(self.player.velocity) * np.cos(angle_robot_ball_speed) + \
-    #               np.linalg.norm(self.player.velocity) ** 2
-    #     terme_4 = 2 * np.linalg.norm(vect_ball_2_robot) * np.linalg.norm(ball_velocity) * \
-    #               np.cos(angle_robot_ball_speed) + np.linalg.norm(self.player.velocity)
-    #     terme_5 = self.player.max_acc - 2 * np.linalg.norm(vect_ball_2_robot) ** 2
-    #     print(angle_robot_ball_speed)
-    #     print(terme_1)
-    #     print(terme_2)
-    #     print(terme_3)
-    #     print(terme_4)
-    #     print(terme_5)
-    #     if np.abs(terme_5) < 0.1:
-    #         t = np.linalg.norm(vect_ball_2_robot) ** 2 / terme_4
-    #     else:
-    #         t = np.abs((np.sqrt(terme_1 - terme_2 + terme_3) - terme_4) / terme_5)
-    #     print(t)
-    #     target = ball_np + ball_velocity * t
-    #     print(target)
-    #     vec_target_2_robot = self.player_position - target
-    #     if np.linalg.norm(ball_velocity) < 50 and np.linalg.norm(vect_ball_2_robot) < 1000:
-    #         #la balle va lentement et on va la pogner
-    #         self.next_state = self.grab_ball
-    #     elif np.linalg.norm(vec_target_2_robot) > 2000:
-    #         #fuck off la balle est trop loin
-    #         self.status_flag = Flags.FAILURE
-    #         self.next_state = self.halt
-    #     else:
-    #         # wouf wouf
-    #         self.next_state = self.go_intercept_ball
-    #
-    #     return GoToPositionPathfinder(self.game_state, self.player_id,
-    #                                   Pose(Position.from_np(target), np.arctan2(ball_velocity[0], ball_velocity[1])))
+    def _interception_point(self):
+        """ Premier point de la trajectoire prédite de la balle que le joueur peut atteindre avant elle. """
+        trajectory = ModuleState().acquire_module(BALL_TRAJECTORY_MODULE)
+        # max_speed est en m/s, la trajectoire en mm
+        reachable = trajectory.first_reachable(self.player.pose.position, self.player.max_speed * 1000)
+        if reachable is None:
+            return None
+        return reachable[1]
 
     def go_between_ball_and_target(self):
         self.status_flag = Flags.WIP
         ball = self.game_state.get_ball_position()
         ball_velocity = self.game_state.get_ball_velocity().conv_2_np()
         if np.linalg.norm(ball_velocity) > 50:
+            interception_point = self._interception_point()
+            if interception_point is not None:
+                ball = interception_point
             self.target = Pose(Position.from_np(ball.conv_2_np() - ball_velocity), 0)
             dist_behind = np.linalg.norm(ball_velocity) + 1/np.sqrt(np.linalg.norm(ball_velocity))
         else:
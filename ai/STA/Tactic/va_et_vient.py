@@ -14,7 +14,7 @@ from ai.states.game_state import GameState
 class VaEtVient(Tactic):
     def __init__(self, game_state: GameState, player: OurPlayer, target: Pose=Pose(), args: List[str]=None):
         super().__init__(game_state, player, target, args)
-        self.start = self.player.pose
+        self.start = Pose(self.player.pose)
         self.end = Pose(position=self.target.position, orientation=0)
 
     def exec(self):
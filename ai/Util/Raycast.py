@@ -2,9 +2,11 @@
 
 from math import cos, sin
 
+import numpy as np
+
 from RULEngine.Util.Position import Position
-from RULEngine.Util.constant import PLAYER_PER_TEAM, ROBOT_RADIUS, BALL_RADIUS
-from RULEngine.Util.geometry import get_closest_point_on_line, get_distance
+from RULEngine.Util.constant import ROBOT_RADIUS, BALL_RADIUS
+from RULEngine.Util.geometry_kernel import as_point, as_points, point_line_distances
 from ai.states.game_state import GameState
 __author__ = 'RoboCupULaval'
 
@@ -63,26 +65,17 @@ def raycast2(game_state, initial_position, final_position, width,
     assert isinstance(yellow_players_ignored, list)
     assert isinstance(is_ball_ignored, bool)
 
-    for i in range(0, PLAYER_PER_TEAM):
-        if i not in blue_players_ignored:
-            player_position = game_state.get_player_pose(i).position
-            pos = get_closest_point_on_line(player_position, initial_position,
-                                            final_position)
-            if get_distance(player_position, pos) <= width + ROBOT_RADIUS:
-                return True
-
-        if i not in yellow_players_ignored:
-            enemy_position = game_state.get_player_pose(i, False).position
-            pos = get_closest_point_on_line(enemy_position, initial_position,
-                                            final_position)
-            if get_distance(enemy_position, pos) <= width + ROBOT_RADIUS:
-                return True
-
+    obstacles = [player.pose.position for player in game_state.my_team.available_players.values()
+                 if player.id not in blue_players_ignored]
+    obstacles += [player.pose.position for player in game_state.other_team.available_players.values()
+                  if player.id not in yellow_players_ignored]
+    radii = [ROBOT_RADIUS] * len(obstacles)
     if not is_ball_ignored:
-        ball_position = game_state.get_ball_position()
-        pos = get_closest_point_on_line(ball_position, initial_position,
-                                        final_position)
-        if get_distance(ball_position, pos) <= width + BALL_RADIUS:
-            return True
+        obstacles.append(game_state.get_ball_position())
+        radii.append(BALL_RADIUS)
+    if not obstacles:
+        return False
 
-    return False
+    # distances de tous les obstacles à la droite du rayon en un seul appel
+    line_distances = point_line_distances(as_points(obstacles), as_point(initial_position), as_point(final_position))
+    return bool(np.any(line_distances <= width + np.array(radii)))
@@ -1,5 +1,6 @@
 # Under MIT License, see LICENSE.txt
 
+from ai.Algorithm.ball_trajectory import BALL_TRAJECTORY_MODULE, BallTrajectory
 from ai.executors.executor import Executor
 from ai.executors.pathfinder_module import PathfinderModule
 from ai.states.world_state import WorldState
@@ -27,4 +28,5 @@ class ModuleExecutor(Executor):
 
         :return: None
         """
+        self.ws.module_state.register_module(BALL_TRAJECTORY_MODULE, BallTrajectory(self.ws))
         self.ws.module_state.pathfinder_module = PathfinderModule(self.ws)
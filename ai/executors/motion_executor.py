@@ -5,6 +5,7 @@ import numpy as np
 from RULEngine.Util.Pose import Pose
 from RULEngine.Util.Position import Position
 from RULEngine.Util.PID import PID
+from RULEngine.Util.constant import MAX_ROBOT_ID
 from ai.Util.ai_command import AICommandType, AIControlLoopType, AICommand
 from ai.executors.executor import Executor
 from ai.states.world_state import WorldState
@@ -27,7 +28,8 @@ class MotionExecutor(Executor):
     def __init__(self, p_world_state: WorldState):
         super().__init__(p_world_state)
         is_simulation = ConfigService().config_dict["GAME"]["type"] == "sim"
-        self.robot_motion = [RobotMotion(p_world_state, player_id, is_sim=is_simulation) for player_id in range(12)]
+        self.robot_motion = [RobotMotion(p_world_state, player_id, is_sim=is_simulation)
+                             for player_id in range(MAX_ROBOT_ID + 1)]
 
     def exec(self):
         for player in self.ws.game_state.my_team.available_players.values():
@@ -201,7 +203,7 @@ class RobotMotion(object):
         self.current_pose = self.ws.game_state.game.friends.players[self.id].pose.conv_2_np()
         self.current_pose = self.current_pose/ np.array([1000, 1000, 1])
         self.current_orientation = self.current_pose[Pos.THETA]
-        self.current_velocity = self.ws.game_state.game.friends.players[self.id].velocity
+        self.current_velocity = Pose(self.ws.game_state.game.friends.players[self.id].velocity)
         self.current_velocity.position = self.current_velocity.position / 1000
 
         # Desired parameters
@@ -36,46 +36,37 @@ class GameState(object, metaclass=Singleton):
 
     def get_player(self, player_id: int, is_my_team=True) -> Player:
         """
-        Retourne l'instance du joueur avec id player_id dans l'équipe choisit
+        Retourne l'instance du joueur avec id player_id dans l'équipe choisit. Un joueur qui n'est pas en jeu garde sa
+        dernière pose connue.
 
         :param player_id: id of the desired player
         :param is_my_team: True for ally team, False for opponent team
         :return: the player instance
         """
-        try:
-            if is_my_team:
-                return self.my_team.available_players[player_id]
-            else:
-                return self.other_team.available_players[player_id]
-        except Exception as e:
-            print(e)
-            raise e
+        if is_my_team:
+            return self.my_team.players[player_id]
+        else:
+            return self.other_team.players[player_id]
 
     def get_player_pose(self, player_id: int, is_my_team=True) -> Pose:
         """
-            Retourne la pose d'un joueur d'une équipe
+            Retourne la pose d'un joueur d'une équipe, la dernière connue s'il n'est pas en jeu
 
             :param is_my_team: Booléen avec valeur vrai par défaut, l'équipe du joueur est mon équipe
             :param player_id: identifiant du joueur, en int
             :return: L'instance Pose de la pose du joueur
         """
-        if is_my_team:
-            return self.my_team.available_players[player_id].pose
-        else:
-            return self.other_team.available_players[player_id].pose
+        return self.get_player(player_id, is_my_team).pose
 
     def get_player_position(self, player_id: int, is_my_team=True) -> Position:
         """
-            Retourne la position d'un joueur d'une équipe
+            Retourne la position d'un joueur d'une équipe, la dernière connue s'il n'est pas en jeu
 
             :param is_my_team: Booléen avec valeur vrai par défaut, l'équipe du joueur est mon équipe
             :param player_id: identifiant du joueur, en int
             :return: L'instance Position de la position du joueur
         """
-        if is_my_team:
-            return self.my_team.available_players[player_id].pose.position
-        else:
-            return self.other_team.available_players[player_id].pose.position
+        return self.get_player(player_id, is_my_team).pose.position
 
     def get_ball_position(self) -> Position:
         """
@@ -0,0 +1,248 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Banc d'essai de l'intelligence artificielle sans réseau: construit le
+    Coach et la Game à partir d'une configuration, les alimente avec des
+    frames de vision synthétiques ou enregistrées (voir packet_log) et mesure
+    la latence d'un tour de boucle, au total et par exécuteur.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from RULEngine.Communication.protobuf import messages_robocup_ssl_wrapper_pb2 as ssl_wrapper
+from RULEngine.Communication.receiver.log_replay import PacketLogReplay
+from RULEngine.Communication.sender.grsim_command_sender import GrSimCommandSender
+from RULEngine.Communication.util.raw_packet_buffer import RawPacketBuffer, vision_coalescing_key
+from RULEngine.Debug.debug_interface import DebugInterface
+from RULEngine.Game.Game import Game
+from RULEngine.Game.Referee import Referee
+from RULEngine.Util.image_transformer.image_transformer_factory import ImageTransformerFactory
+from RULEngine.Util.reference_transfer_object import ReferenceTransferObject
+from RULEngine.Util.stage_timer import SUMMARY_PERCENTILES, StageTimers
+from RULEngine.Util.team_color_service import TeamColorService
+from coach import Coach
+from config.config_service import ConfigService
+
+__author__ = 'RoboCupULaval'
+
+SYNTHETIC_CAMERA_RATE = 60  # Hz
+TICK_STAGE = "benchmark.tick"
+
+
+def set_arg_parser():
+    prog_desc = "Banc d'essai de l'IA: mesure la latence des tours de boucle sans grSim ni caméras."
+    arg_parser = argparse.ArgumentParser(prog="RobocupULaval's Team ULtron AI benchmark", description=prog_desc)
+
+    arg_parser.add_argument('config_file', nargs='?', help="load a configuration file(.ini/cfg style)",
+                            default="config/sim_kalman_redirect.cfg")
+    arg_parser.add_argument('--log', help="replay the vision of a recorded packet log instead of synthetic frames")
+    arg_parser.add_argument('--ticks', type=int, default=1000, help="number of measured ai ticks")
+    arg_parser.add_argument('--warmup', type=int, default=50, help="number of ai ticks before measuring")
+
+    return arg_parser
+
+
+class SyntheticVision(object):
+    """
+        Génère des SSL_WrapperPacket sérialisés: les robots tournent sur des
+        cercles et la balle fait des allers-retours. Les paquets de tous les
+        tours sont générés d'avance (prepare), hors des mesures; deliver met
+        ceux du prochain tour dans le tampon, comme le ferait le thread de
+        réception. Offre la même interface de lecture que les récepteurs.
+    """
+
+    def __init__(self, ai_timestamp, number_of_camera):
+        self.number_of_camera = number_of_camera
+        self.frames_per_tick = max(1, int(round(ai_timestamp * SYNTHETIC_CAMERA_RATE)))
+        self.frame_number = 0
+        self.packet_buffer = RawPacketBuffer(ssl_wrapper.SSL_WrapperPacket, vision_coalescing_key)
+        self._ticks = iter(())
+
+    def prepare(self, ticks):
+        """ Génère et sérialise les paquets de ticks tours. """
+        prepared = []
+        for _ in range(ticks):
+            tick = []
+            for _ in range(self.frames_per_tick):
+                self.frame_number += 1
+                for camera_id in range(self.number_of_camera):
+                    tick.append(self._packet(camera_id, self.frame_number))
+            prepared.append(tick)
+        self._ticks = iter(prepared)
+
+    def deliver(self):
+        """ Ajoute au tampon les paquets préparés du prochain tour. """
+        for data in next(self._ticks, ()):
+            self.packet_buffer.append(data)
+
+    def pop_frames(self):
+        return self.packet_buffer.pop_frames()
+
+    def pop_detection_frames(self):
+        return self.packet_buffer.pop_detection_frames()
+
+    def get_latest_frame(self):
+        return self.packet_buffer.get_latest_frame()
+
+    @staticmethod
+    def _packet(camera_id, frame_number):
+        t = frame_number / SYNTHETIC_CAMERA_RATE
+        packet = ssl_wrapper.SSL_WrapperPacket()
+        packet.detection.frame_number = frame_number
+        packet.detection.t_capture = t
+        packet.detection.t_sent = t
+        packet.detection.camera_id = camera_id
+
+        ball = packet.detection.balls.add()
+        ball.confidence = 1
+        ball.x = 3000 * math.sin(0.5 * t)
+        ball.y = 1000 * math.cos(0.3 * t)
+        ball.pixel_x = ball.x
+        ball.pixel_y = ball.y
+
+        for team, side in ((packet.detection.robots_blue, -1), (packet.detection.robots_yellow, 1)):
+            for robot_id in range(6):
+                angle = 0.4 * t + robot_id * math.pi / 3
+                robot = team.add()
+                robot.confidence = 1
+                robot.robot_id = robot_id
+                robot.x = side * 2000 + 1000 * math.cos(angle)
+                robot.y = 1000 * math.sin(angle)
+                robot.orientation = angle + math.pi / 2
+                robot.pixel_x = robot.x
+                robot.pixel_y = robot.y
+        return packet.SerializeToString()
+
+
+class NullCommandSender(GrSimCommandSender):
+    """ Construit et sérialise les paquets grSim, mais ne les envoie pas. """
+
+    def __init__(self):
+        self.sent_packets = 0
+
+    def _send_packet(self, packet):
+        packet.SerializeToString()
+        self.sent_packets += 1
+
+
+class AIBenchmark(object):
+    """ Reproduit le tour de boucle du Framework avec des senders bouchons. """
+
+    def __init__(self, log_path=None):
+        cfg = ConfigService()
+        self.ai_timestamp = float(cfg.config_dict["GAME"]["ai_timestamp"])
+        self.is_kalman = cfg.config_dict["IMAGE"]["kalman"] == "true"
+        self.fast_detection_decoder = cfg.config_dict["IMAGE"]["fast_decoder"] == "true"
+        if log_path:
+            self.replay = PacketLogReplay(log_path, speed=0, step=self.ai_timestamp)
+            self.vision = self.replay.vision_receiver()
+        else:
+            self.replay = None
+            self.vision = SyntheticVision(self.ai_timestamp, int(cfg.config_dict["IMAGE"]["number_of_camera"]))
+
+        self.debug = DebugInterface()
+        self.outgoing_debug = self.debug.debug_state
+        self.robot_command_sender = NullCommandSender()
+        self.image_transformer = ImageTransformerFactory.get_image_transformer()
+
+        self.game = Game()
+        self.game.set_referee(Referee())
+        self.reference_transfer_object = ReferenceTransferObject(self.game)
+        self.reference_transfer_object.set_debug([])
+        self.reference_transfer_object.team_color_svc = TeamColorService()
+
+        self.coach = Coach()
+        self.coach.set_reference(self.reference_transfer_object)
+        # les exécuteurs du Coach sont chronométrés par le Coach lui-même
+        self.stage_timers = StageTimers()
+
+    def run(self, ticks, warmup):
+        if self.replay is None:
+            # le générateur n'est pas mesuré: seuls des octets précalculés sont livrés pendant les tours
+            self.vision.prepare(warmup + ticks)
+        for _ in range(warmup):
+            self._deliver_vision()
+            self._tick()
+        self.stage_timers.reset(capacity=max(ticks, 1))
+
+        elapsed = 0
+        for _ in range(ticks):
+            self._deliver_vision()
+            start = time.perf_counter()
+            self._tick()
+            elapsed += time.perf_counter() - start
+            if self.replay is not None and self.replay.finished:
+                break
+        return elapsed
+
+    def _deliver_vision(self):
+        """ Paquets synthétiques du prochain tour, hors des mesures. Le rejeu livre lui-même à la lecture. """
+        if self.replay is None:
+            self.vision.deliver()
+
+    def _tick(self):
+        timers = self.stage_timers
+        tick_start = timers.now()
+        self._update_game()
+        t = timers.now()
+        robot_commands = self.coach.main_loop()
+        t = timers.lap("framework.ai", t)
+        self._send_commands(robot_commands)
+        timers.lap("framework.send", t)
+        timers.lap(TICK_STAGE, tick_start)
+
+    def _update_game(self):
+        timers = self.stage_timers
+        t = timers.now()
+        if self.fast_detection_decoder:
+            detections, vision_frames = self.vision.pop_detection_frames()
+            t = timers.lap("framework.vision_pop", t)
+            new_image_packet = self.image_transformer.update_detections(detections)
+        else:
+            vision_frames = self.vision.pop_frames()
+            t = timers.lap("framework.vision_pop", t)
+            new_image_packet = self.image_transformer.update(vision_frames)
+        t = timers.lap("framework.image_transformer", t)
+        if self.is_kalman or self.image_transformer.has_new_image():
+            self.game.update(new_image_packet, self.ai_timestamp)
+        timers.lap("framework.game_update", t)
+        self.game.field.update_field_dimensions(vision_frames)
+
+    def _send_commands(self, robot_commands):
+        for command in robot_commands:
+            self.robot_command_sender.send_command(command)
+        self.game.set_command(robot_commands)
+        for debug_command in self.outgoing_debug:
+            debug_command.get_packet_repr()
+        self.outgoing_debug.clear()
+
+    def report(self, elapsed):
+        tick_stage = self.stage_timers.get_stage(TICK_STAGE)
+        tick_count = tick_stage.count if tick_stage else 0
+        print("{} tours en {:.2f} s: {:.1f} tours/s, budget ai_timestamp {:.1f} ms"
+              .format(tick_count, elapsed, tick_count / elapsed if elapsed else 0, self.ai_timestamp * 1000))
+        print(format_latency_row("étape", None))
+        for name, summary in sorted(self.stage_timers.summary().items()):
+            print(format_latency_row(name, summary))
+        if tick_stage:
+            over_budget = int(np.count_nonzero(tick_stage.recent_samples() > self.ai_timestamp))
+            print("Tours hors budget: {} / {}".format(over_budget, tick_count))
+
+
+def format_latency_row(name, summary):
+    columns = ["p{}".format(p) for p in SUMMARY_PERCENTILES] + ["max"]
+    if summary is None:
+        return "{:<30}".format(name) + "".join("{:>10}".format(c + " ms") for c in columns)
+    return "{:<30}".format(name) + "".join("{:>10.3f}".format(summary[c]) for c in columns)
+
+
+if __name__ == '__main__':
+    parser = set_arg_parser()
+    args = parser.parse_args()
+
+    ConfigService().load_file(args.config_file)
+    benchmark = AIBenchmark(args.log)
+    benchmark.report(benchmark.run(args.ticks, args.warmup))
@@ -2,6 +2,7 @@
 from typing import List
 
 from RULEngine.Debug.debug_interface import DebugInterface
+from RULEngine.Util.stage_timer import StageTimers
 from RULEngine.Util.reference_transfer_object import ReferenceTransferObject
 from ai.states.world_state import WorldState
 from ai.executors.debug_executor import DebugExecutor
@@ -35,7 +36,7 @@ class Coach(object):
         self.module_executor = ModuleExecutor(self.world_state)
         self.motion_executor = MotionExecutor(self.world_state)
         self.robot_command_executor = CommandExecutor(self.world_state)
-
+        self.stage_timers = StageTimers()
 
         # logging
         DebugInterface().add_log(1, "\nCoach initialized with \nmode_debug_active = "+str(self.mode_debug_active) +
@@ -48,11 +49,18 @@ class Coach(object):
         :return: List(_Command) les commandes des robots
         """
         # main loop de l'IA
+        timers = self.stage_timers
+        t = timers.now()
         self.debug_executor.exec()
+        t = timers.lap("ai.debug", t)
         self.play_executor.exec()
+        t = timers.lap("ai.play", t)
         self.module_executor.exec()
+        t = timers.lap("ai.module", t)
         self.motion_executor.exec()
+        t = timers.lap("ai.motion", t)
         robot_commands = self.robot_command_executor.exec()
+        timers.lap("ai.command", t)
 
         return robot_commands
 
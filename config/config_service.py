@@ -26,18 +26,29 @@ default_dict = {"GAME": {"type": "sim",
                          "our_color": "blue",
                          "their_color": "yellow",
                          "autonomous_play": "false",
-                         "ai_timestamp": "0.05"},
+                         "ai_timestamp": "0.05",
+                         "field_distance_grid": "false"},
                 "COMMUNICATION": {"type": "sim",
+                                  "backend": "threaded",
                                   "redirect": "true",
                                   "udp_address": "224.5.23.2",
                                   "referee_port": "10003",
                                   "vision_port": "10020",
+                                  "replay_log": "",
+                                  "replay_speed": "1",
                                   "ui_debug_address": "127.0.0.1",
                                   "ui_cmd_sender_port": "20021",
                                   "ui_cmd_receiver_port": "10021",
                                   "ui_vision_sender_port": "10022"},
                 "IMAGE": {"kalman": "true",
-                          "number_of_camera": "1"},
+                          "number_of_camera": "1",
+                          "pipelined": "false",
+                          "fast_decoder": "true",
+                          "sequential_update": "false",
+                          "steady_state_gain": "false",
+                          "asynchronous_fusion": "false",
+                          "outlier_gating": "false"},
+                "OUTPUT": {"record_log": ""},
                 "STRATEGY": {"pathfinder": "path_part"},
                 "DEBUG": {"using_debug": "true",
                           "allow_debug": "true"}
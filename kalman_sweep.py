@@ -0,0 +1,64 @@
+# Under MIT License, see LICENSE.txt
+"""
+    Recherche des variances des filtres de Kalman sur un journal de paquets
+    enregistré (voir packet_log): toutes les combinaisons de puissances de
+    dix sont rejouées en lot et les meilleures sont affichées.
+"""
+
+import argparse
+import time
+
+from RULEngine.Util.kalman_filter.parameter_sweep import BALL_MODEL, BALL_OBSERVATION_GROUPS, BALL_PROCESS_GROUPS, \
+    PREDICTION_HORIZON, ROBOT_MODEL, ROBOT_OBSERVATION_GROUPS, ROBOT_PROCESS_GROUPS, best_parameters, \
+    parameter_grid, read_detection_streams, sweep
+from config.config_service import ConfigService
+
+__author__ = 'RoboCupULaval'
+
+
+def set_arg_parser():
+    prog_desc = "Recherche hors ligne des variances (Q, R) des filtres de Kalman sur un journal enregistré."
+    arg_parser = argparse.ArgumentParser(prog="RobocupULaval's Team ULtron Kalman sweep", description=prog_desc)
+
+    arg_parser.add_argument('log', help="recorded packet log (see OUTPUT record_log)")
+    arg_parser.add_argument('config_file', nargs='?', help="load a configuration file(.ini/cfg style)",
+                            default="config/sim_kalman_redirect.cfg")
+    arg_parser.add_argument('--target', choices=("robots", "ball"), default="robots", help="filter to tune")
+    arg_parser.add_argument('--exponents', type=int, nargs=2, default=(-3, 3), metavar=("LOW", "HIGH"),
+                            help="powers of ten tried for each tied group of variances")
+    arg_parser.add_argument('--horizon', type=float, default=PREDICTION_HORIZON,
+                            help="prediction horizon (s) of the scored prediction error")
+    arg_parser.add_argument('--top', type=int, default=10, help="number of parameter sets shown")
+
+    return arg_parser
+
+
+if __name__ == '__main__':
+    parser = set_arg_parser()
+    args = parser.parse_args()
+
+    ConfigService().load_file(args.config_file)
+    default_dt = float(ConfigService().config_dict["GAME"]["ai_timestamp"])
+    if args.target == "ball":
+        model, process_groups, observation_groups = BALL_MODEL, BALL_PROCESS_GROUPS, BALL_OBSERVATION_GROUPS
+    else:
+        model, process_groups, observation_groups = ROBOT_MODEL, ROBOT_PROCESS_GROUPS, ROBOT_OBSERVATION_GROUPS
+
+    streams = read_detection_streams(args.log, args.target)
+    if not streams:
+        raise SystemExit("Aucun flux de détections assez long dans {}.".format(args.log))
+    low, high = args.exponents
+    process_variances, observation_variances = parameter_grid(process_groups, observation_groups,
+                                                              range(low, high + 1), model.state_size,
+                                                              len(model.observed_components))
+
+    start = time.perf_counter()
+    result = sweep(streams, process_variances, observation_variances, model, default_dt, args.horizon)
+    elapsed = time.perf_counter() - start
+    print("{} jeux de paramètres x {} flux ({} mesures) en {:.1f} s"
+          .format(len(process_variances), len(streams), sum(len(stream.times) for stream in streams), elapsed))
+    print("{:>10}{:>10}{:>12}{:>12}  Q / R".format("score", "NIS", "innov. mm", "préd. mm"))
+    for i, process, observation in best_parameters(result, process_variances, observation_variances, args.top):
+        print("{:>10.2f}{:>10.2f}{:>12.2f}{:>12.2f}  {} / {}".format(
+            result.score[i], result.mean_nis[i], result.rms_innovation[i], result.rms_prediction_error[i],
+            " ".join("{:g}".format(q) for q in process), " ".join("{:g}".format(r) for r in observation)))
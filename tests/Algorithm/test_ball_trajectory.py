@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import MagicMock
+
+from config.config_service import ConfigService
+from RULEngine.Util.Position import Position
+from RULEngine.Game.Field import normal
+from RULEngine.Util.field_geometry import FieldGeometry
+from ai.Algorithm.ball_trajectory import BallTrajectory
+
+
+class TestBallTrajectory(unittest.TestCase):
+    DECELERATION = 400
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_standard.cfg")
+        self.world_state = MagicMock()
+        self.trajectory = BallTrajectory(self.world_state, deceleration=self.DECELERATION)
+        self._set_ball(Position(0, 0), Position(2000, 0))
+
+    def _set_ball(self, position, velocity):
+        self.world_state.game_state.get_ball_position.return_value = position
+        self.world_state.game_state.get_ball_velocity.return_value = velocity
+
+    def test_position_follows_rolling_friction(self):
+        # x(t) = v0 t - a t^2 / 2
+        self.assertAlmostEqual(self.trajectory.position_at(1).x, 2000 - self.DECELERATION / 2)
+        self.assertAlmostEqual(self.trajectory.position_at(0.505).x, 2000 * 0.505 - 200 * 0.505 ** 2, places=0)
+
+    def test_ball_stops(self):
+        stop_distance = 2000 ** 2 / (2 * self.DECELERATION)
+        self.assertAlmostEqual(self.trajectory.position_at(100).x, min(stop_distance, 2000 * 3 - 200 * 9))
+        self.assertEqual(self.trajectory.velocity_at(10), Position(0, 0))
+
+    def test_time_to_reach_x(self):
+        self.assertAlmostEqual(self.trajectory.time_to_reach_x(1800), 1, places=3)
+        self.assertIsNone(self.trajectory.time_to_reach_x(-100))
+        self.assertIsNone(self.trajectory.time_to_reach_x(100000))
+
+    def test_time_to_enter_defense_area(self):
+        field = MagicMock()
+        field.geometry = FieldGeometry(normal)
+        self._set_ball(Position(normal["FIELD_X_RIGHT"] - 2000, 0), Position(2000, 0))
+
+        entry = self.trajectory.time_to_enter_defense_area(field, True)
+
+        self.assertAlmostEqual(entry, self.trajectory.time_to_reach_x(normal["FIELD_GOAL_YELLOW_X_LEFT"]), places=1)
+        self.assertIsNone(self.trajectory.time_to_enter_defense_area(field, False))
+
+    def test_rollout_is_cached_until_ball_changes(self):
+        self.trajectory.position_at(1)
+        positions = self.trajectory.positions
+        self.trajectory.position_at(2)
+        self.assertIs(self.trajectory.positions, positions)
+
+        self._set_ball(Position(0, 0), Position(0, 1000))
+        self.assertAlmostEqual(self.trajectory.position_at(1).y, 1000 - self.DECELERATION / 2)
+        self.assertIsNot(self.trajectory.positions, positions)
+
+    def test_first_reachable(self):
+        time, point = self.trajectory.first_reachable(Position(1800, 0), 1000)
+        self.assertLessEqual(abs(point.x - 1800), time * 1000 + 1)
+        self.assertIsNone(self.trajectory.first_reachable(Position(100000, 0), 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,7 @@ class TestRaycast(unittest.TestCase):
         game_world = ReferenceTransferObject(self.game)
         game_world.set_team_color_svc(TeamColorService(TeamColor.YELLOW))
         self.game_state.set_reference(game_world)
+        self.game.friends.enter_player(0)
         self.game_state.game.ball.set_position(Position(100, 0), 0)
 
     def test_raycast(self):
@@ -3,6 +3,7 @@ import unittest
 
 from RULEngine.Game.Game import Game
 from RULEngine.Game.Referee import Referee
+from RULEngine.Util.Position import Position
 from RULEngine.Util.team_color_service import TeamColor, TeamColorService
 from RULEngine.Util.reference_transfer_object import ReferenceTransferObject
 from ai.states.game_state import GameState
@@ -17,6 +18,9 @@ class TestGameStateManager(unittest.TestCase):
     def setUp(self):
         config_service = ConfigService().load_file("config/sim_standard.cfg")
         self.game = Game()
+        for team in (self.game.friends, self.game.enemies):
+            team.enter_player(0)
+            team.enter_player(1)
         self.referee = Referee
         self.game.set_referee(self.referee)
         self.tcsvc = TeamColorService(TeamColor.BLUE)
@@ -81,6 +85,13 @@ class TestGameStateManager(unittest.TestCase):
                       self.game.enemies.players[0].pose.position)
 
 
+    def test_get_absent_player(self):
+        self.game.friends.players[5].set_pose(100, 200, 0)
+
+        self.assertIs(self.GameStateManager1.get_player(5), self.game.friends.players[5])
+        self.assertEqual(self.GameStateManager1.get_player_position(5), Position(100, 200))
+        self.assertNotIn(5, self.game.friends.available_players)
+
 
 class TestModuleManager(unittest.TestCase):
     """
@@ -2,6 +2,7 @@
 
 import unittest
 from math import pi, atan, sqrt
+from unittest.mock import MagicMock
 
 from RULEngine.Game.OurPlayer import OurPlayer
 from RULEngine.Util.Position import Position
@@ -22,7 +23,9 @@ from ai.STA.Action.Kick import Kick
 from ai.STA.Action.MoveToPosition import MoveToPosition
 from ai.STA.Action.MoveToDribblingBall import MoveToDribblingBall
 from ai.STA.Action.ProtectGoal import ProtectGoal
+from ai.Algorithm.ball_trajectory import BALL_TRAJECTORY_MODULE, BallTrajectory
 from ai.states.game_state import GameState
+from ai.states.module_state import ModuleState
 from ai.Util.ai_command import AICommand, AICommandType
 
 A_DELTA_T = 1
@@ -223,5 +226,24 @@ class TestActions(unittest.TestCase):
         # test distance max < distance min
         self.assertRaises(AssertionError, ProtectGoal, self.game_state, 0, True, 50, 40)
 
+    def test_ProtectGoal_follows_predicted_shot(self):
+        ModuleState().register_module(BALL_TRAJECTORY_MODULE, BallTrajectory(MagicMock(game_state=self.game_state)))
+        goalkeeper = self.game_state.game.friends.players[0]
+        goalkeeper.set_pose(4300, 0, 0)
+
+        self.game_state.game.ball.set_position_and_velocity(Position(2000, 0), Position(0, 0))
+        still_ball = ProtectGoal(self.game_state, goalkeeper).exec().pose_goal.position
+        self.assertAlmostEqual(still_ball.y, 0)
+
+        # tir qui franchit la ligne de but à y = 250
+        self.game_state.game.ball.set_position_and_velocity(Position(2000, 0), Position(4000, 400))
+        shot = ProtectGoal(self.game_state, goalkeeper).exec().pose_goal.position
+        self.assertGreater(shot.y, 0)
+
+        # balle qui s'éloigne du but: le gardien reste devant le centre
+        self.game_state.game.ball.set_position_and_velocity(Position(2000, 0), Position(-4000, 400))
+        away = ProtectGoal(self.game_state, goalkeeper).exec().pose_goal.position
+        self.assertAlmostEqual(away.y, 0)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,54 @@
+# Under MIT License, see LICENSE.txt
+
+import unittest
+
+from RULEngine.Game.Game import Game
+from RULEngine.Game.Referee import Referee
+from RULEngine.Util.reference_transfer_object import ReferenceTransferObject
+from RULEngine.Util.team_color_service import TeamColorService, TeamColor
+from ai.STA.Strategy.SimpleDefense import SimpleDefense
+from ai.STA.Strategy.indiana_jones import IndianaJones
+from ai.states.game_state import GameState
+from config.config_service import ConfigService
+
+
+class TestStrategies(unittest.TestCase):
+
+    def setUp(self):
+        ConfigService().load_file("config/sim_standard.cfg")
+        self.game_state = GameState()
+        self.game = Game()
+        self.game.set_referee(Referee())
+        game_world = ReferenceTransferObject(self.game)
+        game_world.set_team_color_svc(TeamColorService(TeamColor.BLUE))
+        self.game_state.set_reference(game_world)
+
+    def _tactic_names(self, strategy):
+        return {player_id: strategy.graphs[player_id].get_current_tactic_name()
+                for player_id in self.game_state.my_team.available_players}
+
+    def test_pick_players_replaces_absent_robots(self):
+        for player_id in (3, 7, 9):
+            self.game_state.my_team.enter_player(player_id)
+
+        strategy = SimpleDefense(self.game_state)
+
+        self.assertEqual([player.id for player in strategy.pick_players(5, 3, 4)], [7, 3, 9])
+        self.assertEqual(self._tactic_names(strategy), {7: "GoalKeeper", 3: "Intercept", 9: "GoKick"})
+
+    def test_strategies_on_a_fresh_game(self):
+        for strategy_class in (SimpleDefense, IndianaJones):
+            strategy = strategy_class(self.game_state)
+            self.assertEqual(strategy.exec(), {})
+
+    def test_not_enough_robots_gives_stop(self):
+        self.game_state.my_team.enter_player(2)
+
+        for strategy_class in (SimpleDefense, IndianaJones):
+            strategy = strategy_class(self.game_state)
+            strategy.exec()
+            self.assertEqual(self._tactic_names(strategy), {2: "Stop"})
+
+
+if __name__ == '__main__':
+    unittest.main()